@@ -1,12 +1,15 @@
 from fastapi import FastAPI
 
 from .general import general_create_app
-from .src import update_app, async_background_tasks
+from .general.database import http_pool
 
 async def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application.
     """
+    # Imported here: loading the server builds its Config, tools under app.src
+    # (e.g. the schema compiler) import without the server's variables
+    from .src.server import update_app, async_background_tasks
 
     app = general_create_app(
         async_background_tasks=async_background_tasks
@@ -14,4 +17,8 @@ async def create_app() -> FastAPI:
 
     await update_app(app)
 
+    # Startup runs on a temporary event loop, release its connections
+    # so the server loop opens its own pool in the lifespan.
+    await http_pool.aclose()
+
     return app
\ No newline at end of file
@@ -6,7 +6,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import FileResponse
 
 from .utils import logger_config, basicSettings
-from .database import basic_api
+from .database import basic_api, http_pool
 from .routes import add_routers
 from .middlewares import add_middlewares
 from .tasks import get_tasks
@@ -51,6 +51,9 @@ def general_create_app(
     async def lifespan(app: FastAPI) -> AsyncGenerator[None, Any]:
         tasks: list[asyncio.Task] = []
 
+        # Pooled upstream clients must live on the server's event loop
+        await http_pool.open()
+
         for coro_fn in async_background_tasks:
             task = asyncio.create_task(coro_fn())
             tasks.append(task)
@@ -61,6 +64,7 @@ def general_create_app(
             for task in tasks:
                 task.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
+            await http_pool.aclose()
 
     app = FastAPI(
         **fastapi_kwargs,
@@ -1 +1,3 @@
-from .basic_api import BaseAPI
\ No newline at end of file
+from .basic_api import BaseAPI, http_pool
+from .errors import UpstreamUnavailableError, AdmissionRejectedError
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker, breaker_states
@@ -1,6 +1,132 @@
+import asyncio
+import importlib.util
+import time
 import httpx
+from loguru import logger
+from prometheus_client import Gauge
 from typing import Optional, Dict, Any, Union, List, Tuple
 
+from ..utils import basicSettings
+from ..utils.deadline import check_deadline, remaining_time
+from .limiter import get_limiter
+from .circuit_breaker import CircuitBreaker
+
+POOL_MAX_CONNECTIONS = Gauge(
+    "http_pool_max_connections",
+    "Configured connection limit of the pooled HTTP client per upstream",
+    ["upstream"],
+)
+POOL_CONNECTIONS = Gauge(
+    "http_pool_connections",
+    "Connections held by the pooled HTTP client per upstream",
+    ["upstream", "state"],
+)
+POOL_QUEUED_REQUESTS = Gauge(
+    "http_pool_queued_requests",
+    "Requests waiting for a free pooled connection per upstream",
+    ["upstream"],
+)
+POOL_IN_FLIGHT = Gauge(
+    "http_pool_in_flight_requests",
+    "Requests currently in flight on the pooled HTTP client per upstream",
+    ["upstream"],
+)
+
+
+def _is_overloaded(response: httpx.Response) -> bool:
+    """Whether the upstream signals it is overloaded or rate limiting us."""
+    if response.status_code in (429, 502, 503, 504):
+        return True
+    # GitHub answers secondary rate limits with 403 and Retry-After / exhausted quota
+    return response.status_code == 403 and (
+        "retry-after" in response.headers or response.headers.get("x-ratelimit-remaining") == "0"
+    )
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    """Whether the response counts against the upstream's circuit breaker."""
+    return response.status_code in (500, 502, 503, 504)
+
+
+def _http2_enabled() -> bool:
+    if not basicSettings.HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed, falling back to HTTP/1.1")
+        return False
+    return True
+
+
+class HTTPClientPool:
+    """
+    Keeps one long-lived httpx.AsyncClient per upstream so that connections are
+    reused (keep-alive) across requests instead of handshaking on every call.
+
+    Clients are bound to the event loop that created them. A client created on
+    another loop (e.g. during startup under asyncio.run) is replaced transparently.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, bool], httpx.AsyncClient] = {}
+        self._loops: Dict[Tuple[str, bool], asyncio.AbstractEventLoop] = {}
+
+    def get(self, upstream: str, verify: bool) -> httpx.AsyncClient:
+        key = (upstream, verify)
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(key)
+
+        if client is not None and not client.is_closed and self._loops.get(key) is loop:
+            return client
+
+        limits = httpx.Limits(
+            max_connections=basicSettings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=basicSettings.HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=basicSettings.HTTP_POOL_KEEPALIVE_EXPIRY,
+        )
+        client = httpx.AsyncClient(limits=limits, http2=_http2_enabled(), verify=verify)
+        self._clients[key] = client
+        self._loops[key] = loop
+        POOL_MAX_CONNECTIONS.labels(upstream=upstream).set(basicSettings.HTTP_POOL_MAX_CONNECTIONS)
+        logger.debug(f"Opened pooled HTTP client for {upstream}")
+        return client
+
+    async def open(self) -> None:
+        """Drop clients that belong to another event loop, called on app startup."""
+        loop = asyncio.get_running_loop()
+        for key in [k for k, client_loop in self._loops.items() if client_loop is not loop]:
+            self._clients.pop(key, None)
+            self._loops.pop(key, None)
+
+    async def close(self, upstream: str, verify: bool) -> None:
+        key = (upstream, verify)
+        client = self._clients.pop(key, None)
+        loop = self._loops.pop(key, None)
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.aclose()
+
+    async def aclose(self) -> None:
+        """Close every pooled client, called on app shutdown."""
+        for upstream, verify in list(self._clients):
+            await self.close(upstream, verify)
+
+    def observe(self, upstream: str, verify: bool) -> None:
+        """Export connection pool utilisation of an upstream to prometheus."""
+        client = self._clients.get((upstream, verify))
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        if pool is None:
+            return
+
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        queued = sum(1 for r in getattr(pool, "_requests", []) if r.is_queued())
+
+        POOL_CONNECTIONS.labels(upstream=upstream, state="active").set(len(connections) - idle)
+        POOL_CONNECTIONS.labels(upstream=upstream, state="idle").set(idle)
+        POOL_QUEUED_REQUESTS.labels(upstream=upstream).set(queued)
+
+
+http_pool = HTTPClientPool()
+
 
 class BaseAPI:
     def __init__(
@@ -9,11 +135,16 @@ class BaseAPI:
         headers: Optional[Dict[str, str]] = None,
         timeout: Optional[float] = 10.0,
         verify: bool = False,
+        upstream: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.headers = headers or {}
         self.timeout = timeout
         self.verify = verify
+        # Name of the upstream service, all BaseAPI instances of an upstream share one pool
+        self.upstream = upstream or httpx.URL(self.base_url).host
+        self.breaker = breaker
 
     async def request(
         self,
@@ -27,26 +158,51 @@ class BaseAPI:
     ) -> httpx.Response:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         merged_headers = {**self.headers, **(headers or {})}
+        limiter = get_limiter(self.upstream)
+
+        # Never wait or send longer than the inbound request's remaining deadline
+        check_deadline(self.upstream)
+        remaining = remaining_time()
+        timeout = self.timeout if remaining is None else min(self.timeout or remaining, remaining)
+
+        probe = self.breaker.before_call() if self.breaker else None
+
+        try:
+            await limiter.acquire(timeout=remaining)
+        except BaseException:
+            if self.breaker:
+                self.breaker.after_call(None, probe)
+            raise
+
+        started = time.monotonic()
+        overloaded = False
+        failed = None
 
+        POOL_IN_FLIGHT.labels(upstream=self.upstream).inc()
         try:
-            async with httpx.AsyncClient(
-                base_url=self.base_url,
-                headers=self.headers,
-                timeout=self.timeout,
-                verify=self.verify,
-            ) as client:
-                response = await client.request(
-                    method=method.upper(),
-                    url=url,
-                    params=params,
-                    data=data,
-                    json=json,
-                    headers=merged_headers,
-                    files=files,
-                )
-                return response  # Always return response, caller decides what to do with status code
+            client = http_pool.get(self.upstream, self.verify)
+            response = await client.request(
+                method=method.upper(),
+                url=url,
+                params=params,
+                data=data,
+                json=json,
+                headers=merged_headers,
+                files=files,
+                timeout=timeout,
+            )
+            overloaded = _is_overloaded(response)
+            failed = _is_failure(response)
+            return response  # Always return response, caller decides what to do with status code
         except httpx.RequestError as e:
+            overloaded = failed = True
             raise RuntimeError(f"Request failed: {str(e)}") from e
+        finally:
+            POOL_IN_FLIGHT.labels(upstream=self.upstream).dec()
+            http_pool.observe(self.upstream, self.verify)
+            limiter.release(time.monotonic() - started, overloaded)
+            if self.breaker:
+                self.breaker.after_call(failed, probe)
 
     async def get(self, endpoint: str, **kwargs) -> httpx.Response:
         return await self.request("GET", endpoint, **kwargs)
@@ -88,4 +244,4 @@ class BaseAPI:
         return response.content
 
     async def close(self):
-        await self.client.aclose()
+        await http_pool.close(self.upstream, self.verify)
@@ -0,0 +1,153 @@
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+from prometheus_client import Counter, Gauge
+
+from ..utils import basicSettings
+from .errors import UpstreamUnavailableError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state per upstream (0=closed, 1=half_open, 2=open)",
+    ["upstream"],
+)
+BREAKER_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state transitions per upstream",
+    ["upstream", "state"],
+)
+BREAKER_REJECTED = Counter(
+    "circuit_breaker_rejected_total",
+    "Calls rejected without reaching the upstream because its breaker is open",
+    ["upstream"],
+)
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised when a call is short-circuited by an open breaker."""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures.
+    Open -> half-open once recovery_timeout elapsed, letting half_open_max_calls probes through.
+    Half-open -> closed on a successful probe, back to open on a failed one.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        half_open_max_calls: int = 1,
+    ):
+        self.upstream = upstream
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        # Half-open round the outstanding probes belong to
+        self._round = 0
+        BREAKER_STATE.labels(upstream=upstream).set(_STATE_VALUES[CLOSED])
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker for {self.upstream}: {self.state} -> {state}")
+        self.state = state
+        BREAKER_STATE.labels(upstream=self.upstream).set(_STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(upstream=self.upstream, state=state).inc()
+
+    def current_state(self) -> str:
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._probes = 0
+            self._round += 1
+            self._transition(HALF_OPEN)
+        return self.state
+
+    def before_call(self) -> Optional[int]:
+        """
+        Raise CircuitOpenError when the call must not reach the upstream. Returns a probe
+        token for calls let through while half-open, None for ordinary calls; pass it back
+        to after_call.
+        """
+        state = self.current_state()
+
+        if state == CLOSED:
+            return None
+
+        if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return self._round
+
+        BREAKER_REJECTED.labels(upstream=self.upstream).inc()
+        retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(
+            self.upstream,
+            f"Circuit breaker for {self.upstream} is open after repeated failures.",
+            retry_after=retry_after or self.recovery_timeout,
+        )
+
+    def after_call(self, failed: Optional[bool], probe: Optional[int] = None) -> None:
+        """
+        Record a call's outcome, None for calls that ended without one (e.g. cancelled).
+        Only a probe of the current half-open round moves the breaker out of half-open;
+        calls that started while closed and finish after it opened are ignored.
+        """
+        is_probe = probe is not None and probe == self._round and self.state == HALF_OPEN
+        if is_probe:
+            self._probes = max(0, self._probes - 1)
+
+        if failed is None:
+            return
+
+        if self.state != CLOSED:
+            if not is_probe:
+                return
+            if failed:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+            else:
+                self._failures = 0
+                self._transition(CLOSED)
+            return
+
+        if not failed:
+            self._failures = 0
+            return
+
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    """Return the shared breaker of an upstream, creating it from settings on first use."""
+    breaker = _breakers.get(upstream)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            upstream,
+            failure_threshold=basicSettings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=basicSettings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+            half_open_max_calls=basicSettings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
+        )
+        _breakers[upstream] = breaker
+    return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    return {upstream: breaker.current_state() for upstream, breaker in _breakers.items()}
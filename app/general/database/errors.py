@@ -0,0 +1,26 @@
+from typing import Optional
+
+
+class UpstreamUnavailableError(RuntimeError):
+    """
+    Raised when a call to an upstream is refused locally, without reaching it.
+    Mirrors the attributes of service errors so the same handlers can render it.
+    """
+    response_status_code = 503
+
+    def __init__(self, upstream: str, detail: str, retry_after: Optional[float] = None):
+        self.service_name = upstream
+        self.error = f"Request to {upstream} failed."
+        self.status_code = self.response_status_code
+        self.detail = detail
+        self.retry_after = retry_after
+        super().__init__(detail)
+
+
+class AdmissionRejectedError(UpstreamUnavailableError):
+    """Raised when the upstream's concurrency limiter queue is full or the wait timed out."""
+
+
+class DeadlineExceededError(UpstreamUnavailableError):
+    """Raised when the inbound request's deadline is spent before an upstream call could complete."""
+    response_status_code = 504
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
+
+from ..utils import basicSettings
+from .errors import AdmissionRejectedError
+
+CONCURRENCY_LIMIT = Gauge(
+    "upstream_concurrency_limit",
+    "Current adaptive concurrency limit per upstream",
+    ["upstream"],
+)
+QUEUE_DEPTH = Gauge(
+    "upstream_queue_depth",
+    "Requests waiting for an upstream concurrency slot",
+    ["upstream"],
+)
+QUEUE_WAIT = Histogram(
+    "upstream_queue_wait_seconds",
+    "Time requests waited for an upstream concurrency slot",
+    ["upstream"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REJECTED = Counter(
+    "upstream_admission_rejected_total",
+    "Requests rejected by the upstream concurrency limiter",
+    ["upstream", "reason"],
+)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter (bulkhead) for one upstream.
+
+    - Each successful call faster than latency_target grows the limit by 1/limit,
+      i.e. roughly +1 per window of `limit` calls.
+    - A failed, overloaded or slow call multiplies the limit by `backoff`,
+      at most once per latency_target so a burst of errors counts as one signal.
+    - Callers above the limit wait in a bounded FIFO queue. When the queue is
+      full or the wait exceeds queue_timeout an AdmissionRejectedError is raised.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        latency_target: float,
+        backoff: float = 0.5,
+    ):
+        self.upstream = upstream
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        CONCURRENCY_LIMIT.labels(upstream=upstream).set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """Wait for a slot, at most `timeout` (defaults to queue_timeout) seconds."""
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            REJECTED.labels(upstream=self.upstream, reason="queue_full").inc()
+            raise AdmissionRejectedError(
+                self.upstream,
+                f"{self.upstream} is overloaded: {self._in_flight} in flight, {len(self._waiters)} queued.",
+                retry_after=self.latency_target,
+            )
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        QUEUE_DEPTH.labels(upstream=self.upstream).set(len(self._waiters))
+        started = time.monotonic()
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            REJECTED.labels(upstream=self.upstream, reason="queue_timeout").inc()
+            raise AdmissionRejectedError(
+                self.upstream,
+                f"Timed out after {timeout:g}s waiting for a {self.upstream} concurrency slot.",
+                retry_after=self.latency_target,
+            )
+        except asyncio.CancelledError:
+            # The slot may have been handed over right before the cancellation
+            if fut.done() and not fut.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+            QUEUE_DEPTH.labels(upstream=self.upstream).set(len(self._waiters))
+            QUEUE_WAIT.labels(upstream=self.upstream).observe(time.monotonic() - started)
+
+    def release(self, latency: float, overloaded: bool) -> None:
+        """Return a slot and feed the call's outcome into the limit."""
+        if overloaded or latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self._last_decrease = now
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                logger.debug(f"Concurrency limit for {self.upstream} decreased to {self.limit}")
+        else:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+        CONCURRENCY_LIMIT.labels(upstream=self.upstream).set(self.limit)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+        # Hand free slots over to waiters in FIFO order
+        while self._waiters and self._in_flight < self.limit:
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self._in_flight += 1
+            fut.set_result(None)
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(upstream: str) -> AdaptiveLimiter:
+    """Return the shared limiter of an upstream, creating it from settings on first use."""
+    limiter = _limiters.get(upstream)
+    if limiter is None:
+        max_limit = basicSettings.UPSTREAM_CONCURRENCY_LIMITS.get(upstream, basicSettings.UPSTREAM_CONCURRENCY_MAX)
+        limiter = AdaptiveLimiter(
+            upstream,
+            initial_limit=min(basicSettings.UPSTREAM_CONCURRENCY_INITIAL, max_limit),
+            min_limit=basicSettings.UPSTREAM_CONCURRENCY_MIN,
+            max_limit=max_limit,
+            max_queue=basicSettings.UPSTREAM_QUEUE_SIZE,
+            queue_timeout=basicSettings.UPSTREAM_QUEUE_TIMEOUT,
+            latency_target=basicSettings.UPSTREAM_LATENCY_TARGET,
+        )
+        _limiters[upstream] = limiter
+    return limiter
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+CACHE_LOOKUPS = Counter(
+    "http_response_cache_lookups_total",
+    "Conditional response cache lookups per upstream (hit, miss, not_modified)",
+    ["upstream", "result"],
+)
+CACHE_BYTES = Gauge(
+    "http_response_cache_bytes",
+    "Bytes of response bodies held by the conditional response cache per upstream",
+    ["upstream"],
+)
+
+
+class CachedResponse:
+    __slots__ = ("content", "etag", "last_modified")
+
+    def __init__(self, content: bytes, etag: Optional[str], last_modified: Optional[str]):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def validators(self) -> Dict[str, str]:
+        """Headers turning the next request for the same URL into a conditional one."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    LRU cache of response bodies and their validators (ETag / Last-Modified).
+
+    Entries are always revalidated with a conditional request, so they never
+    serve stale data; they only save the body transfer and, on GitHub, the
+    rate limit (304 responses are not counted). Bounded by entry count and bytes.
+    """
+
+    def __init__(self, upstream: str, max_entries: int, max_bytes: int):
+        self.upstream = upstream
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            CACHE_LOOKUPS.labels(upstream=self.upstream, result="miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        CACHE_LOOKUPS.labels(upstream=self.upstream, result="hit").inc()
+        return entry
+
+    def not_modified(self, key: Hashable) -> Optional[CachedResponse]:
+        """Body to serve for a 304 answer, None if the entry was evicted meanwhile."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            CACHE_LOOKUPS.labels(upstream=self.upstream, result="not_modified").inc()
+        return entry
+
+    def store(self, key: Hashable, response: httpx.Response) -> None:
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not response.is_success or not (etag or last_modified):
+            self.invalidate(key)
+            return
+
+        content = response.content
+        if len(content) > self.max_bytes:
+            self.invalidate(key)
+            return
+
+        self.invalidate(key)
+        self._entries[key] = CachedResponse(content, etag, last_modified)
+        self._size += len(content)
+
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.content)
+
+        CACHE_BYTES.labels(upstream=self.upstream).set(self._size)
+
+    def invalidate(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.content)
+            CACHE_BYTES.labels(upstream=self.upstream).set(self._size)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+        CACHE_BYTES.labels(upstream=self.upstream).set(0)
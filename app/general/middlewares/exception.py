@@ -1,8 +1,10 @@
+import math
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from loguru import logger
 from app.general.models import ExceptionHandlerConfig
+from app.general.database.errors import UpstreamUnavailableError
 
 async def http_exception_handler(
         request: Request,
@@ -26,6 +28,19 @@ async def validation_exception_handler(
     )
 
 
+async def upstream_unavailable_exception_handler(
+        request: Request,
+        exc: UpstreamUnavailableError
+) -> JSONResponse:
+    logger.warning(f"Upstream {exc.service_name} unavailable: {exc.detail}")
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(
+        status_code=exc.response_status_code,
+        content={"detail": exc.detail},
+        headers=headers
+    )
+
+
 async def unhandled_exception_handler(
         request: Request,
         exc: Exception
@@ -45,6 +60,10 @@ handlers = [
         exception_class=RequestValidationError,
         handler=validation_exception_handler
     ),
+    ExceptionHandlerConfig(
+        exception_class=UpstreamUnavailableError,
+        handler=upstream_unavailable_exception_handler
+    ),
     ExceptionHandlerConfig(
         exception_class=Exception,
         handler=unhandled_exception_handler
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from ..utils import basicSettings
+from ..database.circuit_breaker import breaker_states, CLOSED
 
 health_router = APIRouter()
 
@@ -10,4 +11,8 @@ def liveness_probe():
 
 @health_router.get(basicSettings.PROBE_READINESS_PATH)
 def readiness_probe():
-    return JSONResponse(content={"status": "OK"}, status_code=200)
\ No newline at end of file
+    # An open upstream breaker degrades the service but the pod can still serve
+    # other routes, so it is reported without failing the probe.
+    breakers = breaker_states()
+    status = "OK" if all(state == CLOSED for state in breakers.values()) else "DEGRADED"
+    return JSONResponse(content={"status": status, "circuit_breakers": breakers}, status_code=200)
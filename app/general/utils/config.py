@@ -90,3 +90,99 @@ class BasicSettings(BaseSettings):
         examples=["/liveness", "/api/liveness"],
     )
 
+    HTTP_POOL_MAX_CONNECTIONS: int = Field(
+        default=20,
+        description="Maximum number of concurrent connections per upstream HTTP pool.",
+        examples=[20, 100],
+    )
+
+    HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=10,
+        description="Maximum number of idle keep-alive connections kept per upstream HTTP pool.",
+        examples=[10, 50],
+    )
+
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = Field(
+        default=30.0,
+        description="Seconds an idle keep-alive connection is kept open before it is closed.",
+        examples=[5.0, 30.0],
+    )
+
+    HTTP2_ENABLED: bool = Field(
+        default=False,
+        description="Whether upstream HTTP clients negotiate HTTP/2 (requires the 'h2' package).",
+        examples=[True, False],
+    )
+
+    UPSTREAM_CONCURRENCY_INITIAL: int = Field(
+        default=10,
+        description="Initial adaptive concurrency limit per upstream.",
+        examples=[5, 10],
+    )
+
+    UPSTREAM_CONCURRENCY_MIN: int = Field(
+        default=1,
+        description="Lowest value the adaptive concurrency limit may shrink to.",
+        examples=[1, 2],
+    )
+
+    UPSTREAM_CONCURRENCY_MAX: int = Field(
+        default=50,
+        description="Highest value the adaptive concurrency limit may grow to.",
+        examples=[20, 50],
+    )
+
+    UPSTREAM_CONCURRENCY_LIMITS: dict[str, int] = Field(
+        default={},
+        description="Per-upstream override of the maximum concurrency limit.",
+        examples=[{"git": 8, "argocd": 20}],
+    )
+
+    UPSTREAM_QUEUE_SIZE: int = Field(
+        default=100,
+        description="Maximum number of requests waiting for an upstream concurrency slot.",
+        examples=[50, 100],
+    )
+
+    UPSTREAM_QUEUE_TIMEOUT: float = Field(
+        default=10.0,
+        description="Seconds a request may wait for an upstream concurrency slot before it is rejected.",
+        examples=[5.0, 10.0],
+    )
+
+    UPSTREAM_LATENCY_TARGET: float = Field(
+        default=2.0,
+        description="Upstream latency in seconds above which the concurrency limit is decreased.",
+        examples=[1.0, 2.0],
+    )
+
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = Field(
+        default=5,
+        description="Consecutive upstream failures that open its circuit breaker.",
+        examples=[3, 5],
+    )
+
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT: float = Field(
+        default=30.0,
+        description="Seconds an open circuit breaker waits before letting a probe request through.",
+        examples=[10.0, 30.0],
+    )
+
+    CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS: int = Field(
+        default=1,
+        description="Concurrent probe requests allowed while a circuit breaker is half-open.",
+        examples=[1, 3],
+    )
+
+    REQUEST_DEADLINE_HEADER: str = Field(
+        default="X-Request-Timeout",
+        description="Request header carrying the client's time budget in seconds.",
+        examples=["X-Request-Timeout"],
+    )
+
+    REQUEST_DEADLINE_MAX: float = Field(
+        default=300.0,
+        description="Upper bound in seconds for a client-provided request deadline.",
+        examples=[60.0, 300.0],
+    )
+
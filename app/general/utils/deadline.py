@@ -0,0 +1,67 @@
+import math
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from fastapi import Request
+
+from . import basicSettings
+from ..database.errors import DeadlineExceededError
+
+
+class Deadline:
+    """Absolute point in time by which the current inbound request must be answered."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+# Set per inbound request by the with_deadline dependency, None outside of requests
+request_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left of the current request's deadline, None when no deadline applies."""
+    deadline = request_deadline.get()
+    return deadline.remaining() if deadline else None
+
+
+def check_deadline(upstream: str) -> None:
+    """Fail fast with DeadlineExceededError once the current request's deadline is spent."""
+    deadline = request_deadline.get()
+    if deadline and deadline.expired:
+        raise DeadlineExceededError(
+            upstream,
+            f"Request deadline of {deadline.timeout:g}s exceeded before calling {upstream}.",
+        )
+
+
+def with_deadline(default: float) -> Callable:
+    """
+    Build a route dependency that starts the request's deadline.
+    The client may ask for a different budget through REQUEST_DEADLINE_HEADER, capped at REQUEST_DEADLINE_MAX.
+    """
+
+    async def dependency(request: Request) -> None:
+        timeout = default
+        raw = request.headers.get(basicSettings.REQUEST_DEADLINE_HEADER)
+        if raw:
+            try:
+                requested = float(raw)
+            except ValueError:
+                requested = None
+            # "nan" and "inf" parse as floats but would give a deadline that never expires
+            if requested is not None and math.isfinite(requested) and requested > 0:
+                timeout = requested
+        timeout = min(max(timeout, 0.0), basicSettings.REQUEST_DEADLINE_MAX)
+        request_deadline.set(Deadline(timeout))
+
+    return dependency
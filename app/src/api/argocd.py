@@ -3,7 +3,8 @@ import asyncio
 
 import httpx
 from fastapi.responses import JSONResponse
-from app.general.database import BaseAPI
+from app.general.database import BaseAPI, get_breaker
+from app.general.utils.deadline import check_deadline
 from loguru import logger
 from ..errors.external_service import ExternalServiceError
 
@@ -20,21 +21,21 @@ def handle_response(response: httpx.Response):
 
     if response.status_code == 307:
         raise ArgoCDError(status_code=response.status_code, detail="ArgoCD endpoint is redirecting. "
-                                                    f"ArgoCD message: {message}")
+                                                    f"ArgoCD message: {message}", headers=response.headers)
 
     if response.status_code == 403:
         raise ArgoCDError(status_code=response.status_code, detail="Don't have permission to access this resource, or this resource dosen't exist. "
-                                                    f"ArgoCD message: {message}")
+                                                    f"ArgoCD message: {message}", headers=response.headers)
 
     if not response.is_success:
         raise ArgoCDError(status_code=response.status_code, detail=f"ArgoCD status code: {response.status_code}. "
-                                                    f"ArgoCD message: {message}")
+                                                    f"ArgoCD message: {message}", headers=response.headers)
 
 
 class ArgoCDAPI:
     def __init__(self, base_url, api_key):
         headers =  {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-        self.api = BaseAPI(base_url.rstrip('/'), headers=headers)
+        self.api = BaseAPI(base_url.rstrip('/'), headers=headers, upstream="argocd", breaker=get_breaker("argocd"))
 
     async def sync_app(self, app_name):
 
@@ -92,6 +93,7 @@ class ArgoCDAPI:
         """
         waited = 0
         while waited < timeout:
+            check_deadline("ArgoCD")
             try:
                 # If app exists, this returns successfully; keep waiting
                 await self.get_app(app_name)
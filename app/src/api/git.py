@@ -1,9 +1,27 @@
+import asyncio
 import base64
+import json
+import posixpath
+import re
+from typing import Dict, List, Optional, Tuple
+
 import httpx
 from ...general.database.basic_api import BaseAPI
+from ...general.database.circuit_breaker import get_breaker
+from ...general.database.response_cache import ResponseCache
+from ..utils import config
+from .rate_limit import get_scheduler
 from ..errors.external_service import ExternalServiceError
 from loguru import logger
 
+RAW_MEDIA_TYPE = "application/vnd.github.raw+json"
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+# The compare API lists at most this many files for a whole comparison
+COMPARE_FILES_LIMIT = 300
+
+_SHA = re.compile(r"[0-9a-f]{40}")
+
+
 class GitError(ExternalServiceError):
     def __init__(self, status_code, detail, *args, **kwargs):
         # Always set service_name to "Git"
@@ -20,22 +38,22 @@ def handle_response(response: httpx.Response):
 
     if response.status_code == 401:
         raise GitError(status_code=response.status_code, detail="Git token is invalid or revoked."
-                                                    f"Git message: {message}")
+                                                    f"Git message: {message}", headers=response.headers)
 
     if response.status_code == 404:
         raise GitError(status_code=404, detail="Git path (repo or file) not found."
-                       f"Git message: {message}")
+                       f"Git message: {message}", headers=response.headers)
 
     if response.status_code == 422:
         if "sha" in response.json().get('message'):
-            raise GitError(status_code=422, detail="Git path (repo or file) already exists.")
+            raise GitError(status_code=422, detail="Git path (repo or file) already exists.", headers=response.headers)
         raise GitError(status_code=422, detail="Invalid request."
-                       f"Git message: {message}")
+                       f"Git message: {message}", headers=response.headers)
 
 
     if not response.is_success:
         raise GitError(status_code=response.status_code, detail=f"Git status code: {response.status_code}."
-                                                    f"Git message: {message}")
+                                                    f"Git message: {message}", headers=response.headers)
 
 
 
@@ -45,11 +63,26 @@ class GitAPI:
         headers = {"Authorization": f"Bearer {token}"}
         self.base_url = base_url
         self.token = token
-        self.api = BaseAPI(base_url.rstrip('/'), headers=headers)
-
-    async def get_file(self, path: str):
+        self.api = BaseAPI(base_url.rstrip('/'), headers=headers, upstream="git", breaker=get_breaker("git"))
+        self.cache = ResponseCache(
+            "git",
+            max_entries=config.GIT_RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=config.GIT_RESPONSE_CACHE_MAX_BYTES,
+        )
+        self.rate_limit = get_scheduler(token)
+        # path -> blob sha, writes must name the sha of the file they replace
+        self.shas: Dict[str, str] = {}
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Send through BaseAPI, pacing background calls by the token's remaining rate limit."""
+        await self.rate_limit.acquire()
+        response = await self.api.request(method, endpoint, **kwargs)
+        self.rate_limit.record(response.headers)
+        return response
+
+    async def _send(self, method: str, endpoint: str, **kwargs):
         try:
-            response = await self.api.get(f"/contents/{path.lstrip('/')}")
+            response = await self._request(method, endpoint, **kwargs)
             handle_response(response)
 
         except httpx.RequestError as e:
@@ -57,60 +90,132 @@ class GitAPI:
 
         return response.json()
 
-    async def delete_file(self, path: str, commit_message: str):
-        data = await self.get_file(path)
-        sha = data["sha"]
-
-        payload = {
-            "sha": sha,
-            "message": commit_message,
-            "branch": "main"
-        }
+    async def _cached_fetch(self, endpoint: str, accept: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+        """
+        GET revalidated against the response cache, a 304 is served from the cached body.
+        Returns the body and its ETag.
+        """
+        key = endpoint if accept is None else f"{endpoint}#{accept}"
+        accept_header = {"Accept": accept} if accept else {}
+        cached = self.cache.lookup(key)
 
         try:
-            response = await self.api.delete(f"/contents/{path.lstrip('/')}", json=payload)
-            handle_response(response)
+            response = await self._request(
+                "GET", endpoint, headers={**(cached.validators() if cached else {}), **accept_header}
+            )
+
+            if response.status_code == 304:
+                cached = self.cache.not_modified(key)
+                if cached is not None:
+                    return cached.content, cached.etag
+                # Evicted while in flight, fetch unconditionally
+                response = await self._request("GET", endpoint, headers=accept_header)
+
+            self.cache.store(key, response)
+            # Raw bodies are not JSON, only error bodies need inspecting
+            if accept is None or not response.is_success:
+                handle_response(response)
 
         except httpx.RequestError as e:
             raise GitError(status_code=500, detail=f"Git request failed: {e}")
 
+        return response.content, response.headers.get("etag")
 
-    async def modify_file_content(self, path, commit_message, content):
+    async def _cached_get(self, endpoint: str):
+        content, _ = await self._cached_fetch(endpoint)
+        return json.loads(content)
+
+    def _remember_sha(self, path: str, sha: Optional[str]) -> None:
+        path = path.strip('/')
+        if sha:
+            self.shas[path] = sha
+        else:
+            self.shas.pop(path, None)
+
+    async def _file_sha(self, path: str) -> str:
+        sha = self.shas.get(path.strip('/'))
+        if sha:
+            return sha
 
         try:
             file = await self.get_file(path)
-            sha = file["sha"]
 
         except GitError as e:
             logger.debug(f"Failed to get file sha: {path}")
             raise e
 
+        return file["sha"]
+
+    async def _write_with_sha(self, method: str, path: str, payload: dict) -> httpx.Response:
+        """
+        Send a write that must name the file's current blob sha.
+        The cached sha is used first; if GitHub rejects it as stale (409/422) it is refreshed once.
+        """
+        cached = path.strip('/') in self.shas
+
+        for attempt in range(2):
+            payload["sha"] = await self._file_sha(path)
+
+            try:
+                response = await self._request(method, f"/contents/{path.lstrip('/')}", json=payload)
+                handle_response(response)
+
+            except httpx.RequestError as e:
+                raise GitError(status_code=500, detail=f"Git request failed: {e}")
+
+            except GitError as e:
+                if not cached or attempt or e.status_code not in (409, 422):
+                    raise
+                logger.debug(f"Cached sha of {path} is stale, refreshing")
+                self._remember_sha(path, None)
+                continue
+
+            return response
+
+    async def get_file(self, path: str):
+        file = await self._cached_get(f"/contents/{path.lstrip('/')}")
+        if isinstance(file, dict):
+            self._remember_sha(path, file.get("sha"))
+        return file
+
+    async def get_file_raw(self, path: str) -> bytes:
+        """File content without the JSON/base64 envelope, the blob sha is taken from the ETag."""
+        content, etag = await self._cached_fetch(f"/contents/{path.lstrip('/')}", accept=RAW_MEDIA_TYPE)
+        sha = (etag or "").removeprefix("W/").strip('"')
+        if _SHA.fullmatch(sha):
+            self._remember_sha(path, sha)
+        return content
+
+    async def delete_file(self, path: str, commit_message: str):
+        payload = {
+            "message": commit_message,
+            "branch": "main"
+        }
+
+        await self._write_with_sha("DELETE", path, payload)
+        self._remember_sha(path, None)
+
+
+    async def modify_file_content(self, path, commit_message, content):
 
         encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
 
         payload = {
-            "sha": sha,
             "content": encoded_content,
             "message": commit_message
         }
 
-        try:
-            response = await self.api.put(f"/contents/{path.lstrip('/')}", json=payload)
-            handle_response(response)
-
-        except httpx.RequestError as e:
-            raise GitError(status_code=500, detail=f"Git request failed: {e}")
+        response = await self._write_with_sha("PUT", path, payload)
+        self._remember_sha(path, response.json().get("content", {}).get("sha"))
 
 
     async def list_dir(self, path: str) -> list[str]:
-        try:
-            response = await self.api.get(f"/contents/{path.lstrip('/')}")
-            handle_response(response)
-
-        except httpx.RequestError as e:
-            raise GitError(status_code=500, detail=f"Git request failed: {e}")
-
-        return response.json()
+        entries = await self._cached_get(f"/contents/{path.lstrip('/')}")
+        if isinstance(entries, list):
+            for entry in entries:
+                if entry.get("type") == "file":
+                    self._remember_sha(entry["path"], entry.get("sha"))
+        return entries
 
 
     async def create_new_file(self, path: str, commit_message: str,content: str):
@@ -123,19 +228,21 @@ class GitAPI:
         }
 
         try:
-            response = await self.api.put(f"/contents/{path.lstrip('/')}", json=payload)
+            response = await self._request("PUT", f"/contents/{path.lstrip('/')}", json=payload)
             handle_response(response)
 
         except httpx.RequestError as e:
             raise GitError(status_code=500, detail=f"Git request failed: {e}")
 
+        self._remember_sha(path, response.json().get("content", {}).get("sha"))
+
 
     async def commits_per_path(self, path, since, until):
 
         params = {"path": path, "since": since, "until": until}
 
         try:
-            response = await self.api.get("/commits", params=params)
+            response = await self._request("GET", "/commits", params=params)
             handle_response(response)
 
         except httpx.RequestError as e:
@@ -147,7 +254,7 @@ class GitAPI:
         path = f"/compare/{base}...{head}"
 
         try:
-            response = await self.api.get(path)
+            response = await self._request("GET", path)
             handle_response(response)
 
         except httpx.RequestError as e:
@@ -155,24 +262,197 @@ class GitAPI:
 
         return response.json()
 
-    async def get_last_commit(self):
+    async def compare_files(self, base: str, head: str) -> Optional[List[dict]]:
+        """
+        Files changed between base and head, None when the comparison touches more files
+        than the compare API lists. Pagination of the compare API only pages the commits:
+        the files come with the first page, capped for the whole comparison.
+        """
         try:
-            response = await self.api.get("/commits/main")
+            # One commit per page keeps the payload small, the file list is not paged
+            response = await self._request("GET", f"/compare/{base}...{head}", params={"per_page": 1})
             handle_response(response)
 
         except httpx.RequestError as e:
             raise GitError(status_code=500, detail=f"Git request failed: {e}")
 
-        return response.json()
+        files = response.json().get("files", [])
+        if len(files) >= COMPARE_FILES_LIMIT:
+            return None
+        return files
+
+    async def get_head_sha(self, branch: str = "main") -> str:
+        """Sha of the branch head, revalidated with its ETag so an unchanged head costs a 304."""
+        content, _ = await self._cached_fetch(f"/commits/{branch}", accept=SHA_MEDIA_TYPE)
+        return content.decode("utf-8").strip()
+
+    async def get_tree(self, ref: str = "main", recursive: bool = True):
+        endpoint = f"/git/trees/{ref}"
+        if recursive:
+            endpoint += "?recursive=1"
+        return await self._cached_get(endpoint)
+
+    async def get_last_commit(self):
+        return await self._cached_get("/commits/main")
 
 
     async def get_commit(self, sha: str):
 
         try:
-            response = await self.api.get(f"/commits/{sha}")
+            response = await self._request("GET", f"/commits/{sha}")
             handle_response(response)
 
         except httpx.RequestError as e:
             raise GitError(status_code=500, detail=f"Git request failed: {e}")
 
-        return response.json()
\ No newline at end of file
+        return response.json()
+
+    def commit_builder(self, branch: str = "main") -> "CommitBuilder":
+        return CommitBuilder(self, branch)
+
+
+ADD = "add"
+MODIFY = "modify"
+DELETE = "delete"
+
+
+class CommitBuilder:
+    """
+    Stage adds, modifies and deletes and push them as a single commit through the Git Data API.
+
+    Blobs are created concurrently, then one tree on top of the branch head, one commit,
+    and the branch ref is moved with force=false. When another commit landed meanwhile
+    (422, not a fast-forward) the tree and commit are rebuilt on the new head.
+    """
+
+    def __init__(self, api: GitAPI, branch: str = "main", attempts: int = 3):
+        self.api = api
+        self.branch = branch
+        self.attempts = attempts
+        self.changes: Dict[str, Tuple[str, Optional[str]]] = {}
+        # Changes dropped by a partial commit because they cannot apply on the head
+        self.rejected: Dict[str, GitError] = {}
+
+    def add(self, path: str, content: str) -> "CommitBuilder":
+        self.changes[path.strip('/')] = (ADD, content)
+        return self
+
+    def modify(self, path: str, content: str) -> "CommitBuilder":
+        self.changes[path.strip('/')] = (MODIFY, content)
+        return self
+
+    def delete(self, path: str) -> "CommitBuilder":
+        self.changes[path.strip('/')] = (DELETE, None)
+        return self
+
+    async def _head(self) -> str:
+        ref = await self.api._send("GET", f"/git/ref/heads/{self.branch}")
+        return ref["object"]["sha"]
+
+    async def _existing_paths(self, head: str) -> set:
+        """
+        Paths of staged changes that exist at head, from the tree of each parent directory.
+        The contents API lists at most 1000 entries per directory, a tree up to 100,000.
+        """
+        parents: Dict[str, List[str]] = {}
+        for path in self.changes:
+            parents.setdefault(posixpath.dirname(path), []).append(path)
+
+        async def exists(path: str) -> bool:
+            try:
+                await self.api._cached_get(f"/contents/{path}?ref={head}")
+            except GitError as e:
+                if e.status_code == 404:
+                    return False
+                raise
+            return True
+
+        async def list_parent(parent: str, staged: List[str]) -> List[str]:
+            try:
+                # head:parent names the directory's tree at an immutable commit, so the response cache serves repeats
+                listing = await self.api._cached_get(f"/git/trees/{head}:{parent}" if parent else f"/git/trees/{head}")
+            except GitError as e:
+                if e.status_code == 404:
+                    return []
+                raise
+            if listing.get("truncated"):
+                # Even the tree is too large to list whole, look the staged paths up one by one
+                found = await asyncio.gather(*(exists(path) for path in staged))
+                return [path for path, ok in zip(staged, found) if ok]
+            return [posixpath.join(parent, entry["path"]) for entry in listing.get("tree", [])]
+
+        listings = await asyncio.gather(*(list_parent(parent, staged) for parent, staged in parents.items()))
+        return {path for paths in listings for path in paths}
+
+    async def validate(self, head: str) -> Dict[str, GitError]:
+        """Staged changes that cannot be applied on head, by path."""
+        existing = await self._existing_paths(head)
+        errors = {}
+
+        for path, (op, _) in self.changes.items():
+            if op == ADD and path in existing:
+                errors[path] = GitError(status_code=422, detail=f"Git path (repo or file) already exists: {path}")
+            elif op != ADD and path not in existing:
+                errors[path] = GitError(status_code=404, detail=f"Git path (repo or file) not found: {path}")
+
+        return errors
+
+    async def _create_blob(self, content: str) -> str:
+        payload = {
+            "content": base64.b64encode(content.encode('utf-8')).decode('utf-8'),
+            "encoding": "base64",
+        }
+        blob = await self.api._send("POST", "/git/blobs", json=payload)
+        return blob["sha"]
+
+    async def commit(self, message: str, partial: bool = False) -> Optional[str]:
+        """
+        Push all staged changes as one commit and return its sha.
+        With partial=True changes that cannot apply are moved to `rejected` instead of failing
+        the whole commit, and None is returned when none are left.
+        """
+        if not self.changes:
+            raise GitError(status_code=422, detail="Nothing staged to commit.")
+
+        writes = [path for path, (op, _) in self.changes.items() if op != DELETE]
+        shas = await asyncio.gather(*(self._create_blob(self.changes[path][1]) for path in writes))
+        blobs = dict(zip(writes, shas))
+
+        for attempt in range(self.attempts):
+            head = await self._head()
+
+            errors = await self.validate(head)
+            if errors and not partial:
+                raise next(iter(errors.values()))
+            for path, error in errors.items():
+                del self.changes[path]
+                self.rejected[path] = error
+            if not self.changes:
+                return None
+
+            tree = [
+                {"path": path, "mode": "100644", "type": "blob", "sha": blobs.get(path)}
+                for path in self.changes
+            ]
+
+            parent = await self.api._send("GET", f"/git/commits/{head}")
+            new_tree = await self.api._send(
+                "POST", "/git/trees", json={"base_tree": parent["tree"]["sha"], "tree": tree}
+            )
+            commit = await self.api._send(
+                "POST", "/git/commits", json={"message": message, "tree": new_tree["sha"], "parents": [head]}
+            )
+
+            try:
+                await self.api._send(
+                    "PATCH", f"/git/refs/heads/{self.branch}", json={"sha": commit["sha"], "force": False}
+                )
+            except GitError as e:
+                if e.status_code != 422 or attempt == self.attempts - 1:
+                    raise
+                logger.debug(f"{self.branch} moved while committing, rebuilding on the new head")
+                continue
+
+            for path in self.changes:
+                self.api._remember_sha(path, blobs.get(path))
+            return commit["sha"]
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import time
+from contextvars import ContextVar
+from typing import Dict, Mapping, Optional
+
+from loguru import logger
+from prometheus_client import Counter, Gauge
+
+from ..utils import config
+
+USER = "user"
+BACKGROUND = "background"
+
+# Background loops (schema polling, index refresh) set this to BACKGROUND for their task
+request_priority: ContextVar[str] = ContextVar("request_priority", default=USER)
+
+RATE_LIMIT_REMAINING = Gauge(
+    "github_rate_limit_remaining",
+    "Requests left in the current GitHub rate limit window per token",
+    ["token"],
+)
+RATE_LIMIT_LIMIT = Gauge(
+    "github_rate_limit_limit",
+    "Size of the GitHub rate limit window per token",
+    ["token"],
+)
+RATE_LIMIT_RESET = Gauge(
+    "github_rate_limit_reset_timestamp",
+    "Unix time at which the GitHub rate limit window of a token resets",
+    ["token"],
+)
+PACED_SECONDS = Counter(
+    "github_rate_limit_paced_seconds_total",
+    "Time background requests were delayed to preserve a token's rate limit",
+    ["token"],
+)
+
+
+def token_fingerprint(token: str) -> str:
+    """Short non-reversible id of a token, safe to use as a metric label."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:8]
+
+
+class RateLimitScheduler:
+    """
+    Tracks the GitHub rate limit of one token from the X-RateLimit-* headers of its responses.
+
+    User-facing calls are never delayed. Background calls are spread evenly over the rest of
+    the window once less than half of it is left, and held until the reset once only the
+    reserved share (kept for user-facing writes) remains.
+    """
+
+    def __init__(self, token_id: str, reserve_ratio: float):
+        self.token_id = token_id
+        self.reserve_ratio = reserve_ratio
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._next_background = 0.0
+
+    def record(self, headers: Mapping[str, str]) -> None:
+        try:
+            limit = int(headers["x-ratelimit-limit"])
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset_at = float(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+
+        self.limit, self.remaining, self.reset_at = limit, remaining, reset_at
+        RATE_LIMIT_LIMIT.labels(token=self.token_id).set(limit)
+        RATE_LIMIT_REMAINING.labels(token=self.token_id).set(remaining)
+        RATE_LIMIT_RESET.labels(token=self.token_id).set(reset_at)
+
+    def background_delay(self, reserve: bool = True) -> float:
+        """Seconds the next background call should wait, reserving the slot it is given unless `reserve` is False."""
+        if self.remaining is None or self.reset_at is None:
+            return 0.0
+
+        now = time.time()
+        window_left = self.reset_at - now
+        if window_left <= 0:
+            return 0.0
+
+        spare = self.remaining - int(self.limit * self.reserve_ratio)
+        if spare <= 0:
+            return window_left
+
+        if self.remaining > self.limit / 2:
+            return 0.0
+
+        monotonic = time.monotonic()
+        slot = max(monotonic, self._next_background)
+        if reserve:
+            self._next_background = slot + window_left / spare
+        return slot - monotonic
+
+    async def acquire(self) -> None:
+        """Pace the call according to the current task's request_priority."""
+        if request_priority.get() != BACKGROUND:
+            return
+
+        delay = self.background_delay()
+        if delay <= 0:
+            return
+
+        logger.debug(
+            f"GitHub token {self.token_id} has {self.remaining}/{self.limit} requests left, "
+            f"delaying background call by {delay:.1f}s"
+        )
+        PACED_SECONDS.labels(token=self.token_id).inc(delay)
+        await asyncio.sleep(delay)
+
+
+_schedulers: Dict[str, RateLimitScheduler] = {}
+
+
+def get_scheduler(token: str) -> RateLimitScheduler:
+    """Return the shared scheduler of a token, all clients using the same token share its budget."""
+    token_id = token_fingerprint(token)
+    scheduler = _schedulers.get(token_id)
+    if scheduler is None:
+        scheduler = RateLimitScheduler(
+            token_id,
+            reserve_ratio=config.GIT_RATE_LIMIT_RESERVE_RATIO,
+        )
+        _schedulers[token_id] = scheduler
+    return scheduler
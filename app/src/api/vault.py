@@ -2,6 +2,7 @@ import httpx
 from fastapi.responses import JSONResponse
 
 from ...general.database.basic_api import BaseAPI
+from ...general.database.circuit_breaker import get_breaker
 from ..errors.external_service import ExternalServiceError
 
 
@@ -28,6 +29,7 @@ def handle_response(response: httpx.Response) -> None:
             raise VaultError(
                 status_code=response.status_code,
                 detail=f"Vault message: {errors}",
+                headers=response.headers,
             )
 
 
@@ -42,7 +44,7 @@ def generate_metadata_path(path: str) -> str:
 class VaultAPI:
     def __init__(self, base_url: str, token: str):
         headers = {"X-Vault-Token": token, "Content-Type": "application/json"}
-        self.api = BaseAPI(base_url.rstrip("/"), headers=headers)
+        self.api = BaseAPI(base_url.rstrip("/"), headers=headers, upstream="vault", breaker=get_breaker("vault"))
 
     async def read_secret(self, path: str) -> JSONResponse:
         try:
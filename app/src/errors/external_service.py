@@ -1,7 +1,9 @@
 class ExternalServiceError(Exception):
-    def __init__(self, service_name, status_code=None, detail=None):
+    def __init__(self, service_name, status_code=None, detail=None, headers=None):
         # Initialize the error with a service name, message, status code, and optional details
         self.error = f"Request to {service_name} failed."
         self.status_code = status_code
         self.detail = detail
-        super().__init__(self.detail)
\ No newline at end of file
+        # Response headers of the failed call, used to honour Retry-After / rate limit hints
+        self.headers = dict(headers or {})
+        super().__init__(self.detail)
@@ -1,8 +1,10 @@
+import math
 from fastapi import Request, HTTPException, FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from loguru import logger
 from app.general.models import ExceptionHandlerConfig
+from app.general.database.errors import UpstreamUnavailableError
 from ..errors.external_service import ExternalServiceError
 from typing import Type
 
@@ -25,12 +27,15 @@ async def external_services_exception_handler(
         exc: ExternalServiceError
 ) -> JSONResponse:
     logger.info(f"Request to {exc.service_name} Failed. Error: {exc.error}. Detail: {exc.detail}. Response status code: {exc.status_code}.")
+    # Locally refused calls (e.g. overloaded upstream) carry their own status, upstream failures are 502
+    retry_after = getattr(exc, "retry_after", None)
     return JSONResponse(
-        status_code=502,
+        status_code=getattr(exc, "response_status_code", 502),
         content={
             "error": exc.error,
             "detail": exc.detail
-        }
+        },
+        headers={"Retry-After": str(math.ceil(retry_after))} if retry_after else None
     )
 
 
@@ -71,6 +76,10 @@ handlers = [
         exception_class=ExternalServiceError,
         handler=external_services_exception_handler
     ),
+    ExceptionHandlerConfig(
+        exception_class=UpstreamUnavailableError,
+        handler=external_services_exception_handler
+    ),
     ExceptionHandlerConfig(
         exception_class=Exception,
         handler=unhandled_exception_handler
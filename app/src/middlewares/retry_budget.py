@@ -0,0 +1,18 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from ..services import RetryBudget, retry_budget
+from ..utils import config
+
+
+class RetryBudgetMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        """
+        Give every inbound request one retry budget shared by all of its upstream calls,
+        so a request chaining several Git/ArgoCD/Vault calls cannot multiply retries.
+        """
+        token = retry_budget.set(RetryBudget(config.RETRY_BUDGET_PER_REQUEST))
+        try:
+            return await call_next(request)
+        finally:
+            retry_budget.reset(token)
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class AppSummary(BaseModel):
+    cluster: str
+    namespace: str
+    name: str
+    sha: str = Field(..., description="Git blob sha of the app's values file")
+    size: Optional[int] = Field(
+        None,
+        description="Size of the values file in bytes, null when changed outside this service since the last full index build"
+    )
+
+
+class AppsPage(BaseModel):
+    items: List[AppSummary]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor to pass as `cursor` for the next page, null on the last page"
+    )
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+from .resource_metadata import ResourceMetadata
+from ..utils import config
+
+
+class BatchGetRequest(BaseModel):
+    apps: List[ResourceMetadata] = Field(
+        ...,
+        max_length=config.BATCH_GET_MAX_ITEMS,
+        description="Apps whose configuration should be returned"
+    )
+
+
+class BatchGetError(BaseModel):
+    status_code: int
+    detail: str
+
+
+class BatchGetItem(BaseModel):
+    cluster: str
+    namespace: str
+    name: str
+    config: Optional[Any] = Field(
+        None,
+        description="The app's values file, null when it could not be read"
+    )
+    error: Optional[BatchGetError] = Field(
+        None,
+        description="Why the app's configuration could not be read"
+    )
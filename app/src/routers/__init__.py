@@ -1,11 +1,13 @@
 import asyncio
+import time
 
 from fastapi import FastAPI
+from loguru import logger
 
 from .generator import RouterGenerator
 from ..utils import resources_config
 from ..schemas.loader import SchemaLoader
-from ..services.git import Git
+from ..services.git import create_git
 from ..services.argocd import ArgoCD
 from ..services.vault import Vault
 from ..utils import config as cfg
@@ -15,17 +17,38 @@ async def generate_router(app):
     argocd = ArgoCD(cfg.ARGOCD_URL, cfg.ARGOCD_TOKEN, cfg.APPLICATION_SET_TIMEOUT)
     vault = Vault(cfg.VAULT_URL, cfg.VAULT_TOKEN)
     team_name = cfg.TEAM_NAME
-    for resource in resources_config:
+
+    async def init_resource(resource):
+        started = time.perf_counter()
         config = resources_config[resource]
-        schemas_git = Git(config["SCHEMAS_REPO_URL"], config["SCHEMAS_ACCESS_TOKEN"])
-        await schemas_git.async_init()
+        schemas_git = create_git(config["SCHEMAS_REPO_URL"], config["SCHEMAS_ACCESS_TOKEN"])
+        values_git = create_git(config["VALUES_REPO_URL"], config["VALUES_ACCESS_TOKEN"])
+        await asyncio.gather(schemas_git.async_init(), values_git.async_init())
+        git_ready = time.perf_counter()
+
         schema_manager = SchemaLoader(resource, schemas_git, app)
-        values_git = Git(config["VALUES_REPO_URL"], config["VALUES_ACCESS_TOKEN"])
-        await values_git.async_init()
         hooks_mapping = config.get("HOOKS") or {}
         rg = RouterGenerator(app, resource, values_git, schema_manager, argocd, vault, team_name, hooks_mapping)
-        await rg.run()
+        await rg.prepare()
+
+        logger.info(
+            f"Initialized {resource}: git {git_ready - started:.2f}s, "
+            f"catalog and schemas {time.perf_counter() - git_ready:.2f}s"
+        )
+        return rg
 
+    started = time.perf_counter()
+    # Resources are independent, only route registration below keeps the configured order
+    generators = await asyncio.gather(*(init_resource(resource) for resource in resources_config))
+    prepared = time.perf_counter()
+
+    for rg in generators:
+        await rg.generate_routes()
         app.state.router_generators.append(rg)
 
+    logger.info(
+        f"Initialized {len(generators)} resources in {time.perf_counter() - started:.2f}s: "
+        f"prepare {prepared - started:.2f}s, routes {time.perf_counter() - prepared:.2f}s"
+    )
+
     return app
@@ -1,18 +1,28 @@
 import asyncio
+import base64
+import json
 import yaml
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, Query
 from typing import List
 from fastapi.openapi.utils import get_openapi
 from fastapi.routing import APIRoute
 from starlette.responses import JSONResponse
 from ..models.remove_check import RemoveCheckRequest, RemoveCheckResponse
+from ..models.apps_list import AppsPage, AppSummary
+from ..models.batch_get import BatchGetRequest, BatchGetItem, BatchGetError
 from ..schemas import schema_to_model
 import re
 from loguru import logger
 from app.src.models.resource_metadata import ResourceMetadata
 from ..services.argocd import build_app_name
+from ..services.catalog import CatalogIndex, split_values_path, blob_sha
+from ..services.config_cache import ConfigCache
+from ..services.webhooks import SyncTrigger
+from ..services.sync_scheduler import SyncScheduler, SyncJob
+from ..api.git import GitError
 from ..utils import config as cfg
 from app.general.utils import basicSettings
+from app.general.utils.deadline import with_deadline
 import inspect
 from app.hooks import HOOK_REGISTRY
 
@@ -95,6 +105,13 @@ class RouterGenerator:
         # Initialize team name once (provided by caller)
         self.team_name = team_name
         self.namespaces_clusters_map = dict()
+        self.catalog = CatalogIndex(resource, git)
+        self.config_cache = ConfigCache(resource, cfg.CONFIG_CACHE_MAX_ENTRIES, cfg.CONFIG_CACHE_TTL)
+        self.catalog.listeners.append(self.config_cache.invalidate)
+        self.catalog.rebuild_listeners.append(self.config_cache.clear)
+        # Fired by push webhooks, polling stays as a fallback
+        self.schemas_changed = SyncTrigger()
+        self.values_changed = SyncTrigger()
         # Mapping of event -> function name and resolved callables via registry
         self.hooks_map = hooks_mapping or {}
         self.hooks_funcs = {evt: HOOK_REGISTRY.get(fn_name) for evt, fn_name in self.hooks_map.items()}
@@ -105,10 +122,17 @@ class RouterGenerator:
             raise ValueError(f"Hook function(s) not found for events: {', '.join(missing)}. Ensure functions exist under app/hooks and are imported.")
 
     async def run(self):
-        await self.create_namespaces_clusters_map()
-        await self.schema_manager.load_all_schemas()
+        await self.prepare()
         await self.generate_routes()
 
+    async def prepare(self):
+        """Load everything routes are generated from, the catalog and the schemas concurrently."""
+        await asyncio.gather(
+            self.catalog.build(),
+            self.create_namespaces_clusters_map(),
+            self.schema_manager.load_all_schemas(),
+        )
+
     async def _run_hook(self, event: str, context: dict) -> dict:
         """Run hook by event name and merge returned updates into context.
         Returns the possibly updated context.
@@ -131,6 +155,8 @@ class RouterGenerator:
                 await self.argocd.get_app_values(f"{cluster}-cluster-secret")
             ) or {}
             raw_namespaces = cluster_secret_values.get("namespaces")
+            # Only the cluster secret: create adds any namespace missing from it, even one
+            # the values repo already has apps in (listing uses catalog.namespaces instead)
             namespaces = _namespaces_to_list(raw_namespaces)
             clusters_map[cluster] = namespaces
         self.namespaces_clusters_map = clusters_map
@@ -155,7 +181,28 @@ class RouterGenerator:
             methods=["GET"],
             name=f"get apps statuses for {self.resource}",
             description=f"Given cluster, namesapace, applicationName as params. Returns app status.",
-            tags=["get status"]
+            tags=["get status"],
+            operation="status",
+        )
+
+        self._safe_add_api_route(
+            "/apps",
+            self._make_list_apps_handler(),
+            methods=["GET"],
+            name=f"list {self.resource} apps",
+            description=f"Lists provisioned {self.resource} apps, optionally filtered by cluster and namespace. Paginated with an opaque cursor.",
+            tags=["list apps"],
+            operation="read",
+        )
+
+        self._safe_add_api_route(
+            "/batch-get",
+            self._make_batch_get_handler(),
+            methods=["POST"],
+            name=f"batch get {self.resource} configurations",
+            description=f"Given a list of cluster, namespace and app name. Returns each related {self.resource} configuration or its error.",
+            tags=["provision"],
+            operation="read",
         )
 
         self._safe_add_api_route(
@@ -164,7 +211,8 @@ class RouterGenerator:
             methods=["POST"],
             name=f"can-remove schemas for {self.resource}",
             description="Given a list of schema names, validates if each can be safely removed",
-            tags=["can-remove"]
+            tags=["can-remove"],
+            operation="read",
         )
 
         self._safe_add_api_route(
@@ -173,7 +221,8 @@ class RouterGenerator:
             methods=["DELETE"],
             name=f"Uninstall specific {self.resource}",
             description=f"Given a cluster, a namespace and an app name. Deleting related {self.resource}.",
-            tags=[f"delete {self.resource}"]
+            tags=[f"delete {self.resource}"],
+            operation="delete",
         )
 
         self._safe_add_api_route(
@@ -182,10 +231,51 @@ class RouterGenerator:
             methods=["GET"],
             name=f"Get specific {self.resource} configuration.",
             tags=["provision"],
-            description=f"Given a cluster, a namespace and an app name. Returns related {self.resource} configuration."
+            description=f"Given a cluster, a namespace and an app name. Returns related {self.resource} configuration.",
+            operation="read",
         )
 
 
+    def _make_list_apps_handler(self):
+
+        async def handler(
+                cluster: Optional[str] = None,
+                namespace: Optional[str] = None,
+                limit: int = Query(100, ge=1, le=1000),
+                cursor: Optional[str] = None,
+        ) -> AppsPage:
+
+            after = None
+            if cursor:
+                try:
+                    after = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+                except (ValueError, TypeError):
+                    after = None
+                if not (isinstance(after, list) and len(after) == 3 and all(isinstance(k, str) for k in after)):
+                    raise HTTPException(status_code=400, detail="Invalid cursor")
+                after = tuple(after)
+
+            # Served from the catalog index only, never from Git
+            items, more = self.catalog.page(cluster, namespace, after, limit)
+
+            next_cursor = None
+            if more:
+                last = items[-1]
+                next_cursor = base64.urlsafe_b64encode(
+                    json.dumps([last.cluster, last.namespace, last.name]).encode()
+                ).decode()
+
+            return AppsPage(
+                items=[
+                    AppSummary(cluster=a.cluster, namespace=a.namespace, name=a.name, sha=a.sha, size=a.size)
+                    for a in items
+                ],
+                next_cursor=next_cursor,
+            )
+
+        return handler
+
+
     def _make_delete_resource_handler(self):
 
         async def handler(params: ResourceMetadata = Depends()):
@@ -209,7 +299,10 @@ class RouterGenerator:
             app_name = ctx.get("app_name") or build_app_name(cluster, namespace, name, self.resource)
 
             # 1) Delete file from git
+            self._check_exists(path)
             await self.git.delete_file(path, commit_message=f"delete {self.resource} {name} in {cluster}/{namespace}")
+            self.catalog.record_delete(path)
+            self.config_cache.invalidate(path)
 
             # 2) Sync application
             logger.info(
@@ -230,30 +323,62 @@ class RouterGenerator:
         return handler
 
 
+    async def _read_configuration(self, cluster, namespace, name):
+        ctx = {
+            "resource": self.resource,
+            "operation": "read",
+            "cluster": cluster,
+            "namespace": namespace,
+            "name": name,
+        }
+        ctx["path"] = f'/{ctx["cluster"]}/{ctx["namespace"]}/{ctx["name"]}.yaml'
+        ctx = await self._run_hook("pre_read_hook", ctx)
+        cluster = ctx.get("cluster", cluster)
+        namespace = ctx.get("namespace", namespace)
+        name = ctx.get("name", name)
+        path = ctx.get("path") or f'/{cluster}/{namespace}/{name}.yaml'
+
+        self._check_exists(path)
+        cfg = await self._get_content(path)
+
+        ctx.update({"config": cfg})
+        ctx = await self._run_hook("post_read_hook", ctx)
+        return ctx.get("config", cfg)
+
+
     def _make_get_resource_configuration_handler(self):
 
         async def handler(params: ResourceMetadata = Depends()):
+            return await self._read_configuration(params.cluster, params.namespace, params.name)
+
+        return handler
 
-            cluster, namespace, name = params.cluster, params.namespace, params.name
-            ctx = {
-                "resource": self.resource,
-                "operation": "read",
-                "cluster": cluster,
-                "namespace": namespace,
-                "name": name,
-            }
-            ctx["path"] = f'/{ctx["cluster"]}/{ctx["namespace"]}/{ctx["name"]}.yaml'
-            ctx = await self._run_hook("pre_read_hook", ctx)
-            cluster = ctx.get("cluster", cluster)
-            namespace = ctx.get("namespace", namespace)
-            name = ctx.get("name", name)
-            path = ctx.get("path") or f'/{cluster}/{namespace}/{name}.yaml'
 
-            cfg = await self.git.get_file_content(path)
+    def _make_batch_get_handler(self):
 
-            ctx.update({"config": cfg})
-            ctx = await self._run_hook("post_read_hook", ctx)
-            return ctx.get("config", cfg)
+        async def handler(body: BatchGetRequest) -> List[BatchGetItem]:
+            semaphore = asyncio.Semaphore(cfg.BATCH_GET_CONCURRENCY)
+
+            async def read(key):
+                cluster, namespace, name = key
+                async with semaphore:
+                    try:
+                        config = await self._read_configuration(cluster, namespace, name)
+                    except Exception as e:  # noqa: BLE001
+                        return BatchGetItem(
+                            cluster=cluster, namespace=namespace, name=name,
+                            error=BatchGetError(
+                                status_code=getattr(e, "status_code", None) or 500,
+                                detail=str(getattr(e, "detail", None) or e),
+                            ),
+                        )
+                return BatchGetItem(cluster=cluster, namespace=namespace, name=name, config=config)
+
+            # Each distinct app is read once, duplicates share the result
+            keys = list(dict.fromkeys((a.cluster.value, a.namespace, a.name) for a in body.apps))
+            results = dict(zip(keys, await asyncio.gather(*(read(key) for key in keys))))
+
+            return [results[(a.cluster.value, a.namespace, a.name)] for a in body.apps]
 
         return handler
 
@@ -286,7 +411,8 @@ class RouterGenerator:
             yaml_data = ctx.get("yaml_data", yaml_data)
             secrets = ctx.get("secrets", secrets)
 
-            current_data = await self.git.get_file_content(path)
+            self._check_exists(path)
+            current_data = await self._get_content(path)
 
             if yaml_data_equals(current_data, yaml_data):
                 return JSONResponse(
@@ -296,6 +422,7 @@ class RouterGenerator:
 
             commit_message = f"modify {self.resource} for {app_name} in {cluster} on {namespace}"
             await self.git.modify_file(path, commit_message ,yaml_data)
+            self._record_write(path, yaml_data)
 
             # Also write provided secrets to Vault
             if secrets:
@@ -343,7 +470,8 @@ class RouterGenerator:
             methods=["POST"],
             name=f"provision_{self.resource}_{version}",
             description=f"Given values in request body. Provisions {self.resource}.",
-            tags=["provision"]
+            tags=["provision"],
+            operation="create",
         )
 
         self._safe_add_api_route(
@@ -352,7 +480,8 @@ class RouterGenerator:
             methods=["GET"],
             name=f"get {self.resource} {version}'s schema",
             description="Returns the version's schema",
-            tags=["get version schema"]
+            tags=["get version schema"],
+            operation="read",
         )
 
         self._safe_add_api_route(
@@ -361,7 +490,8 @@ class RouterGenerator:
             methods=["PATCH"],
             name=f"Modify specific {self.resource}",
             tags=["provision"],
-            description=f"Given a cluster, a namespace and an app name. Updating related {self.resource} configuration."
+            description=f"Given a cluster, a namespace and an app name. Updating related {self.resource} configuration.",
+            operation="update",
         )
 
 
@@ -438,7 +568,9 @@ class RouterGenerator:
 
             app_name = build_app_name(cluster, namespace, name, self.resource)
 
+            self._check_absent(path)
             await self.git.add_file(path, f"Create {self.resource} in {cluster=} on {namespace=} for {app_name=}" ,yaml_data)
+            self._record_write(path, yaml_data)
 
             # Also write provided secrets to Vault
             if secrets:
@@ -494,6 +626,36 @@ class RouterGenerator:
         return handler
 
 
+    def _check_exists(self, path):
+        """Answer missing apps from the catalog index instead of a Git round trip."""
+        key = split_values_path(path)
+        if self.catalog.ready and key and not self.catalog.exists(*key):
+            raise GitError(status_code=404, detail=f"Git path (repo or file) not found: {path}")
+
+
+    async def _get_content(self, path):
+        """Values file content, from the config cache when it still matches the catalog's blob sha."""
+        key = split_values_path(path)
+        entry = self.catalog.get(*key) if key and self.catalog.ready else None
+
+        content = self.config_cache.get(path, entry.sha if entry else None)
+        if content is None:
+            content = await self.git.get_file_content(path)
+            self.config_cache.put(path, content, blob_sha(content))
+        return content
+
+
+    def _record_write(self, path, content):
+        self.catalog.record_write(path, content)
+        self.config_cache.put(path, content, blob_sha(content))
+
+
+    def _check_absent(self, path):
+        key = split_values_path(path)
+        if self.catalog.ready and key and self.catalog.exists(*key):
+            raise GitError(status_code=422, detail="Git path (repo or file) already exists.")
+
+
     def get_model(self, version):
         schema = self.schema_manager.resolved_schemas.get(version)["schema"]
         if not schema:
@@ -505,44 +667,54 @@ class RouterGenerator:
         return self.models[model_name]
 
 
-    async def sync_schemas(self):
-        schema_poller_interval = cfg.SCHEMA_POLLER_INTERVAL
-        while True:
-            try:
-                changed_versions = await self.schema_manager.sync_schemas(schema_poller_interval)
-                await asyncio.sleep(0)
-
-                for version in changed_versions:
-
-                    path = f"/{version}"
-                    definition_path = f"{path}/definition"
-
-                    self.app.router.routes = [
-                        r for r in self.app.router.routes
-                        if not (
-                            isinstance(r, APIRoute)
-                            and r.path in {
-                                f"/v1/{self.resource}/{path.lstrip('/')}",
-                                f"/v1/{self.resource}/{definition_path.lstrip('/')}"
-                            }
-                        )
-                    ]
-
-                    model_name = f"{self.resource}_{version}_Model"
-                    if model_name in self.models:
-                        del self.models[model_name]
+    def register_sync_jobs(self, scheduler: SyncScheduler) -> None:
+        webhooks = bool(cfg.GITHUB_WEBHOOK_SECRET)
+        scheduler.add(SyncJob(
+            self.resource, "schemas", self.refresh_schemas,
+            interval=cfg.WEBHOOK_FALLBACK_INTERVAL if webhooks else cfg.SCHEMA_POLLER_INTERVAL,
+            trigger=self.schemas_changed,
+            max_factor=cfg.SYNC_MAX_INTERVAL_FACTOR,
+            rate_limit=self.schema_manager.git.rate_limit,
+        ))
+        scheduler.add(SyncJob(
+            self.resource, "catalog", self.catalog.refresh,
+            interval=cfg.WEBHOOK_FALLBACK_INTERVAL if webhooks else cfg.CATALOG_REFRESH_INTERVAL,
+            trigger=self.values_changed,
+            max_factor=cfg.SYNC_MAX_INTERVAL_FACTOR,
+            rate_limit=self.git.rate_limit,
+        ))
+
+
+    async def refresh_schemas(self) -> bool:
+        """Apply schema changes and regenerate the routes of impacted versions, True when schemas changed."""
+        changed_versions = await self.schema_manager.sync_once()
+        if changed_versions is None:
+            return False
+
+        for version in changed_versions:
+
+            path = f"/{version}"
+            definition_path = f"{path}/definition"
+
+            self.app.router.routes = [
+                r for r in self.app.router.routes
+                if not (
+                    isinstance(r, APIRoute)
+                    and r.path in {
+                        f"/v1/{self.resource}/{path.lstrip('/')}",
+                        f"/v1/{self.resource}/{definition_path.lstrip('/')}"
+                    }
+                )
+            ]
 
-                await self.generate_routes()
+            model_name = f"{self.resource}_{version}_Model"
+            if model_name in self.models:
+                del self.models[model_name]
 
-                self.update_openapi_schema()
+        await self.generate_routes()
 
-            except asyncio.CancelledError:
-                logger.info(f"Schema syncer for {self.resource} cancelled. Exiting loop.")
-                raise
-            except Exception as e:
-                logger.error(f"Schema syncer error for {self.resource}: {e}")
-                # Back off before retrying to avoid tight error loops
-                await asyncio.sleep(schema_poller_interval) 
+        self.update_openapi_schema()
+        return True
 
 
     def _safe_add_api_route(
@@ -552,7 +724,8 @@ class RouterGenerator:
             methods: list[str],
             description: str,
             name: str,
-            tags: list[str]
+            tags: list[str],
+            operation: str = "read",
     ):
         actual_path = f"/v1/{self.resource}/{path.lstrip('/')}"
 
@@ -574,6 +747,10 @@ class RouterGenerator:
                 name=name,
                 description=description,
                 tags=tags,
+                # Time budget shared by every upstream call and retry the handler makes
+                dependencies=[Depends(with_deadline(
+                    cfg.REQUEST_DEADLINES.get(operation, cfg.DEFAULT_REQUEST_DEADLINE)
+                ))],
             )
 
 
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Header, HTTPException, Request
+from loguru import logger
+from typing import Optional
+
+from ..services.webhooks import repo_full_name, verify_signature
+from ..utils import config as cfg
+
+webhook_router = APIRouter(prefix="/v1/webhooks", tags=["webhooks"])
+
+
+@webhook_router.post("/github", status_code=202, description="GitHub push webhook, syncs the resources whose schemas or values repo changed.")
+async def github_webhook(
+        request: Request,
+        x_hub_signature_256: Optional[str] = Header(default=None),
+        x_github_event: Optional[str] = Header(default=None),
+):
+    body = await request.body()
+    if not verify_signature(cfg.GITHUB_WEBHOOK_SECRET, body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature.")
+
+    if x_github_event != "push":
+        return {"triggered": []}
+
+    payload = await request.json()
+    # Only the branch the services read and write
+    if payload.get("ref") != "refs/heads/main":
+        return {"triggered": []}
+
+    repo = (payload.get("repository") or {}).get("full_name", "").lower()
+    triggered = []
+    for rg in getattr(request.app.state, "router_generators", []):
+        if repo_full_name(rg.schema_manager.git.base_url) == repo:
+            rg.schemas_changed.fire()
+            triggered.append(f"{rg.resource}:schemas")
+        if repo_full_name(rg.git.base_url) == repo:
+            rg.values_changed.fire()
+            triggered.append(f"{rg.resource}:values")
+
+    logger.info(f"Push to {repo} triggered sync of {triggered or 'nothing'}")
+    return {"triggered": triggered}
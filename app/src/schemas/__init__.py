@@ -1,10 +1,64 @@
+import weakref
 from pydantic import BaseModel, create_model, Field, HttpUrl
-from typing import Any, Dict, List, Union, Optional, Literal, get_args
+from typing import Any, Dict, List, Union, Optional, Literal, Tuple, get_args
+from prometheus_client import Counter, Gauge
+from .resolver import intern_schema
+
+# (model name, schema digest, required or None for nested models) -> model class.
+# Classes go away once no route or parent model uses them anymore.
+_models: "weakref.WeakValueDictionary[Tuple, type[BaseModel]]" = weakref.WeakValueDictionary()
+
+SCHEMA_MODELS = Gauge(
+    "schema_models",
+    "Pydantic model classes built from schemas and still in use, shared ones counted once",
+)
+SCHEMA_MODELS.set_function(lambda: len(_models))
+SCHEMA_MODEL_LOOKUPS = Counter(
+    "schema_model_lookups_total",
+    "Model factory lookups (hit, miss)",
+    ["result"],
+)
+
+
+def _cached_model(key: Tuple, build) -> type[BaseModel]:
+    model = _models.get(key)
+    if model is not None:
+        SCHEMA_MODEL_LOOKUPS.labels(result="hit").inc()
+        return model
+
+    SCHEMA_MODEL_LOOKUPS.labels(result="miss").inc()
+    model = build()
+    _models[key] = model
+    return model
+
 
 def schema_to_model(
     name: str,
     schema: Dict[str, Any],
     required: Optional[List[str]] = None
+) -> type[BaseModel]:
+    """
+    Pydantic model of an object schema, cached by the schema's content digest.
+    The top-level model keeps its name; nested object models are named after the
+    property and the sub-schema's digest, and shared by every schema of any version
+    or resource that contains the same property.
+    """
+    schema = intern_schema(schema)
+    key = (name, schema.digest, tuple(sorted(required)) if required is not None else None)
+    return _cached_model(key, lambda: _build_model(name, schema, required))
+
+
+def _nested_model(prop_name: str, schema: Dict[str, Any]) -> type[BaseModel]:
+    # Named after its content, not the schema it was first built for: the name is the
+    # same in every resource's OpenAPI document and different classes never share one
+    name = f"{prop_name.capitalize()}_{schema.digest[1:13]}"
+    return _cached_model((name, schema.digest, None), lambda: _build_model(name, schema))
+
+
+def _build_model(
+    name: str,
+    schema: Dict[str, Any],
+    required: Optional[List[str]] = None
 ) -> type[BaseModel]:
     required = set(required or schema.get("required", []))
     properties = schema.get("properties", {})
@@ -36,8 +90,7 @@ def schema_to_model(
             item_type = schema_to_type(prop_schema["items"])
             field_type = List[item_type]
         elif prop_schema.get("type") == "object":
-            sub_model_name = f"{name}_{prop_name.capitalize()}"
-            field_type = schema_to_model(sub_model_name, prop_schema)
+            field_type = _nested_model(prop_name, prop_schema)
 
         fields[prop_name] = (
             field_type,
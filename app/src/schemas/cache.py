@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+BUNDLE_FORMAT = 1
+
+
+class SchemaBundleCache:
+    """
+    Raw and resolved schemas of one schemas repo, persisted as a single JSON bundle
+    together with the commit sha they were loaded at, so a restart can skip GitHub.
+    """
+
+    def __init__(self, path: str, repo: Optional[str]):
+        self.path = path
+        # None accepts a bundle of any repo, e.g. one compiled offline and configured explicitly
+        self.repo = repo
+
+    @classmethod
+    def for_resource(cls, directory: str, resource: str, repo: str) -> "SchemaBundleCache":
+        digest = hashlib.sha256(repo.encode("utf-8")).hexdigest()[:12]
+        return cls(os.path.join(directory, f"{resource}-{digest}.json"), repo)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The stored bundle ({sha, schemas, resolved}), None when missing, unreadable or for another repo."""
+        try:
+            with open(self.path, "rb") as f:
+                bundle = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable schema cache {self.path}: {e}")
+            return None
+
+        if bundle.get("format") != BUNDLE_FORMAT or self.repo not in (None, bundle.get("repo")):
+            return None
+        return bundle
+
+    def save(self, sha: str, schemas: Dict[str, Any], resolved: Dict[str, Any]) -> None:
+        bundle = {
+            "format": BUNDLE_FORMAT,
+            "repo": self.repo or "",
+            "sha": sha,
+            "schemas": schemas,
+            "resolved": resolved,
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        # Write aside and rename, a crash never leaves a half-written bundle behind
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(bundle, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
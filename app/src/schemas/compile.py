@@ -0,0 +1,125 @@
+"""
+Compile a schemas repo checkout into a pre-resolved bundle the server loads at startup.
+
+    python -m app.src.schemas.compile <checkout> --resource tyk --output tyk.json
+
+Runs the same SchemaLoader / SchemaResolver pipeline as the server, fails on broken
+$refs, unresolvable schemas or versions no model can be built from, and writes the
+bundle format of SchemaBundleCache. Point SCHEMA_BUNDLES[<resource>] at the output.
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+from typing import List, Optional, Tuple
+
+import git
+from loguru import logger
+
+from . import schema_to_model
+from .cache import SchemaBundleCache
+from .loader import SchemaLoader, _collect_refs
+from .resolver import SchemaResolver, SchemaRefError
+
+
+class DirectorySource:
+    """The read side of Git used by SchemaLoader, served from a checkout on disk."""
+
+    def __init__(self, root: str, sha: Optional[str] = None):
+        self.root = root
+        self.base_url = root
+        self.last_commit = sha or self._head()
+
+    def _head(self) -> Optional[str]:
+        try:
+            return git.Repo(self.root).head.commit.hexsha
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError, ValueError):
+            return None
+
+    async def list_dir(self, path) -> List[Tuple[str, str]]:
+        directory = os.path.join(self.root, path.strip('/'))
+        return [
+            (name, f"{path.strip('/')}/{name}")
+            for name in sorted(os.listdir(directory))
+            if name.endswith(".json")
+        ]
+
+    async def get_file_content(self, path) -> str:
+        with open(os.path.join(self.root, path.strip('/')), encoding="utf-8") as f:
+            return f.read()
+
+
+def check_graph(loader: SchemaLoader) -> List[str]:
+    """Broken or circular $refs and schemas the resolver rejects, empty when the graph is sound."""
+    errors = []
+
+    for name, schema in loader.schemas.items():
+        for ref in sorted(_collect_refs(schema)):
+            if ref not in loader.schemas:
+                errors.append(f"{name}: $ref to missing schema {ref}")
+    if errors:
+        return errors
+
+    for name, schema in loader.schemas.items():
+        # One resolver per schema, so a failure is reported against the schema that caused it
+        try:
+            SchemaResolver().resolve_refs(name, schema, loader.schemas)
+        except SchemaRefError as e:
+            errors.append(f"{name}: {e}")
+        except Exception as e:
+            errors.append(f"{name}: cannot resolve: {e}")
+    return errors
+
+
+def check_models(loader: SchemaLoader) -> List[str]:
+    """Resolved versions no request model can be built from."""
+    errors = []
+    for name, entry in loader.resolved_schemas.items():
+        if not re.fullmatch(r"\d+\.\d+\.\d+", name):
+            continue
+        try:
+            schema_to_model(f"{loader.resource}_{name}_Model", entry["schema"])
+        except Exception as e:
+            errors.append(f"{name}: cannot build model: {e}")
+    return errors
+
+
+async def compile_bundle(source: DirectorySource, resource: str) -> Tuple[SchemaLoader, List[str]]:
+    loader = SchemaLoader(resource, source, None)
+    await loader._load_resource_schemas(resource)
+
+    errors = check_graph(loader)
+    if errors:
+        return loader, errors
+
+    await loader.resolve_schemas()
+    return loader, check_models(loader)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.src.schemas.compile", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("checkout", help="Path of the schemas repo checkout")
+    parser.add_argument("--resource", required=True, help="Resource the schemas belong to, e.g. tyk")
+    parser.add_argument("--output", required=True, help="Path of the bundle to write")
+    parser.add_argument("--sha", help="Commit the checkout is at, read from its .git when omitted")
+    parser.add_argument("--repo", help="Schemas repo URL as configured on the server, recorded in the bundle")
+    args = parser.parse_args(argv)
+
+    source = DirectorySource(args.checkout, args.sha)
+    if not source.last_commit:
+        parser.error(f"{args.checkout} is not a git checkout, pass --sha")
+
+    loader, errors = asyncio.run(compile_bundle(source, args.resource))
+    if errors:
+        for error in errors:
+            logger.error(error)
+        return 1
+
+    SchemaBundleCache(args.output, args.repo).save(source.last_commit, loader.schemas, loader.resolved_schemas)
+    logger.info(f"Wrote {len(loader.schemas)} schemas of {args.resource} at {source.last_commit[:7]} to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,15 @@
 import re
-from typing import Dict, Any, Set, List
+from typing import Dict, Any, Set, List, Optional
 from loguru import logger
+from prometheus_client import Gauge
 import asyncio
 import json
-from datetime import datetime, timezone, timedelta
-from .resolver import SchemaResolver
-from ..utils import Config
+import posixpath
+import sys
+import time
+from .resolver import SchemaResolver, intern_schema
+from .cache import SchemaBundleCache
+from .settings import schema_settings
 
 
 def is_version(string: str) -> bool:
@@ -36,7 +40,7 @@ def _collect_refs(schema: dict) -> Set[str]:
                     refs.add(part)
             for v in node.values():
                 walk(v)
-        elif isinstance(node, list):
+        elif isinstance(node, (list, tuple)):
             for v in node:
                 walk(v)
 
@@ -62,6 +66,21 @@ def _dependents_closure(resolved_sets: dict, root: str) -> Set[str]:
     return seen
 
 
+SCHEMA_MEMORY = Gauge(
+    "schema_memory_bytes",
+    "Approximate memory of raw and resolved schemas per resource, nodes shared with other resources included",
+    ["resource"],
+)
+
+
+def _snapshot_entry(entry: dict) -> dict:
+    return {
+        "referred_in": list(entry["referred_in"]),
+        "referred_to": list(entry["referred_to"]),
+        "schema": entry["schema"],
+    }
+
+
 class SchemaLoader:
     def __init__(self, resource, git, app):
         self.git = git
@@ -72,32 +91,170 @@ class SchemaLoader:
         self.resolver = SchemaResolver()
 
     async def load_all_schemas(self):
-        await self._load_resource_schemas(self.resource)
+        head = self.git.last_commit
+        cache_dir = schema_settings.SCHEMA_CACHE_DIR
+        bundle_cache = SchemaBundleCache.for_resource(cache_dir, self.resource, self.git.base_url) \
+            if cache_dir and head else None
+        bundle = await self._pick_bundle(bundle_cache, head) if head else None
+
+        if bundle and bundle["sha"] == head:
+            self._restore_bundle(bundle)
+            self._observe_memory()
+            logger.info(f"Loaded {len(self.schemas)} schemas for {self.resource} from cache at {head[:7]}")
+            return
+
+        if not (bundle and await self._load_bundle_diff(bundle, head)):
+            await self._load_resource_schemas(self.resource)
         await self.resolve_schemas()
+        self._observe_memory()
+
+        if bundle_cache:
+            try:
+                await asyncio.to_thread(bundle_cache.save, head, self.schemas, self.resolved_schemas)
+            except OSError as e:
+                logger.warning(f"Failed to write schema cache for {self.resource}: {e}")
+
+    async def _pick_bundle(self, bundle_cache: Optional[SchemaBundleCache], head: str) -> Optional[dict]:
+        """The cached or offline compiled bundle to start from, preferring one already at head."""
+        sources = [bundle_cache] if bundle_cache else []
+        compiled_path = schema_settings.SCHEMA_BUNDLES.get(self.resource)
+        if compiled_path:
+            sources.append(SchemaBundleCache(compiled_path, repo=None))
+
+        bundles = [bundle for bundle in [await asyncio.to_thread(source.load) for source in sources] if bundle]
+        if not bundles:
+            return None
+        return next((bundle for bundle in bundles if bundle["sha"] == head), bundles[0])
+
+    def _restore_bundle(self, bundle: dict) -> None:
+        self.schemas = {name: intern_schema(schema) for name, schema in bundle["schemas"].items()}
+        self.resolved_schemas = {
+            name: {**entry, "schema": intern_schema(entry["schema"])} for name, entry in bundle["resolved"].items()
+        }
+        # The resolver works on sets, the snapshot on lists
+        self.resolver.resolved_schemas = {
+            name: {
+                "referred_in": set(entry["referred_in"]),
+                "referred_to": set(entry["referred_to"]),
+                "schema": entry["schema"],
+            }
+            for name, entry in self.resolved_schemas.items()
+        }
+
+    async def _load_bundle_diff(self, bundle: dict, head: str) -> bool:
+        """Start from a cached bundle and fetch only the schema files changed since, False if the diff is unavailable."""
+        try:
+            files = await self.git.diff_files(bundle["sha"], head)
+        except Exception as e:
+            logger.warning(f"Cannot diff cached schemas of {self.resource} against {head[:7]}, reloading all: {e}")
+            return False
+        if files is None:
+            logger.warning(f"Too many files changed since the cached schemas of {self.resource}, reloading all")
+            return False
+
+        changed = [f for f in files if posixpath.dirname(f["filename"]) == "schemas"]
+        self.schemas = {name: intern_schema(schema) for name, schema in bundle["schemas"].items()}
+
+        for item in changed:
+            if item["status"] == "removed":
+                self.schemas.pop(normalize_name(item["filename"]), None)
+
+        semaphore = asyncio.Semaphore(schema_settings.SCHEMA_LOAD_CONCURRENCY)
+
+        async def fetch(filename):
+            async with semaphore:
+                self.schemas[normalize_name(filename)] = intern_schema(json.loads(await self.git.get_file_content(filename)))
+
+        await asyncio.gather(*(fetch(f["filename"]) for f in changed if f["status"] != "removed"))
+        logger.info(f"Loaded schemas for {self.resource} from cache at {bundle['sha'][:7]} plus {len(changed)} changed files")
+        return True
 
     async def resolve_schemas(self):
         # rebuild resolver graph from scratch for consistency
         self.resolver.resolved_schemas.clear()
         schema_store = self.schemas
         for version, schema in schema_store.items():
+            # Already resolved as the $ref target of an earlier schema
+            if self.resolver.resolved_schemas.get(version, {}).get("schema") is not None:
+                continue
             self.resolver.resolve_refs(version, schema, schema_store)
 
         # snapshot resolver internal sets to lists
         self.resolved_schemas = {
-            name: {
-                "referred_in": list(entry["referred_in"]),
-                "referred_to": list(entry["referred_to"]),
-                "schema": entry["schema"],
-            }
-            for name, entry in self.resolver.resolved_schemas.items()
+            name: _snapshot_entry(entry) for name, entry in self.resolver.resolved_schemas.items()
         }
         return self.resolved_schemas
 
+    def _resolve_changed(self, changed: Set[str]) -> Set[str]:
+        """
+        Re-resolve the changed schemas and everything that transitively refers to them,
+        leaving all other entries of the graph and the snapshot as they are.
+        Returns the re-resolved names.
+        """
+        graph = self.resolver.resolved_schemas
+        impacted: Set[str] = set()
+        for name in changed:
+            impacted |= _dependents_closure(graph, name)
+
+        # Peers whose referred_in changes when the impacted schemas drop their old refs
+        linked = {ref for name in impacted if name in graph for ref in graph[name]["referred_to"]}
+        self.resolver.invalidate(impacted)
+
+        for name in impacted:
+            schema = self.schemas.get(name)
+            # Already re-resolved as a $ref of another impacted schema
+            if schema is None or (name in graph and graph[name]["schema"] is not None):
+                continue
+            self.resolver.resolve_refs(name, schema, self.schemas)
+
+        linked |= {ref for name in impacted if name in graph for ref in graph[name]["referred_to"]}
+        self._snapshot(impacted | linked)
+        return impacted
+
+    def _observe_memory(self) -> None:
+        """Approximate bytes held by raw and resolved schemas, each shared node counted once."""
+        seen: Set[int] = set()
+        total = 0
+        stack: List[Any] = list(self.schemas.values())
+        stack += [entry["schema"] for entry in self.resolved_schemas.values()]
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            total += sys.getsizeof(node)
+            if isinstance(node, dict):
+                total += sum(sys.getsizeof(key) for key in node)
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        SCHEMA_MEMORY.labels(resource=self.resource).set(total)
+
+    def _snapshot(self, names: Set[str]) -> None:
+        graph = self.resolver.resolved_schemas
+        for name in names:
+            if name in graph:
+                self.resolved_schemas[name] = _snapshot_entry(graph[name])
+            else:
+                self.resolved_schemas.pop(name, None)
+
     async def _load_resource_schemas(self, resource: str):
+        started = time.perf_counter()
         schemas = await self.git.list_dir("/schemas")
-        for name, path in schemas:
-            content = await self.git.get_file_content(path)
-            schema = json.loads(content)
+        listed = time.perf_counter()
+
+        semaphore = asyncio.Semaphore(schema_settings.SCHEMA_LOAD_CONCURRENCY)
+
+        async def fetch(path):
+            async with semaphore:
+                return await self.git.get_file_content(path)
+
+        contents = await asyncio.gather(*(fetch(path) for _, path in schemas))
+        fetched = time.perf_counter()
+
+        # Insert in listing order so the store does not depend on which download finished first
+        for (name, _), content in zip(schemas, contents):
+            schema = intern_schema(json.loads(content))
             if is_version(name):
                 version = name.split("-")[1].rstrip(".json")
                 self.schemas[version] = schema
@@ -105,25 +262,14 @@ class SchemaLoader:
                 self.schemas[name] = schema
             logger.info(f"Loaded schema for {resource} version {name}")
 
+        logger.info(
+            f"Loaded {len(schemas)} schemas for {resource}: list {listed - started:.2f}s, "
+            f"fetch {fetched - listed:.2f}s, parse {time.perf_counter() - fetched:.2f}s"
+        )
+
     def get_schema(self, version: str):
         return self.schemas.get(version)
 
-    async def _rebuild_impacted(self, impacted: Set[str]) -> None:
-        # resolve impacted, or simply snapshot if none provided
-        for ver in impacted:
-            schema = self.schemas.get(ver)
-            if schema is not None:
-                self.resolver.resolve_refs(ver, schema, self.schemas)
-
-        self.resolved_schemas = {
-            name: {
-                "referred_in": list(entry["referred_in"]),
-                "referred_to": list(entry["referred_to"]),
-                "schema": entry["schema"],
-            }
-            for name, entry in self.resolver.resolved_schemas.items()
-        }
-
     from typing import List, Tuple, Optional
 
     def can_remove_schema(self, schema_name: str, changed_schemas: List) -> Tuple[bool, Optional[str]]:
@@ -165,22 +311,24 @@ class SchemaLoader:
         return True, None
 
 
-    async def _remove_schema(self, schema_name: str, changed_schemas: list) -> None:
+    async def _remove_schema(self, schema_name: str, changed_schemas: list) -> bool:
         """
         Remove schema from resolver + store after validating with can_remove_schema
         """
         can_remove, reason = self.can_remove_schema(schema_name, changed_schemas)
         if not can_remove:
             logger.error(f"Skip removing {schema_name}: {reason}")
-            return
+            return False
 
         entry = self.resolver.resolved_schemas.get(schema_name)
         if not entry:
             # Already gone, just drop from store if present
             self.schemas.pop(schema_name, None)
-            return
+            self.resolved_schemas.pop(schema_name, None)
+            return True
 
         # unlink references
+        peers = set(entry["referred_to"]) | set(entry["referred_in"])
         for ref in set(entry["referred_to"]):
             peer = self.resolver.resolved_schemas.get(ref)
             if peer:
@@ -194,31 +342,26 @@ class SchemaLoader:
         # drop schema
         self.resolver.resolved_schemas.pop(schema_name, None)
         self.schemas.pop(schema_name, None)
+        self._snapshot(peers | {schema_name})
+        return True
 
-        # rebuild impacted (empty set here means just refresh snapshot)
-        await self._rebuild_impacted(set())
-
-    async def _update_schema(self, schema_name: str, filename: str) -> None:
+    async def _update_schema(self, schema_name: str, filename: str) -> bool:
+        # A failed fetch propagates, the sync keeps its cursor and retries the commit
+        raw = await self.git.get_file_content(filename)
         try:
-            raw = await self.git.get_file_content(filename)
-            self.schemas[schema_name] = json.loads(raw)
-        except Exception as e:
+            self.schemas[schema_name] = intern_schema(json.loads(raw))
+        except ValueError as e:
             logger.error(f"Failed to update schema {schema_name}: {e}")
-            return
-
-        impacted = _dependents_closure(self.resolver.resolved_schemas, schema_name)
-        await self._rebuild_impacted(impacted)
-
-
+            return False
+        return True
 
-    async def _add_schema(self, schema_name: str, filename: str, changed_schemas: list) -> None:
+    async def _add_schema(self, schema_name: str, filename: str, changed_schemas: list) -> bool:
+        raw = await self.git.get_file_content(filename)
         try:
-            raw = await self.git.get_file_content(filename)
-            new_schema = json.loads(raw)
-
-        except Exception as e:
+            new_schema = intern_schema(json.loads(raw))
+        except ValueError as e:
             logger.error(f"Failed to add schema {schema_name}: {e}")
-            return
+            return False
 
         refs = _collect_refs(new_schema)
         missing = [
@@ -229,57 +372,80 @@ class SchemaLoader:
         ]
         if missing:
             logger.error(f"ERROR: Cannot add {schema_name}, missing refs: {sorted(missing)}")
-            return
+            return False
 
         self.schemas[schema_name] = new_schema
-        impacted = _dependents_closure(self.resolver.resolved_schemas, schema_name)
-        await self._rebuild_impacted(impacted)
-
-    async def sync_schemas(self, interval):
-        last_sync = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        while True:
-            now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-            changed_schemas = await self.git.get_changed_files("/schemas", last_sync, now) or []
-            logger.info(f"Looking for changed schemas for {self.resource}")
-
-            for item in changed_schemas:
-
-                filename = item["filename"]
-                logger.info(f"Processing {filename}")
-                status = item["status"]
+        return True
 
-                if filename.startswith("schemas"):
-                    schema_name = normalize_name(filename)
-
-                    if status == "removed":
-                        logger.info(f"Removing {schema_name}")
-                        await self._remove_schema(schema_name, changed_schemas)
+    async def sync_once(self) -> Optional[List[str]]:
+        """
+        Apply schema commits since the last sync, returns the impacted versions or None when
+        nothing changed. The git cursor only moves once the changes were applied.
+        """
+        logger.info(f"Looking for changed schemas for {self.resource}")
+        head, changed_schemas = await self.git.get_changed_files("/schemas")
+        if changed_schemas == []:
+            self.git.advance(head)
+            return None
+
+        # A failed fetch or a broken $ref graph must not leave half-applied schemas behind
+        schemas, resolved_schemas, graph = dict(self.schemas), dict(self.resolved_schemas), self.resolver.checkpoint()
+        try:
+            if changed_schemas is None:
+                impacted_versions = await self._reload_all()
+            else:
+                impacted_versions = await self._apply_changes(changed_schemas)
+        except Exception:
+            self.schemas, self.resolved_schemas = schemas, resolved_schemas
+            self.resolver.restore(graph)
+            raise
+
+        self.git.advance(head)
+        return impacted_versions
+
+    async def _reload_all(self) -> List[str]:
+        """Reload and resolve every schema, for diffs too large to apply file by file."""
+        logger.info(f"Reloading all schemas for {self.resource}")
+        previous = set(self.schemas)
+        self.schemas = {}
+        await self._load_resource_schemas(self.resource)
+        await self.resolve_schemas()
+        self._observe_memory()
+        return [s for s in previous | set(self.schemas) if is_version(f"schema-{s}.json")]
 
-                    elif status == "modified":
-                        logger.info(f"Modifying {schema_name}")
-                        await self._update_schema(schema_name, filename)
+    async def _apply_changes(self, changed_schemas: List[dict]) -> List[str]:
+        """Store the changed schema files, then re-resolve what they impact. Returns the impacted versions."""
+        changed: Set[str] = set()
+        removed: Set[str] = set()
+        for item in changed_schemas:
 
-                    elif status == "added":
-                        logger.info(f"Adding {schema_name}")
-                        await self._add_schema(schema_name, filename, changed_schemas)
+            filename = item["filename"]
+            logger.info(f"Processing {filename}")
+            status = item["status"]
 
-            if changed_schemas:
-                impacted = set()
-                for item in changed_schemas:
-                    schema_name = normalize_name(item["filename"])
-                    impacted |= _dependents_closure(self.resolver.resolved_schemas, schema_name)
+            if filename.startswith("schemas"):
+                schema_name = normalize_name(filename)
 
-                impacted_versions = [s for s in impacted if is_version(f"schema-{s}.json")]
+                if status == "removed":
+                    logger.info(f"Removing {schema_name}")
+                    if await self._remove_schema(schema_name, changed_schemas):
+                        removed.add(schema_name)
 
-                for version in impacted_versions:
-                    self.resolved_schemas.pop(version, None)
+                elif status == "modified":
+                    logger.info(f"Modifying {schema_name}")
+                    if await self._update_schema(schema_name, filename):
+                        changed.add(schema_name)
 
-                await self.resolve_schemas()
+                elif status == "added":
+                    logger.info(f"Adding {schema_name}")
+                    if await self._add_schema(schema_name, filename, changed_schemas):
+                        changed.add(schema_name)
 
-                logger.info(f"Impacted versions: {impacted_versions}")
-                return list(impacted_versions)
+        # Store first, resolve once: a schema changed together with its refs is resolved a single time
+        impacted = self._resolve_changed(changed) | removed
+        impacted_versions = [s for s in impacted if is_version(f"schema-{s}.json")]
 
-            last_sync = now
+        self._observe_memory()
 
-            await asyncio.sleep(interval)
+        logger.info(f"Impacted versions: {impacted_versions}")
+        return impacted_versions
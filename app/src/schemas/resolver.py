@@ -1,87 +1,308 @@
-from typing import Dict, Any, Optional
-from jsonschema import RefResolver
+import copy
+import hashlib
+import weakref
+import posixpath
+from typing import Dict, Any, List, Tuple
+from urllib.parse import unquote
+from prometheus_client import Gauge
+
+
+class SchemaNode(dict):
+    """
+    Immutable dict node of an interned schema. Equal subtrees of all versions and
+    resources are one SchemaNode, so they must never be changed in place: copy with
+    dict(node) and build a new node instead.
+    """
+    __slots__ = ("digest", "__weakref__")
+
+    def __init__(self, items, digest: str):
+        super().__init__(items)
+        self.digest = digest
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Interned schema nodes are shared and immutable, copy with dict(node)")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class SchemaList(list):
+    """Immutable list of an interned schema, compares and serializes like a list."""
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Interned schema nodes are shared and immutable, copy with list(node)")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+# content digest -> node, entries go away with the last schema using them
+_interned: "weakref.WeakValueDictionary[str, SchemaNode]" = weakref.WeakValueDictionary()
+
+SCHEMA_INTERNED_NODES = Gauge(
+    "schema_interned_nodes",
+    "Distinct schema subtrees shared across all versions and resources",
+)
+SCHEMA_INTERNED_NODES.set_function(lambda: len(_interned))
+
+
+def intern_schema(node: Any) -> Any:
+    """Shared immutable equivalent of node: dicts become SchemaNode, lists SchemaList, equal subtrees one object."""
+    return _intern(node, {})[0]
+
+
+def _intern(node: Any, memo: Dict[int, Tuple[Any, str]]) -> Tuple[Any, str]:
+    if isinstance(node, SchemaNode):
+        return node, node.digest
+    if not isinstance(node, (dict, list)):
+        # Scalars are not shared, their digest is their length-prefixed repr
+        text = repr(node)
+        return node, f"{type(node).__name__[0]}{len(text)}:{text}"
+    # The same subtree object is often reachable many times, e.g. a resolved $ref
+    if id(node) in memo:
+        return memo[id(node)]
+
+    if isinstance(node, dict):
+        items = {key: _intern(value, memo) for key, value in node.items()}
+        digest = "{" + hashlib.sha1(
+            "".join(f"{len(key)}:{key}{items[key][1]};" for key in sorted(items)).encode("utf-8")
+        ).hexdigest()
+        shared = _interned.get(digest)
+        if shared is None:
+            shared = SchemaNode({key: value for key, (value, _) in items.items()}, digest)
+            _interned[digest] = shared
+        result = (shared, digest)
+    else:
+        parts = [_intern(value, memo) for value in node]
+        digest = "[" + hashlib.sha1(";".join(d for _, d in parts).encode("utf-8")).hexdigest()
+        result = (SchemaList(value for value, _ in parts), digest)
+
+    memo[id(node)] = result
+    return result
 
 
 def deep_merge_props(target: dict, source: dict):
     for key, value in source.items():
+        if target.get(key) is value:
+            # The same interned subtree, merging it into itself changes nothing
+            continue
         if (
             key in target
             and isinstance(target[key], dict)
             and isinstance(value, dict)
         ):
-            deep_merge_props(target[key], value)
+            # Copy on write, target[key] may be a node shared with other schemas
+            merged = dict(target[key])
+            deep_merge_props(merged, value)
+            target[key] = merged
         else:
             target[key] = value
 
 
+class SchemaRefError(ValueError):
+    """A $ref that points nowhere."""
+
+
+class SchemaRefCycleError(SchemaRefError):
+    """A $ref that, directly or through others, points back at a schema being resolved."""
+
+
+def merge_all_of(parts: List[Any]) -> dict:
+    """
+    Merge resolved allOf subschemas (siblings of allOf first): required lists are
+    concatenated without duplicates, properties deep-merged, anything else last wins.
+    """
+    merged: Dict[str, Any] = {}
+    for part in parts:
+        if not isinstance(part, dict):
+            continue
+        if "required" in part:
+            required = merged.setdefault("required", [])
+            required.extend(r for r in part["required"] if r not in required)
+        if "properties" in part:
+            merged.setdefault("properties", {})
+            deep_merge_props(merged["properties"], part["properties"])
+        for k, v in part.items():
+            if k not in {"required", "properties"}:
+                merged[k] = v
+    return merged
+
+
+def _pointer_target(document: Any, pointer: str, ref: str) -> Any:
+    """Node of document at a JSON pointer ("" or "/definitions/a~1b")."""
+    node = document
+    for token in [t for t in unquote(pointer).split("/")[1:]]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        try:
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise SchemaRefError(f"Unresolvable $ref {ref}: no {pointer} in the target schema")
+    return node
+
+
+# Marks a dict/list whose children are resolved and still have to be assembled
+_ASSEMBLE = object()
+
+
 class SchemaResolver:
     """
-    Resolve $ref and allOf in JSON Schemas for a given resource.
-    Expects schemas shaped like: {resource: {version: <schema dict>, ...}, ...}
+    Resolve $ref and allOf in the JSON Schemas of one resource.
+
+    Schemas are looked up by name in the store (refs may be "base-schema.json",
+    "base-schema.json#/definitions/x" or local "#/definitions/x"). Every resolved
+    document and fragment is memoized in `resolved_schemas` until invalidated, nodes
+    are walked with an explicit stack, and $ref cycles raise SchemaRefCycleError.
+
+    resolved_schemas: name -> {referred_in, referred_to, schema}, edges between documents.
     """
 
     def __init__(self) -> None:
-        self.resolved_schemas: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.resolved_schemas: Dict[str, Dict[str, Any]] = {}
+        # "doc#/pointer" -> resolved fragment
+        self._fragments: Dict[str, Any] = {}
+
+    def _ensure_entry(self, name: str) -> Dict[str, Any]:
+        return self.resolved_schemas.setdefault(name, {
+            "referred_in": set(),
+            "referred_to": set(),
+            "schema": None,
+        })
+
+    def _link(self, name: str, ref: str) -> None:
+        self._ensure_entry(ref)["referred_in"].add(name)
+        self._ensure_entry(name)["referred_to"].add(ref)
 
     def resolve_refs(self, version: str, schema: dict, schema_store: dict) -> dict:
         if not isinstance(schema, dict):
             raise TypeError(f"Expected schema to be dict, got {type(schema)}: {schema}")
 
-        resolver = RefResolver.from_schema(schema, store=schema_store or {})
+        self._ensure_entry(version)
+        resolved = intern_schema(self._walk(schema, version, schema_store or {}, [version]))
+        self.resolved_schemas[version]["schema"] = resolved
+        return resolved
 
-        def _ensure_entry(name):
-            self.resolved_schemas.setdefault(name, {
-                "referred_in": set(),
-                "referred_to": set(),
-                "schema": None,
-            })
+    def _resolve_ref(self, ref: str, document: str, store: dict, active: List[str]) -> Any:
+        target, _, pointer = ref.partition("#")
+        if target:
+            name = target if target in store else posixpath.basename(target)
+            if name not in store:
+                self._link(document, target)
+                raise SchemaRefError(f"Unresolvable $ref {ref} in {document}: no schema {target}")
+        else:
+            name = document
 
-        def _resolve(node, name):
-            if isinstance(node, dict):
-                if "$ref" in node:
-                    ref = node["$ref"]
+        if name != document:
+            self._link(document, name)
+
+        key = f"{name}#{pointer}" if pointer else name
+        if key in active:
+            cycle = " -> ".join(active[active.index(key):] + [key])
+            raise SchemaRefCycleError(f"Circular $ref in {document}: {cycle}")
 
-                    _ensure_entry(ref)
-                    _ensure_entry(name)
+        if not pointer:
+            entry = self._ensure_entry(name)
+            if entry["schema"] is None:
+                entry["schema"] = intern_schema(self._walk(store[name], name, store, active + [name]))
+            return entry["schema"]
 
-                    # record both ways
-                    self.resolved_schemas[ref]["referred_in"].add(name)
-                    self.resolved_schemas[name]["referred_to"].add(ref)
+        if key not in self._fragments:
+            fragment = _pointer_target(store[name], pointer, ref)
+            self._fragments[key] = intern_schema(self._walk(fragment, name, store, active + [key]))
+        return self._fragments[key]
 
-                    if self.resolved_schemas[ref]["schema"] is not None:
-                        return self.resolved_schemas[ref]["schema"]
+    def _walk(self, root: Any, document: str, store: dict, active: List[str]) -> Any:
+        """Resolve root, a node of `document`, depth first with an explicit stack."""
+        results: List[Any] = []
+        stack: List[Tuple[Any, Any]] = [(root, None)]
 
-                    with resolver.resolving(ref) as resolved:
-                        resolved_schema = _resolve(resolved, ref)
-                        self.resolved_schemas[ref]["schema"] = resolved_schema
-                        return resolved_schema
+        while stack:
+            node, marker = stack.pop()
 
+            if marker is _ASSEMBLE:
+                if isinstance(node, list):
+                    count = len(node)
+                    values = results[len(results) - count:]
+                    del results[len(results) - count:]
+                    # Nothing below was a $ref or allOf: keep the (interned) original
+                    results.append(node if all(v is n for v, n in zip(values, node)) else values)
+                    continue
+
+                siblings = [k for k in node if k != "allOf"]
+                count = len(siblings) + (len(node["allOf"]) if "allOf" in node else 0)
+                values = results[len(results) - count:]
+                del results[len(results) - count:]
                 if "allOf" in node:
-                    merged = {}
-                    for subschema in node["allOf"]:
-                        resolved = _resolve(subschema, name)
-                        if "required" in resolved:
-                            merged.setdefault("required", []).extend(resolved["required"])
-                        if "properties" in resolved:
-                            merged.setdefault("properties", {})
-                            deep_merge_props(merged["properties"], resolved["properties"])
-                        for k, v in resolved.items():
-                            if k not in {"required", "properties"}:
-                                merged[k] = v
-                    return merged
-
-                return {k: _resolve(v, name) for k, v in node.items()}
+                    results.append(merge_all_of([dict(zip(siblings, values))] + values[len(siblings):]))
+                elif all(v is node[k] for k, v in zip(siblings, values)):
+                    results.append(node)
+                else:
+                    results.append(dict(zip(siblings, values)))
+                continue
 
+            if isinstance(node, dict):
+                if "$ref" in node:
+                    results.append(self._resolve_ref(node["$ref"], document, store, active))
+                    continue
+                children = [v for k, v in node.items() if k != "allOf"] + list(node.get("allOf", []))
             elif isinstance(node, list):
-                return [_resolve(i, name) for i in node]
+                children = node
+            else:
+                results.append(node)
+                continue
+
+            stack.append((node, _ASSEMBLE))
+            stack.extend((child, None) for child in reversed(children))
+
+        return results[0]
+
+    def checkpoint(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """Copy of the graph and memo to restore() after a failed update, resolved schemas are shared."""
+        graph = {
+            name: {
+                "referred_in": set(entry["referred_in"]),
+                "referred_to": set(entry["referred_to"]),
+                "schema": entry["schema"],
+            }
+            for name, entry in self.resolved_schemas.items()
+        }
+        return graph, dict(self._fragments)
 
-            return node
+    def restore(self, checkpoint: Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]) -> None:
+        self.resolved_schemas, self._fragments = checkpoint
 
-        _ensure_entry(version)
-        self.resolved_schemas[version]["schema"] = _resolve(schema, version)
+    def invalidate(self, names) -> None:
+        """Drop the resolved schema and outgoing edges of names, their dependents keep pointing at them."""
+        names = set(names)
+        for name in names:
+            entry = self.resolved_schemas.get(name)
+            if entry is None:
+                continue
+            for ref in entry["referred_to"]:
+                peer = self.resolved_schemas.get(ref)
+                if peer:
+                    peer["referred_in"].discard(name)
+            entry["referred_to"] = set()
+            entry["schema"] = None
 
-        # --- enforce symmetry after recursion ---
-        for schema_name, entry in list(self.resolved_schemas.items()):
-            for ref in list(entry["referred_to"]):
-                _ensure_entry(ref)
-                self.resolved_schemas[ref]["referred_in"].add(schema_name)
+        self._fragments = {
+            key: fragment for key, fragment in self._fragments.items() if key.split("#", 1)[0] not in names
+        }
@@ -0,0 +1,32 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class SchemaSettings(BaseSettings):
+    """
+    Settings of schema loading. Kept apart from the server's Config, which inherits them,
+    so offline tools like the schema compiler run without the server's variables.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    SCHEMA_LOAD_CONCURRENCY: int = Field(
+        default=8,
+        description="Maximum number of schema files downloaded concurrently per resource at startup.",
+        examples=[4, 8, 16],
+    )
+
+    SCHEMA_CACHE_DIR: str = Field(
+        default="/tmp/k8s-provisions/schema-cache",
+        description="Directory where loaded and resolved schemas are persisted per schemas repo commit for fast restarts, empty disables it.",
+        examples=["/var/cache/k8s-provisions/schemas", ""],
+    )
+
+    SCHEMA_BUNDLES: dict[str, str] = Field(
+        default={},
+        description="Per-resource path of a schema bundle compiled offline with `python -m app.src.schemas.compile`, loaded instead of resolving at startup.",
+        examples=[{"tyk": "/etc/k8s-provisions/bundles/tyk.json"}],
+    )
+
+
+schema_settings = SchemaSettings()
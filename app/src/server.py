@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from .routers import generate_router
+from .routers.webhooks import webhook_router
+from .middlewares.exception import add_exception_handlers
+from .middlewares.retry_budget import RetryBudgetMiddleware
+from .services.sync_scheduler import SyncScheduler
+from .utils import config as cfg
+from contextlib import asynccontextmanager
+
+async_background_tasks = []
+
+def extend_lifespan(original_lifespan):
+    @asynccontextmanager
+    async def wrapper(app):
+        scheduler = SyncScheduler(cfg.SYNC_MAX_CONCURRENCY, cfg.SYNC_JITTER)
+        for rg in getattr(app.state, "router_generators", []):
+            rg.register_sync_jobs(scheduler)
+
+        # Syncs run inside the original lifespan, so they stop before the clients they use are closed
+        async with original_lifespan(app):
+            scheduler.start()
+            try:
+                yield
+            finally:
+                await scheduler.stop()
+
+    return wrapper
+
+async def update_app(app: FastAPI) -> FastAPI:
+    add_exception_handlers(app)
+    app.add_middleware(RetryBudgetMiddleware)
+    app.state.router_generators = []
+    app = await generate_router(app)
+    if cfg.GITHUB_WEBHOOK_SECRET:
+        app.include_router(webhook_router)
+    app.router.lifespan_context = extend_lifespan(app.router.lifespan_context)
+    return app
\ No newline at end of file
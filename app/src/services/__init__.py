@@ -1,34 +1,189 @@
 import asyncio
 import random
-from typing import Awaitable, Callable, Tuple, Type, TypeVar, Optional
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, FrozenSet, Mapping, TypeVar, Optional
+
+import httpx
+from loguru import logger
+from prometheus_client import Counter
+
+from app.general.database.errors import UpstreamUnavailableError, DeadlineExceededError
+from app.general.utils.deadline import check_deadline, remaining_time
+from ..errors.external_service import ExternalServiceError
 
 T = TypeVar("T")
 
+RETRIES = Counter(
+    "upstream_retries_total",
+    "Retries scheduled by the retry policy engine",
+    ["policy", "reason"],
+)
+RETRIES_GIVEN_UP = Counter(
+    "upstream_retries_given_up_total",
+    "Retryable failures that were not retried",
+    ["policy", "reason"],
+)
+
+
+class RetryBudget:
+    """Number of retries all upstream calls of one inbound request may spend together."""
+
+    def __init__(self, max_retries: int):
+        self.remaining = max_retries
+
+    def try_spend(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+# Set per inbound request by RetryBudgetMiddleware, None outside of requests (background work)
+retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+def _retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Delay requested by the server through Retry-After or an exhausted X-RateLimit quota."""
+    headers = {k.lower(): v for k, v in headers.items()}
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    if headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+        try:
+            return max(0.0, float(headers["x-ratelimit-reset"]) - time.time())
+        except ValueError:
+            pass
+
+    return None
+
+
+def _is_transport_error(exc: BaseException) -> bool:
+    # BaseAPI wraps httpx transport errors into RuntimeError
+    return isinstance(exc, httpx.TransportError) or isinstance(exc.__cause__, httpx.TransportError)
+
+
+def _never_sent(exc: BaseException) -> bool:
+    """The request provably never reached the upstream, so even non-idempotent calls may be replayed."""
+    cause = exc if isinstance(exc, httpx.TransportError) else exc.__cause__
+    return isinstance(cause, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+class RetryPolicy:
+    """
+    Decide if and when a failed upstream call is retried.
+
+    - retryable_statuses are retried for idempotent calls only.
+    - safe_statuses (e.g. 429) mean the upstream refused the call without
+      processing it, so they are retried for non-idempotent calls too.
+    - Rate-limit rejections (403/429 with Retry-After or an exhausted
+      X-RateLimit quota) wait for the requested time, up to max_retry_after.
+    - Otherwise the backoff is full-jitter: uniform(0, min(max_delay, base_delay * 2**attempt)).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        max_retry_after: float = 30.0,
+        retryable_statuses: FrozenSet[int] = frozenset({408, 425, 429, 500, 502, 503, 504}),
+        safe_statuses: FrozenSet[int] = frozenset({429}),
+    ):
+        self.name = name
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.retryable_statuses = retryable_statuses
+        self.safe_statuses = safe_statuses
+
+    def is_rate_limited(self, exc: ExternalServiceError) -> bool:
+        headers = {k.lower(): v for k, v in exc.headers.items()}
+        return exc.status_code in (403, 429) and (
+            "retry-after" in headers or headers.get("x-ratelimit-remaining") == "0"
+        )
+
+    def is_retryable(self, exc: BaseException, idempotent: bool) -> bool:
+        if isinstance(exc, UpstreamUnavailableError):
+            # Refused locally (overload, open breaker), retrying would only add load
+            return False
+        if isinstance(exc, ExternalServiceError):
+            if self.is_rate_limited(exc) or exc.status_code in self.safe_statuses:
+                return True
+            return idempotent and exc.status_code in self.retryable_statuses
+        if _is_transport_error(exc):
+            return idempotent or _never_sent(exc)
+        return False
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def delay(self, exc: BaseException, attempt: int) -> float:
+        if isinstance(exc, ExternalServiceError):
+            requested = _retry_after_seconds(exc.headers)
+            if requested is not None:
+                # Add a little jitter so callers released by the same reset don't stampede
+                return requested + random.uniform(0, self.base_delay)
+        return self.backoff(attempt)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy("default")
+
 
 async def retry(
     coro_factory: Callable[[], Awaitable[T]],
-    attempts: int = 4,
-    base_delay: float = 0.5,
-    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
-    jitter: float = 0.25,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    idempotent: bool = True,
 ) -> T:
-    """Retry an async operation with exponential backoff and jitter.
+    """Run an async upstream call, retrying failures the policy classifies as retryable.
 
     - coro_factory: zero-arg callable returning an awaitable
-    - attempts: max attempts (>=1)
-    - base_delay: starting delay in seconds
-    - retry_on: exception types to retry on
-    - jitter: extra random seconds added to each backoff
+    - policy: the upstream's RetryPolicy
+    - idempotent: whether replaying the call after an unknown outcome is safe
     """
-    last_exc: Optional[BaseException] = None
-    for i in range(max(1, attempts)):
+    attempt = 0
+    while True:
+        check_deadline(policy.name)
         try:
             return await coro_factory()
         except Exception as e:  # noqa: BLE001
-            if not isinstance(e, retry_on):
+            if not policy.is_retryable(e, idempotent):
+                raise
+
+            attempt += 1
+            if attempt >= policy.attempts:
+                RETRIES_GIVEN_UP.labels(policy=policy.name, reason="attempts").inc()
+                raise
+
+            delay = policy.delay(e, attempt - 1)
+            if delay > policy.max_retry_after:
+                RETRIES_GIVEN_UP.labels(policy=policy.name, reason="retry_after").inc()
                 raise
-            last_exc = e
-            delay = base_delay * (2 ** i) + random.random() * jitter
+
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                RETRIES_GIVEN_UP.labels(policy=policy.name, reason="deadline").inc()
+                raise DeadlineExceededError(
+                    policy.name,
+                    f"Request deadline would be exceeded by retrying {policy.name} call: {e}",
+                ) from e
+
+            budget = retry_budget.get()
+            if budget is not None and not budget.try_spend():
+                RETRIES_GIVEN_UP.labels(policy=policy.name, reason="budget").inc()
+                raise
+
+            RETRIES.labels(policy=policy.name, reason=type(e).__name__).inc()
+            logger.debug(f"Retrying {policy.name} call in {delay:.2f}s after: {e}")
             await asyncio.sleep(delay)
-    assert last_exc is not None
-    raise last_exc
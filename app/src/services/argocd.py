@@ -3,12 +3,17 @@ import asyncio
 import yaml
 
 from app.src.api.argocd import ArgoCDAPI
-from . import retry
+from . import retry, RetryPolicy
 from loguru import logger
 import json
 from time import sleep
 
 from app.src.errors.external_service import ExternalServiceError
+from app.general.utils.deadline import check_deadline
+
+
+# ArgoCD answers 403 for missing apps, so it is terminal like every other 4xx
+ARGOCD_RETRY_POLICY = RetryPolicy("argocd", attempts=4, base_delay=1.0, max_delay=10.0)
 
 
 def build_app_name(cluster, namespace, name, resource) -> str:
@@ -22,7 +27,7 @@ class ArgoCD:
 
 
     async def sync(self, app_name):
-        await retry(lambda: self.api.sync_app(app_name), base_delay=1.0)
+        await retry(lambda: self.api.sync_app(app_name), policy=ARGOCD_RETRY_POLICY)
 
     async def wait_for_app_deletion(self, app_name):
         """Wait until an app is no longer accessible (treated as deleted).
@@ -32,6 +37,7 @@ class ArgoCD:
         """
         timeout = 0
         while timeout < self.applicationSetTimeout:
+            check_deadline("ArgoCD")
             try:
                 await self.api.get_app(app_name)
                 # Still exists; wait and retry
@@ -48,14 +54,14 @@ class ArgoCD:
 
 
     async def get_app_status(self, app_name):
-        response = await retry(lambda: self.api.get_app(app_name), base_delay=1.0)
+        response = await retry(lambda: self.api.get_app(app_name), policy=ARGOCD_RETRY_POLICY)
         response = json.loads(response.body)
 
         return response["status"]["sync"]
 
     async def get_app_values(self, app_name):
         logger.info(f"Getting ArgoCD app values for {app_name}")
-        response = await retry(lambda: self.api.get_app(app_name), base_delay=1.0)
+        response = await retry(lambda: self.api.get_app(app_name), policy=ARGOCD_RETRY_POLICY)
         response = json.loads(response.body)
 
         return response["spec"]["source"]["helm"]["values"]
@@ -74,7 +80,7 @@ class ArgoCD:
             }
         }
 
-        await retry(lambda: self.api.patch_app(data, app_name, namespace, project), base_delay=1.0)
+        await retry(lambda: self.api.patch_app(data, app_name, namespace, project), policy=ARGOCD_RETRY_POLICY)
 
     async def wait_for_app_deletion(self, app_name):
         # Delegate to API which handles exceptions/logging and status checks
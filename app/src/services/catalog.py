@@ -0,0 +1,259 @@
+from bisect import bisect_left, bisect_right, insort
+import hashlib
+import struct
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from prometheus_client import Gauge
+
+
+CATALOG_APPS = Gauge(
+    "catalog_apps",
+    "Apps known to the in-memory catalog index per resource",
+    ["resource"],
+)
+
+# 20 byte blob sha + 4 byte size, ~60 bytes per app instead of a dict or a tuple of str/int
+_ENTRY = struct.Struct(">20sI")
+# Stored for sizes we do not know, e.g. of files changed by a compare diff, which has no sizes
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def blob_sha(content: str) -> str:
+    """Sha git assigns to a blob with this content, so our writes need no round trip."""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def split_values_path(path: str) -> Optional[Tuple[str, str, str]]:
+    """(cluster, namespace, app) of a values file path, None for anything else in the repo."""
+    parts = path.strip('/').split('/')
+    if len(parts) != 3 or not parts[2].endswith(".yaml"):
+        return None
+    return parts[0], parts[1], parts[2][:-len(".yaml")]
+
+
+class AppEntry:
+    __slots__ = ("cluster", "namespace", "name", "sha", "size")
+
+    def __init__(self, cluster: str, namespace: str, name: str, packed: bytes):
+        self.cluster = cluster
+        self.namespace = namespace
+        self.name = name
+        sha, size = _ENTRY.unpack(packed)
+        self.sha = sha.hex()
+        self.size: Optional[int] = None if size == _UNKNOWN_SIZE else size
+
+
+class CatalogIndex:
+    """
+    In-memory index cluster -> namespace -> app -> (blob sha, size or unknown) of a values repository.
+
+    Built from one recursive tree fetch, then kept current from our own writes
+    (record_write / record_delete) and the commit diffs of Git.get_changed_files
+    (refresh), rebuilt when a diff is too large to list. Names are interned and entries
+    packed into 24 bytes.
+    """
+
+    def __init__(self, resource: str, git):
+        self.resource = resource
+        self.git = git
+        # Authoritative: apps missing from the index do not exist. Only set by a complete build.
+        self.ready = False
+        self._apps: Dict[str, Dict[str, Dict[str, bytes]]] = {}
+        # Sorted keys per level: () -> clusters, (cluster,) -> namespaces, (cluster, namespace) -> names.
+        # Built on first use and kept sorted on insert/remove, so paging never re-sorts.
+        self._sorted: Dict[Tuple[str, ...], List[str]] = {}
+        # Called with each path changed by a commit seen in refresh, e.g. to drop cached content
+        self.listeners: List[Callable[[str], None]] = []
+        # Called after build replaced the whole index, when the changed paths are not known
+        self.rebuild_listeners: List[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return sum(len(apps) for namespaces in self._apps.values() for apps in namespaces.values())
+
+    def _keys(self, *level: str) -> List[str]:
+        keys = self._sorted.get(level)
+        if keys is None:
+            node = self._apps
+            for key in level:
+                node = node.get(key)
+                if node is None:
+                    # Not cached, lookups of unknown clusters must not grow the index
+                    return []
+            keys = self._sorted[level] = sorted(node)
+        return keys
+
+    def _key_added(self, level: Tuple[str, ...], key: str) -> None:
+        keys = self._sorted.get(level)
+        if keys is not None:
+            insort(keys, key)
+
+    def _key_removed(self, level: Tuple[str, ...], key: str) -> None:
+        keys = self._sorted.get(level)
+        if keys is not None:
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def _put(self, path: str, sha: str, size: Optional[int]) -> None:
+        key = split_values_path(path)
+        if key is None:
+            return
+        cluster, namespace, name = (sys.intern(k) for k in key)
+
+        namespaces = self._apps.get(cluster)
+        if namespaces is None:
+            namespaces = self._apps[cluster] = {}
+            self._key_added((), cluster)
+        apps = namespaces.get(namespace)
+        if apps is None:
+            apps = namespaces[namespace] = {}
+            self._key_added((cluster,), namespace)
+        if name not in apps:
+            self._key_added((cluster, namespace), name)
+
+        size = _UNKNOWN_SIZE if size is None else min(size, _UNKNOWN_SIZE - 1)
+        apps[name] = _ENTRY.pack(bytes.fromhex(sha), size)
+
+    def _remove(self, path: str) -> None:
+        key = split_values_path(path)
+        if key is None:
+            return
+        cluster, namespace, name = key
+        namespaces = self._apps.get(cluster, {})
+        apps = namespaces.get(namespace, {})
+        if apps.pop(name, None) is None:
+            return
+        self._key_removed((cluster, namespace), name)
+
+        if not apps:
+            del namespaces[namespace]
+            self._sorted.pop((cluster, namespace), None)
+            self._key_removed((cluster,), namespace)
+        if not namespaces:
+            del self._apps[cluster]
+            self._sorted.pop((cluster,), None)
+            self._key_removed((), cluster)
+
+    def _observe(self) -> None:
+        CATALOG_APPS.labels(resource=self.resource).set(len(self))
+
+    async def build(self) -> None:
+        """Replace the index with the repository's current tree."""
+        tree = await self.git.get_tree()
+
+        self._apps = {}
+        self._sorted = {}
+        for entry in tree["tree"]:
+            if entry.get("type") == "blob":
+                self._put(entry["path"], entry["sha"], entry.get("size"))
+
+        self.ready = not tree.get("truncated")
+        self._observe()
+        for listener in self.rebuild_listeners:
+            listener()
+        if self.ready:
+            logger.info(f"Catalog index for {self.resource} built with {len(self)} apps")
+        else:
+            logger.warning(
+                f"Catalog index for {self.resource} is incomplete ({len(self)} apps), "
+                f"missing apps are looked up in Git until a rebuild succeeds"
+            )
+
+    def apply_changes(self, files: Iterable[dict]) -> None:
+        """Apply changed files in the shape of GitHub's compare API, which has no sizes: they become unknown."""
+        for item in files:
+            for listener in self.listeners:
+                listener(item["filename"])
+                if item.get("previous_filename"):
+                    listener(item["previous_filename"])
+
+            if item["status"] == "removed":
+                self._remove(item["filename"])
+                continue
+            if item.get("previous_filename"):
+                self._remove(item["previous_filename"])
+            if item.get("sha"):
+                self._put(item["filename"], item["sha"], item.get("size"))
+        self._observe()
+
+    async def refresh(self) -> bool:
+        """Catch up with commits made outside this service since the last build or refresh, True when any."""
+        if not self.ready:
+            await self.build()
+            return True
+
+        head, files = await self.git.get_changed_files("")
+        if files is None:
+            await self.build()
+        else:
+            self.apply_changes(files)
+        self.git.advance(head)
+        return files is None or bool(files)
+
+    def record_write(self, path: str, content: str) -> None:
+        self._put(path, blob_sha(content), len(content.encode("utf-8")))
+        self._observe()
+
+    def record_delete(self, path: str) -> None:
+        self._remove(path)
+        self._observe()
+
+    def get(self, cluster: str, namespace: str, name: str) -> Optional[AppEntry]:
+        packed = self._apps.get(cluster, {}).get(namespace, {}).get(name)
+        return AppEntry(cluster, namespace, name, packed) if packed else None
+
+    def exists(self, cluster: str, namespace: str, name: str) -> bool:
+        return name in self._apps.get(cluster, {}).get(namespace, {})
+
+    def clusters(self) -> List[str]:
+        return list(self._keys())
+
+    def namespaces(self, cluster: str) -> List[str]:
+        return list(self._keys(cluster))
+
+    def apps(self, cluster: Optional[str] = None, namespace: Optional[str] = None) -> Iterator[AppEntry]:
+        """Apps in (cluster, namespace, name) order, optionally filtered."""
+        for c in ([cluster] if cluster else list(self._keys())):
+            namespaces = self._apps.get(c, {})
+            for ns in ([namespace] if namespace else list(self._keys(c))):
+                apps = namespaces.get(ns, {})
+                for name in list(self._keys(c, ns)):
+                    packed = apps.get(name)
+                    if packed:
+                        yield AppEntry(c, ns, name, packed)
+
+    def page(
+        self,
+        cluster: Optional[str] = None,
+        namespace: Optional[str] = None,
+        after: Optional[Tuple[str, str, str]] = None,
+        limit: int = 100,
+    ) -> Tuple[List[AppEntry], bool]:
+        """
+        Up to `limit` apps strictly after the (cluster, namespace, name) key `after`,
+        and whether more follow. Levels before the key are skipped by bisecting, not scanned.
+        """
+        items: List[AppEntry] = []
+        after = after or ("", "", "")
+
+        clusters = [cluster] if cluster else self._keys()
+        for c in clusters[bisect_left(clusters, after[0]):]:
+            namespaces = self._apps.get(c, {})
+            ns_keys = [namespace] if namespace else self._keys(c)
+            if c == after[0]:
+                ns_keys = ns_keys[bisect_left(ns_keys, after[1]):]
+
+            for ns in ns_keys:
+                apps = namespaces.get(ns, {})
+                names = self._keys(c, ns)
+                start = bisect_right(names, after[2]) if (c, ns) == after[:2] else 0
+
+                for name in names[start:start + limit - len(items) + 1]:
+                    if len(items) == limit:
+                        return items, True
+                    items.append(AppEntry(c, ns, name, apps[name]))
+
+        return items, False
@@ -0,0 +1,138 @@
+import asyncio
+import contextvars
+from typing import Dict, List, Optional
+
+from loguru import logger
+from prometheus_client import Histogram
+
+from app.general.database.errors import DeadlineExceededError
+from app.general.utils.deadline import check_deadline, remaining_time
+from app.src.api.git import GitAPI, ADD, DELETE
+from . import retry, RetryPolicy
+
+COMMIT_BATCH_SIZE = Histogram(
+    "git_commit_batch_size",
+    "File changes coalesced into one commit per values repository",
+    ["repo"],
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+
+class PendingChange:
+    __slots__ = ("op", "path", "content", "message", "future")
+
+    def __init__(self, op: str, path: str, content: Optional[str], message: str, future: asyncio.Future):
+        self.op = op
+        self.path = path.strip('/')
+        self.content = content
+        self.message = message
+        self.future = future
+
+
+class CommitQueue:
+    """
+    Coalesce file writes to one repository into few commits.
+
+    Writes arriving within `window` seconds of each other are pushed as one commit
+    through the Git Data API, which re-bases onto the new head on conflicts. Only one
+    commit is in flight per repository; writes arriving meanwhile form the next batch.
+    Each caller waits for its own change: it gets the commit sha, or its own error when
+    the change cannot apply (e.g. the file already exists) without failing the others.
+    """
+
+    def __init__(self, api: GitAPI, policy: RetryPolicy, window: float, max_batch: int):
+        self.api = api
+        self.policy = policy
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: List[PendingChange] = []
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def submit(self, op: str, path: str, content: Optional[str], message: str) -> str:
+        check_deadline(self.policy.name)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(PendingChange(op, path, content, message, future))
+
+        if self._flusher is None or self._flusher.done():
+            # Fresh context: the batch must not inherit the first caller's deadline or retry budget
+            self._flusher = asyncio.create_task(self._run(), context=contextvars.Context())
+
+        # The flusher does not see the caller's deadline, so the caller bounds its own wait.
+        # A timed out change is cancelled and skipped unless its commit is already in flight.
+        try:
+            return await asyncio.wait_for(future, remaining_time())
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError(
+                self.policy.name,
+                f"Request deadline exceeded waiting for the commit to {self.api.base_url}.",
+            )
+
+    def _next_batch(self) -> List[PendingChange]:
+        batch, deferred, paths = [], [], set()
+
+        for change in self._pending:
+            if change.future.done():
+                # Caller gave up before its change was sent
+                continue
+            # A path appears once per commit, later writes to it go to the next one
+            if change.path in paths or len(batch) >= self.max_batch:
+                deferred.append(change)
+                continue
+            batch.append(change)
+            paths.add(change.path)
+
+        self._pending = deferred
+        return batch
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.window)
+            batch = self._next_batch()
+            if batch:
+                await self._commit(batch)
+
+    async def _commit(self, batch: List[PendingChange]) -> None:
+        builder = self.api.commit_builder()
+        for change in batch:
+            if change.op == DELETE:
+                builder.delete(change.path)
+            elif change.op == ADD:
+                builder.add(change.path, change.content)
+            else:
+                builder.modify(change.path, change.content)
+
+        if len(batch) == 1:
+            message = batch[0].message
+        else:
+            message = f"{len(batch)} changes\n\n" + "\n".join(f"- {change.message}" for change in batch)
+
+        COMMIT_BATCH_SIZE.labels(repo=self.api.base_url).observe(len(batch))
+
+        try:
+            sha = await retry(lambda: builder.commit(message, partial=True), policy=self.policy, idempotent=False)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Commit of {len(batch)} changes to {self.api.base_url} failed: {e}")
+            for change in batch:
+                if not change.future.done():
+                    change.future.set_exception(e)
+            return
+
+        for change in batch:
+            if change.future.done():
+                continue
+            if change.path in builder.rejected:
+                change.future.set_exception(builder.rejected[change.path])
+            else:
+                change.future.set_result(sha)
+
+
+_queues: Dict[str, CommitQueue] = {}
+
+
+def get_commit_queue(api: GitAPI, policy: RetryPolicy, window: float, max_batch: int) -> CommitQueue:
+    """Return the shared queue of the repository `api` points at."""
+    queue = _queues.get(api.base_url)
+    if queue is None:
+        queue = CommitQueue(api, policy, window, max_batch)
+        _queues[api.base_url] = queue
+    return queue
@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+CONFIG_CACHE_LOOKUPS = Counter(
+    "config_cache_lookups_total",
+    "Config cache lookups per resource (hit, miss, expired, stale)",
+    ["resource", "result"],
+)
+CONFIG_CACHE_ENTRIES = Gauge(
+    "config_cache_entries",
+    "Configurations held by the config cache per resource",
+    ["resource"],
+)
+
+
+class ConfigCache:
+    """
+    Read-through cache of values file contents of one resource, keyed by path.
+
+    Our own writes put the new content (read-after-write consistency, which GitHub's
+    contents API does not give right after a commit) and deletes drop it. Commits seen
+    in the repository's diffs invalidate their paths, a full rebuild of the catalog
+    clears everything. Entries also expire after `ttl`
+    seconds, and when a blob sha is known the cached content must still match it.
+    """
+
+    def __init__(self, resource: str, max_entries: int, ttl: float):
+        self.resource = resource
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # path -> (content, blob sha, expires at)
+        self._entries: "OrderedDict[str, Tuple[str, Optional[str], float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, result: str) -> None:
+        CONFIG_CACHE_LOOKUPS.labels(resource=self.resource, result=result).inc()
+
+    def get(self, path: str, sha: Optional[str] = None) -> Optional[str]:
+        """Cached content of path, None when missing, expired or not matching the expected blob sha."""
+        key = path.strip('/')
+        entry = self._entries.get(key)
+        if entry is None:
+            self._lookup("miss")
+            return None
+
+        content, cached_sha, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._lookup("expired")
+            self.invalidate(key)
+            return None
+        if sha and cached_sha and sha != cached_sha:
+            self._lookup("stale")
+            self.invalidate(key)
+            return None
+
+        self._entries.move_to_end(key)
+        self._lookup("hit")
+        return content
+
+    def put(self, path: str, content: str, sha: Optional[str] = None) -> None:
+        key = path.strip('/')
+        self._entries[key] = (content, sha, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        CONFIG_CACHE_ENTRIES.labels(resource=self.resource).set(len(self._entries))
+
+    def invalidate(self, path: str) -> None:
+        if self._entries.pop(path.strip('/'), None) is not None:
+            CONFIG_CACHE_ENTRIES.labels(resource=self.resource).set(len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        CONFIG_CACHE_ENTRIES.labels(resource=self.resource).set(0)
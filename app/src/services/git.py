@@ -1,12 +1,36 @@
-import base64
-from app.src.api.git import GitAPI
-from . import retry
+import asyncio
+
+from loguru import logger
+from app.src.api.git import GitAPI, ADD, MODIFY, DELETE
+from . import retry, RetryPolicy
+from .commit_queue import get_commit_queue
+from .local_git import LocalGit
+from ..utils import config
+
+# 409 is GitHub's answer to a concurrent commit on the branch head. The write was
+# rejected without being applied, so replaying it is safe even for creates.
+GIT_RETRY_POLICY = RetryPolicy(
+    "git",
+    attempts=4,
+    base_delay=0.5,
+    max_delay=8.0,
+    max_retry_after=60.0,
+    retryable_statuses=frozenset({408, 409, 429, 500, 502, 503, 504}),
+    safe_statuses=frozenset({409, 429}),
+)
 
 
 class Git:
     def __init__(self, base_url, token):
+        self.base_url = base_url
         self.api = GitAPI(base_url, token)
+        self.rate_limit = self.api.rate_limit
         self.last_commit = None
+        self.commit_queue = None
+        if config.GIT_COMMIT_WINDOW > 0:
+            self.commit_queue = get_commit_queue(
+                self.api, GIT_RETRY_POLICY, config.GIT_COMMIT_WINDOW, config.GIT_COMMIT_MAX_BATCH
+            )
 
 
     async def async_init(self):
@@ -14,45 +38,123 @@ class Git:
         self.last_commit = last_commit["sha"]
 
     async def modify_file(self, path, commit_message, content):
-        await retry(lambda: self.api.modify_file_content(path, commit_message, content))
+        if self.commit_queue:
+            await self.commit_queue.submit(MODIFY, path, content, commit_message)
+            return
+        await retry(lambda: self.api.modify_file_content(path, commit_message, content), policy=GIT_RETRY_POLICY)
 
 
     async def add_file(self, path, commit_message, content):
-        await retry(lambda: self.api.create_new_file(path, commit_message, content))
+        if self.commit_queue:
+            await self.commit_queue.submit(ADD, path, content, commit_message)
+            return
+        await retry(lambda: self.api.create_new_file(path, commit_message, content), policy=GIT_RETRY_POLICY, idempotent=False)
 
 
     async def delete_file(self, path, commit_message):
-        await retry(lambda: self.api.delete_file(path, commit_message))
+        if self.commit_queue:
+            await self.commit_queue.submit(DELETE, path, None, commit_message)
+            return
+        await retry(lambda: self.api.delete_file(path, commit_message), policy=GIT_RETRY_POLICY)
 
 
-    async def get_file_content(self, path):
-        resp = await retry(lambda: self.api.get_file(path))
-        enc_git_file = resp["content"]
-        git_file = base64.b64decode(enc_git_file).decode("utf-8")
-        return git_file
-
-
-    async def get_changed_files(self, path, since, until):
-        commits = await self.api.commits_per_path(path, since, until)
-
-        if not commits:
-            return []
+    async def commit_files(self, commit_message, add=None, modify=None, delete=None):
+        """
+        Apply several file changes as one commit.
+        - add / modify: {path: content}
+        - delete: [path]
+        """
+        builder = self.api.commit_builder()
+        for path, content in (add or {}).items():
+            builder.add(path, content)
+        for path, content in (modify or {}).items():
+            builder.modify(path, content)
+        for path in delete or []:
+            builder.delete(path)
 
-        commits = sorted(commits, key=lambda c: c["commit"]["author"]["date"])
+        return await retry(lambda: builder.commit(commit_message), policy=GIT_RETRY_POLICY, idempotent=False)
 
-        head = commits[-1]["sha"]
-
-        diff = await self.api.compare_commits(self.last_commit, head)
 
+    async def get_file_content(self, path):
+        raw = await retry(lambda: self.api.get_file_raw(path), policy=GIT_RETRY_POLICY)
+        return raw.decode("utf-8")
+
+
+    async def get_changed_files(self, path=""):
+        """
+        (head, files under path changed since the cursor), files in the shape of GitHub's
+        compare API, or None when the diff is too large to list and the caller must reload.
+        The cursor is the sha last passed to advance(): an unchanged head costs one 304 and
+        no diff, and changes a caller failed to apply are returned again by the next call.
+        """
+        head = await retry(lambda: self.api.get_head_sha(), policy=GIT_RETRY_POLICY)
+        if head == self.last_commit:
+            return head, []
+
+        files = await retry(lambda: self.api.compare_files(self.last_commit, head), policy=GIT_RETRY_POLICY)
+        if files is None:
+            logger.warning(f"Too many files changed in {self.api.base_url} since {self.last_commit[:7]} to diff")
+            return head, None
+
+        prefix = path.strip('/')
+        return head, [f for f in files if not prefix or f["filename"].startswith(f"{prefix}/")]
+
+    def advance(self, head: str) -> None:
+        """Move the cursor of get_changed_files once the changes up to head were applied."""
         self.last_commit = head
 
-        return diff["files"]
+    async def get_tree(self):
+        """
+        Every entry of the repository at the branch head, in the shape of GitHub's tree API:
+        {"tree": [{"path", "type", "sha", "size"}], "truncated"}. A recursive listing GitHub
+        truncated is completed by walking its subtrees; "truncated" stays set only when
+        even that came back incomplete.
+        """
+        tree = await retry(lambda: self.api.get_tree(), policy=GIT_RETRY_POLICY)
+        if not tree.get("truncated"):
+            return {"tree": tree["tree"], "truncated": False}
+
+        logger.info(f"Git tree of {self.api.base_url} was truncated by GitHub, walking its subtrees")
+        return await self._walk_tree(tree["sha"], "")
+
+    async def _walk_tree(self, sha: str, prefix: str) -> dict:
+        """One level of a tree listed non-recursively, each subtree recursively, walked again when truncated."""
+        level = await retry(lambda: self.api.get_tree(sha, recursive=False), policy=GIT_RETRY_POLICY)
+        entries = [{**entry, "path": f"{prefix}{entry['path']}"} for entry in level["tree"]]
+
+        async def subtree(entry: dict) -> dict:
+            listing = await retry(lambda: self.api.get_tree(entry["sha"]), policy=GIT_RETRY_POLICY)
+            if listing.get("truncated"):
+                return await self._walk_tree(entry["sha"], f"{entry['path']}/")
+            return {
+                "tree": [{**child, "path": f"{entry['path']}/{child['path']}"} for child in listing["tree"]],
+                "truncated": False,
+            }
+
+        subtrees = await asyncio.gather(*(subtree(entry) for entry in entries if entry["type"] == "tree"))
+
+        truncated = bool(level.get("truncated"))
+        for listing in subtrees:
+            entries.extend(listing["tree"])
+            truncated = truncated or listing["truncated"]
+        return {"tree": entries, "truncated": truncated}
+
+    async def diff_files(self, base, head):
+        """Files changed between two commits, in the shape of GitHub's compare API, None when too many to list."""
+        return await retry(lambda: self.api.compare_files(base, head), policy=GIT_RETRY_POLICY)
 
     async def list_dir(self, path):
-        response = await retry(lambda: self.api.list_dir(path))
+        response = await retry(lambda: self.api.list_dir(path), policy=GIT_RETRY_POLICY)
 
         files = []
         for file in response:
             files.append((file["name"], file["path"]))
 
         return files
+
+
+def create_git(base_url, token):
+    """Git backend selected by GIT_BACKEND, both expose the same interface."""
+    if config.GIT_BACKEND == "local":
+        return LocalGit(base_url, token)
+    return Git(base_url, token)
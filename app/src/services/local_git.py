@@ -0,0 +1,333 @@
+import asyncio
+import base64
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import git
+from loguru import logger
+
+from app.src.api.git import GitError, ADD, MODIFY, DELETE
+from . import RetryPolicy
+from .commit_queue import get_commit_queue
+from ..utils import config
+
+# Pushes re-base locally on rejection, a failed commit is not worth replaying
+LOCAL_GIT_RETRY_POLICY = RetryPolicy("local-git", attempts=1)
+
+_STATUSES = {"A": "added", "M": "modified", "D": "removed"}
+
+T = TypeVar("T")
+
+
+def clone_url(repo_url: str) -> str:
+    """
+    Turn a configured repo URL into something `git clone` understands.
+    REST API URLs (https://api.github.com/repos/org/repo, https://ghe/api/v3/repos/org/repo)
+    become https clone URLs; ssh, .git and local URLs are kept.
+    """
+    parts = urlsplit(repo_url)
+    if parts.scheme not in ("http", "https") or "/repos/" not in parts.path:
+        return repo_url
+
+    owner_repo = parts.path.split("/repos/", 1)[1].strip("/")
+    host = "github.com" if parts.hostname == "api.github.com" else parts.netloc
+    return f"{parts.scheme}://{host}/{owner_repo}.git"
+
+
+def auth_env(token: Optional[str]) -> Dict[str, str]:
+    """
+    Environment passing the token to git as an http.extraHeader for each command.
+    Unlike credentials in the remote URL it never reaches the clone's .git/config.
+    """
+    if not token:
+        return {}
+    basic = base64.b64encode(f"x-access-token:{token}".encode("utf-8")).decode("ascii")
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {basic}",
+    }
+
+
+class LocalCommitBuilder:
+    """Same contract as CommitBuilder, applied to the local clone and pushed."""
+
+    def __init__(self, local: "LocalGit", attempts: int = 3):
+        self.local = local
+        self.attempts = attempts
+        self.changes: Dict[str, Tuple[str, Optional[str]]] = {}
+        self.rejected: Dict[str, GitError] = {}
+
+    def add(self, path: str, content: str) -> "LocalCommitBuilder":
+        self.changes[path.strip('/')] = (ADD, content)
+        return self
+
+    def modify(self, path: str, content: str) -> "LocalCommitBuilder":
+        self.changes[path.strip('/')] = (MODIFY, content)
+        return self
+
+    def delete(self, path: str) -> "LocalCommitBuilder":
+        self.changes[path.strip('/')] = (DELETE, None)
+        return self
+
+    async def commit(self, message: str, partial: bool = False) -> Optional[str]:
+        if not self.changes:
+            raise GitError(status_code=422, detail="Nothing staged to commit.")
+        return await asyncio.to_thread(self._commit, message, partial)
+
+    def _commit(self, message: str, partial: bool) -> Optional[str]:
+        local = self.local
+        with local.lock:
+            # Set once the working tree or HEAD may differ from origin, cleared by each sync
+            touched = False
+            try:
+                for attempt in range(self.attempts):
+                    local.sync_to_remote()
+                    touched = False
+
+                    for path, (op, _) in list(self.changes.items()):
+                        exists = os.path.isfile(local.path_of(path))
+                        error = None
+                        if op == ADD and exists:
+                            error = GitError(status_code=422, detail=f"Git path (repo or file) already exists: {path}")
+                        elif op != ADD and not exists:
+                            error = GitError(status_code=404, detail=f"Git path (repo or file) not found: {path}")
+                        if error is None:
+                            continue
+                        if not partial:
+                            raise error
+                        del self.changes[path]
+                        self.rejected[path] = error
+
+                    if not self.changes:
+                        return None
+
+                    touched = True
+                    for path, (op, content) in self.changes.items():
+                        if op == DELETE:
+                            local.repo.index.remove([path], working_tree=True)
+                            continue
+                        full_path = local.path_of(path)
+                        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                        with open(full_path, "w", encoding="utf-8") as f:
+                            f.write(content)
+                        local.repo.index.add([path])
+
+                    commit = local.repo.index.commit(message)
+
+                    try:
+                        local.repo.remote("origin").push(f"HEAD:refs/heads/{local.branch}").raise_if_error()
+                    except git.GitCommandError as e:
+                        if attempt == self.attempts - 1:
+                            raise GitError(status_code=409, detail=f"Git push to {local.branch} rejected: {e}")
+                        logger.debug(f"Push to {local.branch} rejected, re-applying on the new head")
+                        continue
+
+                    local.last_pushed = commit.hexsha
+                    return commit.hexsha
+            except BaseException:
+                # Never leave an unpushed commit or staged files for reads to serve
+                if touched:
+                    local.discard_local_changes()
+                raise
+
+
+class LocalGit:
+    """
+    Git backend answering reads from a local clone instead of the REST contents API.
+
+    The clone is kept under GIT_CLONE_DIR and fast-forwarded on every get_changed_files,
+    and before a read once it is older than GIT_LOCAL_MAX_STALENESS. Reads go to the
+    working tree under the same lock as the fetch/reset. Writes are coalesced by the
+    CommitQueue and pushed as one commit, re-applied on the new head when the push is
+    rejected.
+    """
+
+    def __init__(self, base_url, token, branch: str = "main"):
+        self.base_url = base_url
+        self.branch = branch
+        self.url = clone_url(base_url)
+        self.env = auth_env(token)
+        # Fetches and pushes are not counted against the REST rate limit, nothing to pace
+        self.rate_limit = None
+        digest = hashlib.sha256(base_url.encode("utf-8")).hexdigest()[:12]
+        self.workdir = os.path.join(config.GIT_CLONE_DIR, digest)
+        self.repo: Optional[git.Repo] = None
+        # Guards the working tree between fetch/reset and commits, taken from worker threads
+        self.lock = threading.Lock()
+        self.last_commit = None
+        self.last_pushed = None
+        self.synced_at = 0.0
+        self.commit_queue = get_commit_queue(
+            self, LOCAL_GIT_RETRY_POLICY, max(config.GIT_COMMIT_WINDOW, 0), config.GIT_COMMIT_MAX_BATCH
+        )
+
+    def path_of(self, path: str) -> str:
+        return os.path.join(self.workdir, path.strip('/'))
+
+    def _open(self) -> None:
+        if os.path.isdir(os.path.join(self.workdir, ".git")):
+            self.repo = git.Repo(self.workdir)
+            # Also scrubs credentials older versions stored in the remote URL
+            self.repo.remote("origin").set_url(self.url)
+        else:
+            logger.info(f"Cloning {self.base_url} into {self.workdir}")
+            self.repo = git.Repo.clone_from(self.url, self.workdir, branch=self.branch, env=self.env)
+        self.repo.git.update_environment(**self.env)
+        with self.repo.config_writer() as writer:
+            writer.set_value("user", "name", config.GIT_COMMITTER_NAME)
+            writer.set_value("user", "email", config.GIT_COMMITTER_EMAIL)
+        self.sync_to_remote()
+
+    def _reset_to_origin(self) -> str:
+        head = self.repo.commit(f"origin/{self.branch}")
+        self.repo.head.reference = self.repo.create_head(self.branch, head, force=True)
+        self.repo.head.reset(head, index=True, working_tree=True)
+        return head.hexsha
+
+    def sync_to_remote(self) -> str:
+        """Fetch and hard-reset the working tree to the remote branch, returns the head sha."""
+        self.repo.remote("origin").fetch(self.branch)
+        head = self._reset_to_origin()
+        self.synced_at = time.monotonic()
+        return head
+
+    def discard_local_changes(self) -> None:
+        """Drop unpushed commits and uncommitted files after a failed commit, caller holds the lock."""
+        try:
+            self.sync_to_remote()
+        except git.GitCommandError as e:
+            logger.warning(f"Could not fetch {self.base_url} after a failed commit, resetting to the last fetch: {e}")
+            self._reset_to_origin()
+            # Not fetched, the next read refreshes first
+            self.synced_at = 0.0
+        self.repo.git.clean("-fd")
+
+    async def _read(self, read: Callable[[], T]) -> T:
+        """Run `read` on the working tree under the lock, fast-forwarding a stale clone first."""
+
+        def locked() -> T:
+            with self.lock:
+                if time.monotonic() - self.synced_at >= config.GIT_LOCAL_MAX_STALENESS:
+                    try:
+                        self.sync_to_remote()
+                    except git.GitCommandError as e:
+                        logger.warning(f"Could not refresh {self.base_url}, serving the clone as is: {e}")
+                return read()
+
+        return await asyncio.to_thread(locked)
+
+    async def async_init(self):
+        def init():
+            with self.lock:
+                self._open()
+                return self.repo.head.commit.hexsha
+
+        self.last_commit = await asyncio.to_thread(init)
+
+    def commit_builder(self) -> LocalCommitBuilder:
+        return LocalCommitBuilder(self)
+
+    async def modify_file(self, path, commit_message, content):
+        await self.commit_queue.submit(MODIFY, path, content, commit_message)
+
+    async def add_file(self, path, commit_message, content):
+        await self.commit_queue.submit(ADD, path, content, commit_message)
+
+    async def delete_file(self, path, commit_message):
+        await self.commit_queue.submit(DELETE, path, None, commit_message)
+
+    async def commit_files(self, commit_message, add=None, modify=None, delete=None):
+        builder = self.commit_builder()
+        for path, content in (add or {}).items():
+            builder.add(path, content)
+        for path, content in (modify or {}).items():
+            builder.modify(path, content)
+        for path in delete or []:
+            builder.delete(path)
+
+        return await builder.commit(commit_message)
+
+    async def get_file_content(self, path):
+        def read() -> str:
+            with open(self.path_of(path), encoding="utf-8") as f:
+                return f.read()
+
+        try:
+            return await self._read(read)
+        except (FileNotFoundError, IsADirectoryError):
+            raise GitError(status_code=404, detail=f"Git path (repo or file) not found: {path}")
+
+    async def get_tree(self):
+        """Every entry of the clone's head, in the shape of GitHub's tree API: {"tree", "truncated"}."""
+
+        def walk() -> dict:
+            entries = [
+                {"path": item.path, "type": item.type, "sha": item.hexsha, "size": getattr(item, "size", 0)}
+                for item in self.repo.head.commit.tree.traverse()
+            ]
+            return {"tree": entries, "truncated": False}
+
+        return await self._read(walk)
+
+    async def list_dir(self, path):
+        directory = self.path_of(path)
+
+        def listing() -> Optional[List[Tuple[str, str]]]:
+            if not os.path.isdir(directory):
+                return None
+            return [
+                (name, os.path.relpath(os.path.join(directory, name), self.workdir))
+                for name in sorted(os.listdir(directory))
+                if name != ".git"
+            ]
+
+        files = await self._read(listing)
+        if files is None:
+            raise GitError(status_code=404, detail=f"Git path (repo or file) not found: {path}")
+        return files
+
+    def _diff(self, base: str, head: str, path: str = "") -> List[dict]:
+        # Renames are reported as removed + added, the only statuses SchemaLoader handles
+        output = self.repo.git.diff(
+            "--raw", "--no-abbrev", "--no-renames", base, head, "--", path.strip('/') or "."
+        )
+        files = []
+        for line in output.splitlines():
+            # :<old mode> <new mode> <old sha> <new sha> <status>\t<path>
+            meta, filename = line.split("\t", 1)
+            _, _, old_sha, new_sha, status = meta.split()
+            status = _STATUSES.get(status[0], "modified")
+            files.append({
+                "filename": filename,
+                "status": status,
+                "sha": old_sha if status == "removed" else new_sha,
+            })
+        return files
+
+    async def diff_files(self, base, head):
+        """Files changed between two commits, in the shape of GitHub's compare API."""
+        def diff() -> List[dict]:
+            with self.lock:
+                return self._diff(base, head)
+
+        return await asyncio.to_thread(diff)
+
+    async def get_changed_files(self, path=""):
+        """(head, files under path changed since the cursor), same contract as Git.get_changed_files."""
+
+        def diff() -> Tuple[str, List[dict]]:
+            with self.lock:
+                head = self.sync_to_remote()
+                if head == self.last_commit:
+                    return head, []
+                return head, self._diff(self.last_commit, head, path)
+
+        return await asyncio.to_thread(diff)
+
+    def advance(self, head: str) -> None:
+        self.last_commit = head
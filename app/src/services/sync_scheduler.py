@@ -0,0 +1,133 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from loguru import logger
+from prometheus_client import Counter, Gauge
+
+from ..api.rate_limit import request_priority, BACKGROUND, RateLimitScheduler
+from .webhooks import SyncTrigger
+
+SYNC_LAG = Gauge(
+    "sync_lag_seconds",
+    "Seconds since the last successful sync per resource and job",
+    ["resource", "job"],
+)
+SYNC_RUNS = Counter(
+    "sync_runs_total",
+    "Sync runs per resource and job (changed, unchanged, error, deferred)",
+    ["resource", "job", "result"],
+)
+SYNC_INTERVAL = Gauge(
+    "sync_interval_seconds",
+    "Current adaptive polling interval per resource and job",
+    ["resource", "job"],
+)
+
+
+class SyncJob:
+    """
+    One periodic sync, e.g. the schemas or the catalog of a resource.
+
+    `run` returns whether anything changed. The interval starts at `interval`, grows by
+    `backoff` while the repository stays idle up to `interval * max_factor`, and drops
+    back to `interval` as soon as a change is seen. A fired trigger runs it right away.
+    `rate_limit` is the scheduler of the token its Git calls use, if any.
+    """
+
+    def __init__(
+        self,
+        resource: str,
+        name: str,
+        run: Callable[[], Awaitable[bool]],
+        interval: float,
+        trigger: Optional[SyncTrigger] = None,
+        max_factor: float = 8.0,
+        backoff: float = 1.5,
+        rate_limit: Optional[RateLimitScheduler] = None,
+    ):
+        self.resource = resource
+        self.name = name
+        self.run = run
+        self.base_interval = interval
+        self.max_interval = interval * max(1.0, max_factor)
+        self.backoff = backoff
+        self.interval = interval
+        self.trigger = trigger or SyncTrigger()
+        self.rate_limit = rate_limit
+        self.last_success = time.monotonic()
+
+    def adapt(self, changed: bool) -> None:
+        if changed:
+            self.interval = self.base_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        SYNC_INTERVAL.labels(resource=self.resource, job=self.name).set(self.interval)
+
+
+class SyncScheduler:
+    """
+    Owns the sync jobs of all resources. Intervals are jittered by ±`jitter` and the
+    first run of each job is spread over its interval, so polls of many resources do not
+    hit GitHub in bursts. At most `max_concurrency` syncs run at once, and a job whose token
+    has its background calls held back is deferred instead of waiting in one of those slots.
+    """
+
+    def __init__(self, max_concurrency: int, jitter: float):
+        self.jobs: List[SyncJob] = []
+        self.jitter = jitter
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, job: SyncJob) -> SyncJob:
+        self.jobs.append(job)
+        SYNC_LAG.labels(resource=job.resource, job=job.name).set_function(
+            lambda: time.monotonic() - job.last_success
+        )
+        return job
+
+    def _delay(self, job: SyncJob) -> float:
+        return job.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def start(self) -> None:
+        for job in self.jobs:
+            self._tasks.append(asyncio.create_task(self._loop(job, first_delay=random.uniform(0, job.interval))))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_once(self, job: SyncJob) -> Optional[float]:
+        """Run the job, or return the seconds to defer it by while its token's rate limit holds it back."""
+        deferred = job.rate_limit.background_delay(reserve=False) if job.rate_limit else 0.0
+        if deferred > 0:
+            SYNC_RUNS.labels(resource=job.resource, job=job.name, result="deferred").inc()
+            logger.debug(f"{job.name} sync for {job.resource} deferred by {deferred:.1f}s for the rate limit")
+            return deferred
+
+        async with self._semaphore:
+            try:
+                changed = await job.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                SYNC_RUNS.labels(resource=job.resource, job=job.name, result="error").inc()
+                logger.error(f"{job.name} sync for {job.resource} failed: {e}")
+                return None
+
+        job.last_success = time.monotonic()
+        job.adapt(bool(changed))
+        SYNC_RUNS.labels(resource=job.resource, job=job.name, result="changed" if changed else "unchanged").inc()
+        return None
+
+    async def _loop(self, job: SyncJob, first_delay: float) -> None:
+        # Polling must not eat into the rate limit user-facing writes rely on
+        request_priority.set(BACKGROUND)
+        delay = first_delay
+        while True:
+            await job.trigger.wait(delay)
+            deferred = await self.run_once(job)
+            delay = deferred if deferred else self._delay(job)
@@ -1,6 +1,15 @@
 import asyncio
 from app.src.api.vault import VaultAPI, VaultError
-from . import retry
+from . import retry, RetryPolicy
+
+# 412 is returned by Vault performance standbys that have not caught up yet
+VAULT_RETRY_POLICY = RetryPolicy(
+    "vault",
+    attempts=3,
+    base_delay=0.25,
+    max_delay=4.0,
+    retryable_statuses=frozenset({412, 429, 500, 502, 503, 504}),
+)
 
 
 class Vault:
@@ -8,11 +17,11 @@ class Vault:
         self.api = VaultAPI(base_url, token)
 
     async def read_secret(self, path: str):
-        response = await retry(lambda: self.api.read_secret(path))
+        response = await retry(lambda: self.api.read_secret(path), policy=VAULT_RETRY_POLICY)
         return response.get("data")
 
     async def write_secret(self, path: str, data: dict):
-        await retry(lambda: self.api.write_secret(path, data))
+        await retry(lambda: self.api.write_secret(path, data), policy=VAULT_RETRY_POLICY)
 
     async def delete_secret(self, path: str):
-        await retry(lambda: self.api.delete_secret(path))
+        await retry(lambda: self.api.delete_secret(path), policy=VAULT_RETRY_POLICY)
@@ -0,0 +1,53 @@
+import asyncio
+import hashlib
+import hmac
+import re
+from typing import Optional
+from urllib.parse import urlsplit
+
+# git@github.com:org/repo.git, ssh://git@host/org/repo.git
+_SCP_URL = re.compile(r"^[\w.-]+@[\w.-]+:(?P<path>.+)$")
+
+
+def repo_full_name(url: str) -> Optional[str]:
+    """
+    "owner/repo" of a configured repo URL, the form push webhooks name the repository in.
+    Works for REST API URLs (…/repos/owner/repo), https clone URLs and scp-like ssh URLs.
+    """
+    match = _SCP_URL.match(url)
+    path = match.group("path") if match else urlsplit(url).path
+    if "/repos/" in path:
+        path = path.split("/repos/", 1)[1]
+
+    parts = path.strip("/").removesuffix(".git").split("/")
+    if len(parts) < 2:
+        return None
+    return "/".join(parts[-2:]).lower()
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check GitHub's X-Hub-Signature-256 header (sha256=<hex HMAC of the body>)."""
+    if not secret or not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
+
+
+class SyncTrigger:
+    """Wakes a polling loop early. Fires while a sync runs are kept for the next wait."""
+
+    def __init__(self):
+        self._event = asyncio.Event()
+
+    def fire(self) -> None:
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until fired or `timeout` seconds passed, True when fired."""
+        if not self._event.is_set():
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        self._event.clear()
+        return True
@@ -1,14 +1,15 @@
 import os
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import SettingsConfigDict
 from pydantic import Field
 from ...general.utils.config import BasicSettings
 from ..models.hooks import ResourceHookMapping
+from ..schemas.settings import SchemaSettings
 import json
 
 
-class Config(BasicSettings):
+class Config(BasicSettings, SchemaSettings):
     _instance = None
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8",extra="allow")
@@ -56,6 +57,142 @@ class Config(BasicSettings):
         examples=["perimeter", "platform"],
     )
 
+    RETRY_BUDGET_PER_REQUEST: int = Field(
+        default=6,
+        description="Maximum number of upstream retries all calls of one inbound request may spend together.",
+        examples=[4, 6],
+    )
+
+    DEFAULT_REQUEST_DEADLINE: float = Field(
+        default=30.0,
+        description="Default time budget in seconds for an inbound request, including all upstream calls and retries.",
+        examples=[15.0, 30.0],
+    )
+
+    REQUEST_DEADLINES: dict[str, float] = Field(
+        default={"read": 10.0, "status": 10.0, "create": 45.0, "update": 45.0, "delete": 120.0},
+        description="Per-operation override of DEFAULT_REQUEST_DEADLINE.",
+        examples=[{"read": 5.0, "delete": 90.0}],
+    )
+
+    GIT_RESPONSE_CACHE_MAX_ENTRIES: int = Field(
+        default=2048,
+        description="Maximum number of Git responses kept for conditional (ETag) revalidation, per token.",
+        examples=[512, 2048],
+    )
+
+    GIT_RESPONSE_CACHE_MAX_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        description="Maximum total size in bytes of cached Git response bodies, per token.",
+        examples=[16 * 1024 * 1024],
+    )
+
+    GIT_RATE_LIMIT_RESERVE_RATIO: float = Field(
+        default=0.2,
+        description="Share of each Git token's rate limit kept for user-facing calls; background work waits for the reset instead.",
+        examples=[0.1, 0.2],
+    )
+
+    GIT_COMMIT_WINDOW: float = Field(
+        default=0,
+        description="Seconds writes to the same repository are collected to be pushed as one commit, 0 commits every write on its own through the contents API. A coalesced commit costs about 7 Data API calls, so enable it only for bursty writes.",
+        examples=[0, 0.05, 0.2],
+    )
+
+    GIT_COMMIT_MAX_BATCH: int = Field(
+        default=50,
+        description="Maximum number of file changes coalesced into one commit.",
+        examples=[20, 50],
+    )
+
+    GIT_BACKEND: Literal["api", "local"] = Field(
+        default="api",
+        description="How schemas and values repos are accessed: the REST contents API, or a local clone kept in sync with the remote.",
+        examples=["api", "local"],
+    )
+
+    GIT_CLONE_DIR: str = Field(
+        default="/tmp/k8s-provisions/repos",
+        description="Directory holding the local clones when GIT_BACKEND is local.",
+        examples=["/var/lib/k8s-provisions/repos"],
+    )
+
+    GIT_LOCAL_MAX_STALENESS: float = Field(
+        default=30.0,
+        description="Seconds a local clone serves reads before they fetch from the remote first, 0 fetches before every read.",
+        examples=[0, 30, 120],
+    )
+
+    GIT_COMMITTER_NAME: str = Field(
+        default="k8s-provisions",
+        description="Author of commits pushed from the local clones.",
+    )
+
+    GIT_COMMITTER_EMAIL: str = Field(
+        default="k8s-provisions@localhost",
+        description="Author email of commits pushed from the local clones.",
+    )
+
+    CATALOG_REFRESH_INTERVAL: float = Field(
+        default=60.0,
+        description="Seconds between catalog index refreshes from the values repository's commit history.",
+        examples=[30.0, 60.0],
+    )
+
+    BATCH_GET_CONCURRENCY: int = Field(
+        default=8,
+        description="Maximum number of configurations one batch-get request reads concurrently.",
+        examples=[4, 8],
+    )
+
+    BATCH_GET_MAX_ITEMS: int = Field(
+        default=100,
+        description="Maximum number of apps one batch-get request may ask for.",
+        examples=[50, 100],
+    )
+
+    CONFIG_CACHE_MAX_ENTRIES: int = Field(
+        default=10000,
+        description="Maximum number of app configurations cached in memory per resource.",
+        examples=[1000, 10000],
+    )
+
+    CONFIG_CACHE_TTL: float = Field(
+        default=300.0,
+        description="Seconds a cached app configuration is served before it is read from Git again.",
+        examples=[60.0, 300.0],
+    )
+
+    GITHUB_WEBHOOK_SECRET: Optional[str] = Field(
+        default=None,
+        description="Secret of the GitHub push webhook of the schemas and values repos. When set, POST /v1/webhooks/github triggers syncs and polling slows down to WEBHOOK_FALLBACK_INTERVAL.",
+        examples=["3f9c0b1e..."],
+    )
+
+    WEBHOOK_FALLBACK_INTERVAL: float = Field(
+        default=600.0,
+        description="Seconds between schema and catalog polls when push webhooks are enabled, catches deliveries that were lost.",
+        examples=[300.0, 900.0],
+    )
+
+    SYNC_MAX_CONCURRENCY: int = Field(
+        default=4,
+        description="Schema and catalog syncs of all resources allowed to run at the same time.",
+        examples=[2, 8],
+    )
+
+    SYNC_JITTER: float = Field(
+        default=0.2,
+        description="Random spread applied to sync intervals as a fraction (0.2 = ±20%), keeps resources from polling in lockstep.",
+        examples=[0.1, 0.3],
+    )
+
+    SYNC_MAX_INTERVAL_FACTOR: float = Field(
+        default=8.0,
+        description="How far the sync interval of an idle repository may grow, as a multiple of its configured interval. 1 disables adaptation.",
+        examples=[1.0, 16.0],
+    )
+
     REPO_URL: Optional[str] = None
 
     ACCESS_TOKEN: Optional[str] = None
@@ -0,0 +1,243 @@
+"""
+Microbenchmarks of SchemaResolver against the previous jsonschema.RefResolver based engine.
+
+    python benchmarks/resolver_bench.py [--versions 200] [--properties 300] [--shared 20] [--repeat 3]
+
+Both engines first resolve the store once and must agree on every resolved schema (up to
+duplicate required entries, see canonical) and on the reference graph, so the timings compare
+the same result.
+
+Synthetic stores: small field schemas, `shared` schemas of `properties` properties
+referring to them, and `versions` versions combining three shared schemas with allOf. Needs the
+service environment (.env) because importing app.src loads its config.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.src.schemas.resolver import SchemaResolver, intern_schema  # noqa: E402
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from jsonschema import RefResolver  # noqa: E402
+
+
+def legacy_deep_merge_props(target: dict, source: dict):
+    for key, value in source.items():
+        if (
+            key in target
+            and isinstance(target[key], dict)
+            and isinstance(value, dict)
+        ):
+            # Copy on write, target[key] may be a node shared with other schemas
+            merged = dict(target[key])
+            legacy_deep_merge_props(merged, value)
+            target[key] = merged
+        else:
+            target[key] = value
+
+
+class LegacySchemaResolver:
+    """
+    The jsonschema.RefResolver based engine as it was right before SchemaResolver replaced it.
+
+    That is not the repository's original resolver, which differed in three ways:
+
+    - its deep merge wrote into the merged dicts in place, i.e. into resolved $ref schemas
+      shared by every schema referring to them, which corrupts them and fails outright on
+      the immutable interned nodes the stores hold;
+    - it restored referred_in/referred_to symmetry by scanning every entry after each call,
+      not only the entries that call touched, quadratic over a full load;
+    - it did not intern resolved schemas.
+
+    All three changed before the switch, so the original neither produces the output
+    check_equivalent compares against nor is the baseline the speedup was measured from.
+    """
+
+    def __init__(self) -> None:
+        self.resolved_schemas: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def resolve_refs(self, version: str, schema: dict, schema_store: dict) -> dict:
+        if not isinstance(schema, dict):
+            raise TypeError(f"Expected schema to be dict, got {type(schema)}: {schema}")
+
+        resolver = RefResolver.from_schema(schema, store=schema_store or {})
+        touched = set()
+
+        def _ensure_entry(name):
+            touched.add(name)
+            self.resolved_schemas.setdefault(name, {
+                "referred_in": set(),
+                "referred_to": set(),
+                "schema": None,
+            })
+
+        def _resolve(node, name):
+            if isinstance(node, dict):
+                if "$ref" in node:
+                    ref = node["$ref"]
+
+                    _ensure_entry(ref)
+                    _ensure_entry(name)
+
+                    # record both ways
+                    self.resolved_schemas[ref]["referred_in"].add(name)
+                    self.resolved_schemas[name]["referred_to"].add(ref)
+
+                    if self.resolved_schemas[ref]["schema"] is not None:
+                        return self.resolved_schemas[ref]["schema"]
+
+                    with resolver.resolving(ref) as resolved:
+                        resolved_schema = intern_schema(_resolve(resolved, ref))
+                        self.resolved_schemas[ref]["schema"] = resolved_schema
+                        return resolved_schema
+
+                if "allOf" in node:
+                    merged = {}
+                    for subschema in node["allOf"]:
+                        resolved = _resolve(subschema, name)
+                        if "required" in resolved:
+                            merged.setdefault("required", []).extend(resolved["required"])
+                        if "properties" in resolved:
+                            merged.setdefault("properties", {})
+                            legacy_deep_merge_props(merged["properties"], resolved["properties"])
+                        for k, v in resolved.items():
+                            if k not in {"required", "properties"}:
+                                merged[k] = v
+                    return merged
+
+                return {k: _resolve(v, name) for k, v in node.items()}
+
+            elif isinstance(node, list):
+                return [_resolve(i, name) for i in node]
+
+            return node
+
+        _ensure_entry(version)
+        self.resolved_schemas[version]["schema"] = intern_schema(_resolve(schema, version))
+
+        # --- enforce symmetry after recursion, only entries this call could have linked ---
+        for schema_name in list(touched):
+            for ref in list(self.resolved_schemas[schema_name]["referred_to"]):
+                _ensure_entry(ref)
+                self.resolved_schemas[ref]["referred_in"].add(schema_name)
+
+
+def synthetic_store(versions: int, properties: int, shared: int, fields: int = 20) -> dict:
+    """
+    `fields` small field schemas, `shared` schemas of `properties` properties (every 4th a
+    $ref to a field, every 10th a nested object) and `versions` versions allOf-ing three
+    shared schemas plus their own overrides.
+    """
+    store = {}
+    for f in range(fields):
+        store[f"field-{f}.json"] = {"type": "string", "description": f"field {f}", "maxLength": 64 + f}
+
+    for s in range(shared):
+        props = {}
+        for p in range(properties):
+            if p % 4 == 0:
+                props[f"p{p}"] = {"$ref": f"field-{(p + s) % fields}.json"}
+            elif p % 10 == 1:
+                props[f"p{p}"] = {
+                    "type": "object",
+                    "properties": {"host": {"$ref": f"field-{p % fields}.json"}, "port": {"type": "integer"}},
+                    "required": ["host"],
+                }
+            else:
+                props[f"p{p}"] = {"type": "string", "description": f"property {p} of shared {s}"}
+        store[f"shared-{s}.json"] = {
+            "type": "object",
+            "properties": props,
+            "required": [f"p{p}" for p in range(0, properties, 7)],
+        }
+
+    for v in range(versions):
+        picks = [(v + i) % shared for i in range(3)]
+        store[f"{v // 100}.{v // 10 % 10}.{v % 10}"] = {
+            "type": "object",
+            "allOf": [{"$ref": f"shared-{s}.json"} for s in picks]
+            + [{"properties": {"replicas": {"type": "integer"}}, "required": ["replicas"]}],
+        }
+    return store
+
+
+def resolve_all(resolver_cls, store: dict):
+    resolver = resolver_cls()
+    for name, schema in store.items():
+        resolver.resolve_refs(name, schema, store)
+    return resolver
+
+
+def run_full(resolver_cls, store: dict) -> float:
+    started = time.perf_counter()
+    resolve_all(resolver_cls, store)
+    return time.perf_counter() - started
+
+
+def canonical(node: Any) -> Any:
+    """
+    `node` with duplicate required entries dropped, first occurrence kept: the legacy allOf
+    merge concatenated required lists, SchemaResolver de-duplicates them (JSON Schema wants
+    them unique). Validation treats both the same, so that is the one difference allowed.
+    """
+    if isinstance(node, dict):
+        return {
+            k: list(dict.fromkeys(v)) if k == "required" and isinstance(v, list) else canonical(v)
+            for k, v in node.items()
+        }
+    if isinstance(node, list):
+        return [canonical(i) for i in node]
+    return node
+
+
+def check_equivalent(store: dict) -> None:
+    """Fail unless both engines resolve every schema and the reference graph the same way."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        legacy = resolve_all(LegacySchemaResolver, store).resolved_schemas
+    current = resolve_all(SchemaResolver, store).resolved_schemas
+
+    if legacy.keys() != current.keys():
+        raise AssertionError(f"Resolved names differ: {sorted(legacy.keys() ^ current.keys())}")
+    for name, entry in legacy.items():
+        if canonical(entry["schema"]) != canonical(current[name]["schema"]):
+            raise AssertionError(f"{name}: resolved schema differs between the legacy and the new engine")
+        for key in ("referred_in", "referred_to"):
+            if entry[key] != current[name][key]:
+                raise AssertionError(f"{name}: {key} differs between the legacy and the new engine")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--versions", type=int, default=200)
+    parser.add_argument("--properties", type=int, default=300)
+    parser.add_argument("--shared", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    # Interned like SchemaLoader stores them
+    store = {name: intern_schema(schema) for name, schema in synthetic_store(args.versions, args.properties, args.shared).items()}
+    print(f"{len(store)} schemas: {args.versions} versions over {args.shared} shared schemas of {args.properties} properties")
+    check_equivalent(store)
+    print("  both engines resolve to the same schemas and reference graph")
+
+    results = {}
+    for label, resolver_cls in (("legacy RefResolver", LegacySchemaResolver), ("SchemaResolver", SchemaResolver)):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            times = [run_full(resolver_cls, store) for _ in range(args.repeat)]
+        results[label] = statistics.median(times)
+        print(f"  {label:<20} median {results[label] * 1000:9.1f} ms  (min {min(times) * 1000:.1f} ms)")
+
+    print(f"  speedup {results['legacy RefResolver'] / results['SchemaResolver']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
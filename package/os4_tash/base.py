@@ -2,17 +2,141 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import httpx
+from loguru import logger
+from prometheus_client import Gauge
+
+__all__ = ["BaseAPI", "HTTPClientPool", "http_pool"]
+
+POOL_MAX_CONNECTIONS = Gauge(
+    "http_pool_max_connections",
+    "Configured connection limit of the pooled HTTP client per upstream",
+    ["upstream"],
+)
+POOL_CONNECTIONS = Gauge(
+    "http_pool_connections",
+    "Connections held by the pooled HTTP client per upstream",
+    ["upstream", "state"],
+)
+POOL_QUEUED_REQUESTS = Gauge(
+    "http_pool_queued_requests",
+    "Requests waiting for a free pooled connection per upstream",
+    ["upstream"],
+)
+POOL_IN_FLIGHT = Gauge(
+    "http_pool_in_flight_requests",
+    "Requests currently in flight on the pooled HTTP client per upstream",
+    ["upstream"],
+)
+
+
+class HTTPClientPool:
+    """Registry holding one long-lived :class:`httpx.AsyncClient` per upstream.
+
+    Sharing the client keeps connections alive between requests so repeated
+    calls to the same upstream skip the TCP and TLS handshakes.  Clients are
+    bound to the event loop that created them and are transparently replaced
+    when used from another loop.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+    ) -> None:
+        self.limits = limits or httpx.Limits(
+            max_connections=20,
+            max_keepalive_connections=10,
+            keepalive_expiry=30.0,
+        )
+        self.http2 = http2
+        self._clients: Dict[Tuple[str, bool], httpx.AsyncClient] = {}
+        self._loops: Dict[Tuple[str, bool], asyncio.AbstractEventLoop] = {}
+
+    def configure(self, limits: Optional[httpx.Limits] = None, http2: Optional[bool] = None) -> None:
+        """Change pool settings, applied to clients opened afterwards."""
+
+        if limits is not None:
+            self.limits = limits
+        if http2 is not None:
+            self.http2 = http2
+
+    def _http2_enabled(self) -> bool:
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+            return False
+        return self.http2
+
+    def get(self, upstream: str, verify: bool) -> httpx.AsyncClient:
+        """Return the pooled client of ``upstream``, opening it when needed."""
+
+        key = (upstream, verify)
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(key)
+
+        if client is not None and not client.is_closed and self._loops.get(key) is loop:
+            return client
+
+        client = httpx.AsyncClient(limits=self.limits, http2=self._http2_enabled(), verify=verify)
+        self._clients[key] = client
+        self._loops[key] = loop
+        if self.limits.max_connections is not None:
+            POOL_MAX_CONNECTIONS.labels(upstream=upstream).set(self.limits.max_connections)
+        return client
+
+    async def open(self) -> None:
+        """Drop clients created on another event loop, call on startup."""
+
+        loop = asyncio.get_running_loop()
+        for key in [k for k, client_loop in self._loops.items() if client_loop is not loop]:
+            self._clients.pop(key, None)
+            self._loops.pop(key, None)
+
+    async def close(self, upstream: str, verify: bool) -> None:
+        key = (upstream, verify)
+        client = self._clients.pop(key, None)
+        loop = self._loops.pop(key, None)
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.aclose()
+
+    async def aclose(self) -> None:
+        """Close every pooled client, call on shutdown."""
+
+        for upstream, verify in list(self._clients):
+            await self.close(upstream, verify)
+
+    def observe(self, upstream: str, verify: bool) -> None:
+        """Export connection pool utilisation of ``upstream`` as Prometheus gauges."""
+
+        client = self._clients.get((upstream, verify))
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        if pool is None:
+            return
+
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        queued = sum(1 for r in getattr(pool, "_requests", []) if r.is_queued())
+
+        POOL_CONNECTIONS.labels(upstream=upstream, state="active").set(len(connections) - idle)
+        POOL_CONNECTIONS.labels(upstream=upstream, state="idle").set(idle)
+        POOL_QUEUED_REQUESTS.labels(upstream=upstream).set(queued)
+
+
+http_pool = HTTPClientPool()
 
 
 class BaseAPI:
     """Small asynchronous wrapper around :class:`httpx.AsyncClient`.
 
-    Each request opens a short lived client instance to avoid sharing state
-    across coroutines.  The helper centralises the base URL, default headers
-    and timeout configuration used by the higher level API clients.
+    Requests are sent through a client pooled per upstream (see
+    :data:`http_pool`), so connections are reused across calls and across
+    instances talking to the same upstream.  The helper centralises the base
+    URL, default headers and timeout configuration used by the higher level
+    API clients.
     """
 
     def __init__(
@@ -21,11 +145,13 @@ class BaseAPI:
         headers: Optional[Dict[str, str]] = None,
         timeout: Optional[float] = 10.0,
         verify: bool = False,
+        upstream: Optional[str] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.headers = headers or {}
         self.timeout = timeout
         self.verify = verify
+        self.upstream = upstream or httpx.URL(self.base_url).host
 
     async def request(
         self,
@@ -41,13 +167,10 @@ class BaseAPI:
 
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         merged_headers = {**self.headers, **(headers or {})}
+        client = http_pool.get(self.upstream, self.verify)
 
-        async with httpx.AsyncClient(
-            base_url=self.base_url,
-            headers=merged_headers,
-            timeout=self.timeout,
-            verify=self.verify,
-        ) as client:
+        POOL_IN_FLIGHT.labels(upstream=self.upstream).inc()
+        try:
             response = await client.request(
                 method=method.upper(),
                 url=url,
@@ -56,7 +179,11 @@ class BaseAPI:
                 json=json,
                 headers=merged_headers,
                 files=files,
+                timeout=self.timeout,
             )
+        finally:
+            POOL_IN_FLIGHT.labels(upstream=self.upstream).dec()
+            http_pool.observe(self.upstream, self.verify)
         return response
 
     async def get(self, endpoint: str, **kwargs: Any) -> httpx.Response:
@@ -95,3 +222,7 @@ class BaseAPI:
         response = await self.get(endpoint)
         return response.content
 
+    async def close(self) -> None:
+        """Close the pooled client of this instance's upstream."""
+
+        await http_pool.close(self.upstream, self.verify)
@@ -7,9 +7,11 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, AsyncGenerator, Callable, Coroutine
 
+import httpx
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import FileResponse
 
+from ..base import http_pool
 from .middlewares import add_middlewares
 from .routes import add_routers
 from .tasks import get_tasks
@@ -46,6 +48,17 @@ def general_create_app(
     async def lifespan(app: FastAPI) -> AsyncGenerator[None, Any]:
         tasks: list[asyncio.Task] = []
 
+        # Open upstream connection pools on the server's event loop
+        http_pool.configure(
+            limits=httpx.Limits(
+                max_connections=basicSettings.HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=basicSettings.HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=basicSettings.HTTP_POOL_KEEPALIVE_EXPIRY,
+            ),
+            http2=basicSettings.HTTP2_ENABLED,
+        )
+        await http_pool.open()
+
         for coro_fn in async_background_tasks:
             task = asyncio.create_task(coro_fn())
             tasks.append(task)
@@ -56,6 +69,7 @@ def general_create_app(
             for task in tasks:
                 task.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
+            await http_pool.aclose()
 
     app = FastAPI(
         **fastapi_kwargs,
@@ -112,3 +112,27 @@ class BasicSettings(BaseSettings):
         description="Path for liveness probe.",
         examples=["/liveness", "/api/liveness"],
     )
+
+    HTTP_POOL_MAX_CONNECTIONS: int = Field(
+        default=20,
+        description="Maximum number of concurrent connections per upstream HTTP pool.",
+        examples=[20, 100],
+    )
+
+    HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=10,
+        description="Maximum number of idle keep-alive connections kept per upstream HTTP pool.",
+        examples=[10, 50],
+    )
+
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = Field(
+        default=30.0,
+        description="Seconds an idle keep-alive connection is kept open before it is closed.",
+        examples=[5.0, 30.0],
+    )
+
+    HTTP2_ENABLED: bool = Field(
+        default=False,
+        description="Whether upstream HTTP clients negotiate HTTP/2 (requires the 'h2' package).",
+        examples=[True, False],
+    )
@@ -56,7 +56,7 @@ class GitAPI:
 
     def __init__(self, base_url: str, token: str) -> None:
         headers = {"Authorization": f"Bearer {token}"}
-        self.api = BaseAPI(base_url.rstrip("/"), headers=headers)
+        self.api = BaseAPI(base_url.rstrip("/"), headers=headers, upstream="git")
 
     async def get_file(self, path: str) -> Dict[str, Any]:
         response = await self.api.get(f"/contents/{path.lstrip('/')}")
@@ -39,7 +39,7 @@ def _generate_metadata_path(path: str) -> str:
 class VaultAPI:
     def __init__(self, base_url: str, token: str) -> None:
         headers = {"X-Vault-Token": token, "Content-Type": "application/json"}
-        self.api = BaseAPI(base_url.rstrip("/"), headers=headers)
+        self.api = BaseAPI(base_url.rstrip("/"), headers=headers, upstream="vault")
 
     async def read_secret(self, path: str) -> Dict:
         secret_path = _generate_secret_path(path)
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+from app.src import routers
+
+
+class FakeGit:
+    def __init__(self, url, token):
+        self.url = url
+
+    async def async_init(self):
+        return None
+
+
+class FakeGenerator:
+    """Records when each resource's prepare ran, slower for resources configured first."""
+
+    events = []
+
+    def __init__(self, app, resource, git, schema_manager, argocd, vault, team_name, hooks_mapping):
+        self.resource = resource
+
+    async def prepare(self):
+        FakeGenerator.events.append(("start", self.resource))
+        await asyncio.sleep({"first": 0.03, "second": 0.02, "third": 0.01}[self.resource])
+        FakeGenerator.events.append(("done", self.resource))
+
+    async def generate_routes(self):
+        FakeGenerator.events.append(("routes", self.resource))
+
+
+@pytest.mark.asyncio
+async def test_resources_are_prepared_concurrently_and_registered_in_order(monkeypatch):
+    resources = {
+        name: {"SCHEMAS_REPO_URL": f"{name}-schemas", "SCHEMAS_ACCESS_TOKEN": "t",
+               "VALUES_REPO_URL": f"{name}-values", "VALUES_ACCESS_TOKEN": "t"}
+        for name in ("first", "second", "third")
+    }
+    monkeypatch.setattr(routers, "resources_config", resources)
+    monkeypatch.setattr(routers, "create_git", FakeGit)
+    monkeypatch.setattr(routers, "RouterGenerator", FakeGenerator)
+    monkeypatch.setattr(routers, "SchemaLoader", lambda resource, git, app: None)
+    monkeypatch.setattr(routers, "ArgoCD", lambda *args: None)
+    monkeypatch.setattr(routers, "Vault", lambda *args: None)
+    FakeGenerator.events = []
+    app = FastAPI()
+    app.state.router_generators = []
+
+    await routers.generate_router(app)
+
+    events = FakeGenerator.events
+    # Every resource started before the slowest one finished
+    assert [event for event, _ in events[:3]] == ["start"] * 3
+    assert [resource for event, resource in events if event == "done"] == ["third", "second", "first"]
+    assert [resource for event, resource in events if event == "routes"] == ["first", "second", "third"]
+    assert [rg.resource for rg in app.state.router_generators] == ["first", "second", "third"]
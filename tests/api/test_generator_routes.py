@@ -1,8 +1,14 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
 import pytest
 from fastapi import FastAPI
 import httpx
 from httpx import ASGITransport
 
+from app.src.api.git import GitError
+from app.src.routers import generator as generator_module
 from app.src.routers.generator import RouterGenerator
 
 
@@ -122,3 +128,148 @@ async def test_delete_route_invokes_git_and_vault():
     assert any(p[0].endswith("/eu/ns/app.yaml") for p in fake_git.deleted)
     # Verify new secret path format: /{resource}/{cluster}/{namespace}/{application_name}
     assert f"/service/eu/ns/app" in fake_vault.deleted
+
+
+@pytest.mark.asyncio
+async def test_list_apps_route_paginates_from_catalog():
+    app = FastAPI()
+    generator = RouterGenerator(
+        app=app,
+        resource="service",
+        git=FakeGit(),
+        schema_manager=FakeSchemaManager(),
+        argocd=FakeArgocd(),
+        vault=FakeVault(),
+        team_name="team",
+    )
+    for path in ("/eu/ns/a.yaml", "/eu/ns/b.yaml", "/eu/other/c.yaml", "/us/ns/d.yaml"):
+        generator.catalog.record_write(path, "key: value\n")
+
+    await generator.generate_routes()
+
+    async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.get("/v1/service/apps", params={"limit": 2})
+        assert r.status_code == 200
+        page = r.json()
+        assert [i["name"] for i in page["items"]] == ["a", "b"]
+
+        r = await client.get("/v1/service/apps", params={"limit": 2, "cursor": page["next_cursor"]})
+        page = r.json()
+        assert [i["name"] for i in page["items"]] == ["c", "d"]
+        assert page["next_cursor"] is None
+
+        r = await client.get("/v1/service/apps", params={"cluster": "eu", "namespace": "ns"})
+        assert [i["name"] for i in r.json()["items"]] == ["a", "b"]
+
+        r = await client.get("/v1/service/apps", params={"cursor": "bogus"})
+        assert r.status_code == 400
+
+        for decoded in (b"[1,2,3]", b'{"a": 1}', b'["eu", "ns"]'):
+            r = await client.get("/v1/service/apps", params={"cursor": base64.urlsafe_b64encode(decoded).decode()})
+            assert r.status_code == 400
+
+
+class CountingGit(FakeGit):
+    """Serves values files slowly, tracking reads and how many overlap."""
+
+    def __init__(self, files):
+        super().__init__()
+        self.files = files
+        self.reads = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_file_content(self, path: str):
+        self.reads.append(path)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if path not in self.files:
+                raise GitError(status_code=404, detail=f"Git path (repo or file) not found: {path}")
+            if self.files[path] is None:
+                raise RuntimeError("connection reset")
+            return self.files[path]
+        finally:
+            self.in_flight -= 1
+
+
+def _batch_body(*apps):
+    # BatchGetRequest validates clusters against CLUSTERS, the handler only reads these attributes
+    return SimpleNamespace(apps=[
+        SimpleNamespace(cluster=SimpleNamespace(value=c), namespace=ns, name=name) for c, ns, name in apps
+    ])
+
+
+def _batch_generator(git):
+    return RouterGenerator(
+        app=FastAPI(),
+        resource="service",
+        git=git,
+        schema_manager=FakeSchemaManager(),
+        argocd=FakeArgocd(),
+        vault=FakeVault(),
+        team_name="team",
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_get_reads_each_app_once_and_reports_errors_per_item():
+    git = CountingGit({"/eu/ns/a.yaml": "a: 1\n", "/eu/ns/broken.yaml": None})
+    handler = _batch_generator(git)._make_batch_get_handler()
+
+    items = await handler(_batch_body(
+        ("eu", "ns", "a"), ("eu", "ns", "missing"), ("eu", "ns", "a"), ("eu", "ns", "broken"),
+    ))
+
+    assert sorted(git.reads) == ["/eu/ns/a.yaml", "/eu/ns/broken.yaml", "/eu/ns/missing.yaml"]
+    assert [item.name for item in items] == ["a", "missing", "a", "broken"]
+    assert items[0].config == items[2].config == "a: 1\n"
+    assert items[0].error is None
+    assert (items[1].config, items[1].error.status_code) == (None, 404)
+    assert (items[3].error.status_code, items[3].error.detail) == (500, "connection reset")
+
+
+@pytest.mark.asyncio
+async def test_batch_get_bounds_concurrent_reads(monkeypatch):
+    monkeypatch.setattr(generator_module.cfg, "BATCH_GET_CONCURRENCY", 2)
+    git = CountingGit({f"/eu/ns/app-{i}.yaml": "a: 1\n" for i in range(6)})
+    handler = _batch_generator(git)._make_batch_get_handler()
+
+    items = await handler(_batch_body(*(("eu", "ns", f"app-{i}") for i in range(6))))
+
+    assert all(item.error is None for item in items)
+    assert len(git.reads) == 6
+    assert git.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_namespaces_map_comes_from_the_cluster_secret_only(monkeypatch):
+    class SecretArgocd(FakeArgocd):
+        async def get_app_values(self, name: str):
+            return "namespaces: ns\n"
+
+    class TreeGit(FakeGit):
+        async def get_tree(self):
+            # "lagging" has apps in the values repo but is missing from the cluster secret
+            return {"tree": [
+                {"type": "blob", "path": "eu/ns/a.yaml", "sha": "aa" * 20, "size": 1},
+                {"type": "blob", "path": "eu/lagging/b.yaml", "sha": "bb" * 20, "size": 1},
+            ], "truncated": False}
+
+    monkeypatch.setattr(generator_module.cfg, "CLUSTERS", ["eu"])
+    generator = RouterGenerator(
+        app=FastAPI(),
+        resource="service",
+        git=TreeGit(),
+        schema_manager=FakeSchemaManager(),
+        argocd=SecretArgocd(),
+        vault=FakeVault(),
+        team_name="team",
+    )
+
+    await generator.prepare()
+
+    assert generator.catalog.namespaces("eu") == ["lagging", "ns"]
+    # So create still adds "lagging" to the cluster secret
+    assert generator.namespaces_clusters_map == {"eu": ["ns"]}
@@ -0,0 +1,78 @@
+import hashlib
+import hmac
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+from app.src.routers.webhooks import webhook_router
+from app.src.services.webhooks import SyncTrigger, repo_full_name
+from app.src.utils import config as cfg
+
+SECRET = "s3cret"
+
+
+def make_generator(resource, schemas_url, values_url):
+    return SimpleNamespace(
+        resource=resource,
+        git=SimpleNamespace(base_url=values_url),
+        schema_manager=SimpleNamespace(git=SimpleNamespace(base_url=schemas_url)),
+        schemas_changed=SyncTrigger(),
+        values_changed=SyncTrigger(),
+    )
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(cfg, "GITHUB_WEBHOOK_SECRET", SECRET)
+    app = FastAPI()
+    app.include_router(webhook_router)
+    app.state.router_generators = [
+        make_generator("tyk", "https://api.github.com/repos/Org/tyk-schemas", "git@github.com:org/tyk-values.git"),
+        make_generator("redis", "https://api.github.com/repos/org/redis-schemas", "git@github.com:org/redis-values.git"),
+    ]
+    return app
+
+
+async def deliver(app, payload, event="push", secret=SECRET):
+    body = json.dumps(payload).encode()
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    transport = ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/v1/webhooks/github",
+            content=body,
+            headers={"X-Hub-Signature-256": signature, "X-GitHub-Event": event},
+        )
+
+
+def test_repo_full_name():
+    assert repo_full_name("https://api.github.com/repos/org/repo") == "org/repo"
+    assert repo_full_name("https://ghe.local/api/v3/repos/org/repo/") == "org/repo"
+    assert repo_full_name("git@github.com:Org/repo.git") == "org/repo"
+    assert repo_full_name("https://github.com/org/repo.git") == "org/repo"
+
+
+@pytest.mark.asyncio
+async def test_push_triggers_only_the_affected_resource(app):
+    response = await deliver(app, {"ref": "refs/heads/main", "repository": {"full_name": "org/tyk-schemas"}})
+
+    assert response.status_code == 202
+    assert response.json() == {"triggered": ["tyk:schemas"]}
+    tyk, redis = app.state.router_generators
+    assert await tyk.schemas_changed.wait(0)
+    assert not await redis.schemas_changed.wait(0)
+    assert not await tyk.values_changed.wait(0)
+
+
+@pytest.mark.asyncio
+async def test_bad_signature_and_other_branches_are_ignored(app):
+    payload = {"ref": "refs/heads/main", "repository": {"full_name": "org/tyk-values"}}
+    assert (await deliver(app, payload, secret="wrong")).status_code == 401
+
+    payload["ref"] = "refs/heads/feature"
+    assert (await deliver(app, payload)).json() == {"triggered": []}
+    assert (await deliver(app, {"zen": "hi"}, event="ping")).json() == {"triggered": []}
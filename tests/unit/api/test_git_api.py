@@ -0,0 +1,296 @@
+import json
+
+import httpx
+import pytest
+
+from app.src.api.git import GitAPI, GitError
+
+
+def _make_json_response(status_code: int, payload=None, headers=None) -> httpx.Response:
+    req = httpx.Request("GET", "http://git.local/repos/org/repo/contents/a.yaml")
+    content = json.dumps(payload).encode() if payload is not None else b""
+    return httpx.Response(status_code, request=req, content=content, headers=headers or {})
+
+
+class FakeBaseAPI:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    async def request(self, method, endpoint, headers=None, **kwargs):
+        self.sent_headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_get_file_revalidates_with_etag_and_serves_304_from_cache():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    body = {"sha": "abc", "content": "Zm9v"}
+    api.api = FakeBaseAPI([
+        _make_json_response(200, body, headers={"ETag": '"v1"'}),
+        _make_json_response(304),
+    ])
+
+    assert await api.get_file("a.yaml") == body
+    assert await api.get_file("a.yaml") == body
+
+    assert api.api.sent_headers == [{}, {"If-None-Match": '"v1"'}]
+
+
+@pytest.mark.asyncio
+async def test_changed_file_replaces_cached_entry():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.api = FakeBaseAPI([
+        _make_json_response(200, {"sha": "abc"}, headers={"ETag": '"v1"'}),
+        _make_json_response(200, {"sha": "def"}, headers={"ETag": '"v2"'}),
+        _make_json_response(304),
+    ])
+
+    await api.get_file("a.yaml")
+    assert (await api.get_file("a.yaml"))["sha"] == "def"
+    assert (await api.get_file("a.yaml"))["sha"] == "def"
+    assert api.api.sent_headers[-1] == {"If-None-Match": '"v2"'}
+
+
+def test_cache_evicts_least_recently_used():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.cache.max_entries = 2
+
+    for name in ("a", "b", "c"):
+        api.cache.store(name, _make_json_response(200, {"name": name}, headers={"ETag": name}))
+
+    assert len(api.cache) == 2
+    assert api.cache.lookup("a") is None
+    assert api.cache.lookup("c").etag == "c"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_headers_are_recorded_per_token():
+    api = GitAPI("http://git.local/repos/org/repo", "other-token")
+    api.api = FakeBaseAPI([
+        _make_json_response(200, {"sha": "abc"}, headers={
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4321",
+            "X-RateLimit-Reset": "1900000000",
+        }),
+    ])
+
+    await api.get_last_commit()
+
+    assert api.rate_limit.remaining == 4321
+    assert GitAPI("http://git.local/repos/org/other", "other-token").rate_limit is api.rate_limit
+
+
+@pytest.mark.asyncio
+async def test_modify_reuses_sha_from_previous_read():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.api = FakeBaseAPI([
+        _make_json_response(200, {"sha": "abc", "content": "Zm9v"}, headers={"ETag": '"v1"'}),
+        _make_json_response(200, {"content": {"sha": "def"}}),
+    ])
+
+    await api.get_file("/a.yaml")
+    await api.modify_file_content("a.yaml", "update", "bar")
+
+    assert api.api.responses == []
+    assert api.shas["a.yaml"] == "def"
+
+
+@pytest.mark.asyncio
+async def test_stale_sha_is_refreshed_once():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.shas["a.yaml"] = "old"
+    api.api = FakeBaseAPI([
+        _make_json_response(409, {"message": "a.yaml does not match old"}),
+        _make_json_response(200, {"sha": "abc"}),
+        _make_json_response(200, {"content": {"sha": "def"}}),
+    ])
+
+    await api.modify_file_content("a.yaml", "update", "bar")
+
+    assert api.api.responses == []
+    assert api.shas["a.yaml"] == "def"
+
+
+class FakeDataAPI:
+    """Routes Git Data API calls to a tiny in-memory repo."""
+
+    def __init__(self, files, conflicts=0, truncated=()):
+        self.files = files
+        self.head = "c0"
+        self.conflicts = conflicts
+        # Directories whose tree listing comes back truncated
+        self.truncated = set(truncated)
+        self.calls = []
+        self.trees = []
+
+    async def request(self, method, endpoint, json=None, **kwargs):
+        self.calls.append((method, endpoint.split("?")[0]))
+
+        if endpoint.startswith("/git/ref/heads/"):
+            return _make_json_response(200, {"object": {"sha": self.head}})
+        if endpoint.startswith("/contents/"):
+            path = endpoint[len("/contents/"):].split("?")[0]
+            if path not in self.files:
+                return _make_json_response(404, {"message": "Not Found"})
+            return _make_json_response(200, {"path": path, "type": "file", "sha": "s"})
+        if method == "GET" and endpoint.startswith(f"/git/trees/{self.head}:"):
+            parent = endpoint.split(":", 1)[1]
+            if parent in self.truncated:
+                return _make_json_response(200, {"tree": [], "truncated": True})
+            entries = [
+                {"path": p.rsplit("/", 1)[1], "type": "blob", "sha": "s"}
+                for p in self.files if p.rsplit("/", 1)[0] == parent
+            ]
+            if not entries:
+                return _make_json_response(404, {"message": "Not Found"})
+            return _make_json_response(200, {"tree": entries, "truncated": False})
+        if endpoint == "/git/blobs":
+            return _make_json_response(201, {"sha": f"blob-{len(self.calls)}"})
+        if endpoint.startswith("/git/commits/"):
+            return _make_json_response(200, {"tree": {"sha": "t0"}})
+        if endpoint == "/git/trees":
+            self.trees.append(json["tree"])
+            return _make_json_response(201, {"sha": "t1"})
+        if endpoint == "/git/commits":
+            return _make_json_response(201, {"sha": "c1"})
+        if endpoint.startswith("/git/refs/heads/"):
+            if self.conflicts:
+                self.conflicts -= 1
+                self.head = "c0b"
+                return _make_json_response(422, {"message": "Update is not a fast forward"})
+            self.head = json["sha"]
+            return _make_json_response(200, {"object": {"sha": json["sha"]}})
+        raise AssertionError(endpoint)
+
+
+@pytest.mark.asyncio
+async def test_commit_builder_pushes_all_changes_as_one_commit():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.api = FakeDataAPI({"eu/ns/a.yaml", "eu/ns/b.yaml"}, conflicts=1)
+
+    sha = await (
+        api.commit_builder()
+        .add("eu/ns/c.yaml", "c: 1")
+        .modify("eu/ns/a.yaml", "a: 2")
+        .delete("eu/ns/b.yaml")
+        .commit("bulk change")
+    )
+
+    assert sha == "c1"
+    assert api.api.head == "c1"
+    assert [method for method, endpoint in api.api.calls if endpoint == "/git/blobs"] == ["POST", "POST"]
+    # Rebuilt once after the ref moved
+    assert len(api.api.trees) == 2
+    assert {entry["path"]: entry["sha"] is None for entry in api.api.trees[-1]} == {
+        "eu/ns/c.yaml": False, "eu/ns/a.yaml": False, "eu/ns/b.yaml": True,
+    }
+    assert "eu/ns/b.yaml" not in api.shas
+
+
+@pytest.mark.asyncio
+async def test_commit_builder_rejects_add_of_existing_file():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.api = FakeDataAPI({"eu/ns/a.yaml"})
+
+    with pytest.raises(GitError) as exc:
+        await api.commit_builder().add("eu/ns/a.yaml", "a: 1").commit("add")
+
+    assert exc.value.status_code == 422
+    assert ("PATCH", "/git/refs/heads/main") not in api.api.calls
+
+
+@pytest.mark.asyncio
+async def test_commit_builder_resolves_paths_against_the_head_tree():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    # The contents API would list only the first 1000 of these
+    api.api = FakeDataAPI({f"eu/big/app-{i:04}.yaml" for i in range(1500)} | {"us/ns/a.yaml"}, truncated={"us/ns"})
+    builder = (
+        api.commit_builder()
+        .add("eu/big/app-1400.yaml", "a: 1")
+        .delete("eu/big/app-9999.yaml")
+        .modify("us/ns/a.yaml", "a: 2")
+        .add("us/ns/b.yaml", "b: 1")
+    )
+
+    assert await builder.commit("batch", partial=True) == "c1"
+
+    assert {path: error.status_code for path, error in builder.rejected.items()} == {
+        "eu/big/app-1400.yaml": 422, "eu/big/app-9999.yaml": 404,
+    }
+    assert sorted(entry["path"] for entry in api.api.trees[-1]) == ["us/ns/a.yaml", "us/ns/b.yaml"]
+    # Only the truncated directory is looked up path by path
+    assert sorted(e for m, e in api.api.calls if e.startswith("/contents/")) == [
+        "/contents/us/ns/a.yaml", "/contents/us/ns/b.yaml",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_partial_commit_drops_changes_that_cannot_apply():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.api = FakeDataAPI({"eu/ns/a.yaml"})
+    builder = api.commit_builder().add("eu/ns/a.yaml", "a: 1").add("eu/ns/c.yaml", "c: 1").delete("eu/ns/x.yaml")
+
+    assert await builder.commit("batch", partial=True) == "c1"
+
+    assert {path: error.status_code for path, error in builder.rejected.items()} == {
+        "eu/ns/a.yaml": 422, "eu/ns/x.yaml": 404,
+    }
+    assert [entry["path"] for entry in api.api.trees[-1]] == ["eu/ns/c.yaml"]
+
+
+@pytest.mark.asyncio
+async def test_partial_commit_with_nothing_left_is_not_pushed():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    api.api = FakeDataAPI({"eu/ns/a.yaml"})
+    builder = api.commit_builder().add("eu/ns/a.yaml", "a: 1")
+
+    assert await builder.commit("batch", partial=True) is None
+
+    assert list(builder.rejected) == ["eu/ns/a.yaml"]
+    assert ("PATCH", "/git/refs/heads/main") not in api.api.calls
+
+
+@pytest.mark.asyncio
+async def test_get_file_raw_takes_sha_from_etag():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    sha = "a" * 40
+    raw = httpx.Response(
+        200, request=httpx.Request("GET", "http://git.local"), content=b"key: value\n", headers={"ETag": f'"{sha}"'}
+    )
+    api.api = FakeBaseAPI([raw, _make_json_response(304)])
+
+    assert await api.get_file_raw("/eu/ns/a.yaml") == b"key: value\n"
+    assert await api.get_file_raw("/eu/ns/a.yaml") == b"key: value\n"
+
+    assert api.shas["eu/ns/a.yaml"] == sha
+    assert api.api.sent_headers[0] == {"Accept": "application/vnd.github.raw+json"}
+    assert api.api.sent_headers[1]["If-None-Match"] == f'"{sha}"'
+
+
+@pytest.mark.asyncio
+async def test_head_sha_is_revalidated_with_etag():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    req = httpx.Request("GET", "http://git.local/repos/org/repo/commits/main")
+    api.api = FakeBaseAPI([
+        httpx.Response(200, request=req, content=b"a" * 40, headers={"ETag": '"h1"'}),
+        httpx.Response(304, request=req),
+    ])
+
+    assert await api.get_head_sha() == "a" * 40
+    assert await api.get_head_sha() == "a" * 40
+    assert api.api.sent_headers[-1] == {"If-None-Match": '"h1"', "Accept": "application/vnd.github.sha"}
+
+
+@pytest.mark.asyncio
+async def test_compare_files_reports_capped_file_lists():
+    api = GitAPI("http://git.local/repos/org/repo", "token")
+    files = [{"filename": f"schemas/s{i}.json", "status": "modified"} for i in range(300)]
+    api.api = FakeBaseAPI([
+        _make_json_response(200, {"files": files[:2]}),
+        _make_json_response(200, {"files": files}),
+    ])
+
+    assert await api.compare_files("a", "b") == files[:2]
+    # GitHub lists at most 300 files for the whole comparison, more pages only hold commits
+    assert await api.compare_files("a", "c") is None
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from app.src.api.rate_limit import BACKGROUND, RateLimitScheduler, request_priority
+
+
+def _scheduler(remaining, limit=5000, reset_in=600.0):
+    scheduler = RateLimitScheduler("test", reserve_ratio=0.2)
+    scheduler.record({
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-reset": str(time.time() + reset_in),
+    })
+    return scheduler
+
+
+def test_background_is_not_paced_with_plenty_of_budget():
+    assert _scheduler(remaining=4000).background_delay() == 0
+
+
+def test_background_is_spread_over_the_window_when_budget_runs_low():
+    scheduler = _scheduler(remaining=2000)
+    assert scheduler.background_delay() == pytest.approx(0, abs=0.01)
+    # 1000 spare calls over 600s leaves 0.6s between background calls
+    assert scheduler.background_delay() == pytest.approx(0.6, abs=0.05)
+
+
+def test_peeking_at_the_delay_reserves_no_slot():
+    scheduler = _scheduler(remaining=2000)
+    assert scheduler.background_delay() == pytest.approx(0, abs=0.01)
+    assert scheduler.background_delay(reserve=False) == pytest.approx(0.6, abs=0.05)
+    assert scheduler.background_delay() == pytest.approx(0.6, abs=0.05)
+
+
+def test_background_waits_for_reset_once_only_the_reserve_is_left():
+    assert _scheduler(remaining=1000).background_delay() == pytest.approx(600, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_user_calls_are_never_paced():
+    scheduler = _scheduler(remaining=0)
+    started = time.monotonic()
+    await scheduler.acquire()
+    assert time.monotonic() - started < 0.1
+
+    token = request_priority.set(BACKGROUND)
+    try:
+        assert scheduler.background_delay() > 0
+    finally:
+        request_priority.reset(token)
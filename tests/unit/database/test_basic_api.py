@@ -0,0 +1,49 @@
+import pytest
+
+from app.general.database.basic_api import BaseAPI, http_pool
+from app.general.database.limiter import get_limiter
+
+
+@pytest.mark.asyncio
+async def test_instances_of_same_upstream_share_pooled_client():
+    git_a = BaseAPI("https://api.example.com/repos/org/a", upstream="git")
+    git_b = BaseAPI("https://api.example.com/repos/org/b", upstream="git")
+    vault = BaseAPI("https://vault.example.com", upstream="vault")
+
+    client = http_pool.get(git_a.upstream, git_a.verify)
+    assert http_pool.get(git_b.upstream, git_b.verify) is client
+    assert http_pool.get(vault.upstream, vault.verify) is not client
+
+    await http_pool.aclose()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_close_reopens_lazily():
+    api = BaseAPI("https://api.example.com", upstream="example")
+    client = http_pool.get(api.upstream, api.verify)
+
+    await api.close()
+
+    assert client.is_closed
+    assert http_pool.get(api.upstream, api.verify) is not client
+    await http_pool.aclose()
+
+
+def test_upstream_defaults_to_host():
+    assert BaseAPI("https://vault.example.com/").upstream == "vault.example.com"
+
+
+@pytest.mark.asyncio
+async def test_limiter_slot_released_when_client_cannot_be_opened(monkeypatch):
+    api = BaseAPI("https://pool-failure.example.com", upstream="pool-failure")
+
+    def broken_get(upstream, verify):
+        raise RuntimeError("no client")
+
+    monkeypatch.setattr(http_pool, "get", broken_get)
+
+    with pytest.raises(RuntimeError):
+        await api.get("/")
+
+    assert get_limiter(api.upstream).in_flight == 0
@@ -0,0 +1,78 @@
+import pytest
+
+from app.general.database.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.after_call(True)
+
+    assert breaker.current_state() == OPEN
+    with pytest.raises(CircuitOpenError) as ei:
+        breaker.before_call()
+    assert ei.value.response_status_code == 503
+    assert ei.value.retry_after > 0
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+
+    breaker.after_call(True)
+    breaker.after_call(False)
+    breaker.after_call(True)
+
+    assert breaker.current_state() == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    breaker.after_call(True)
+
+    assert breaker.current_state() == HALF_OPEN
+    probe = breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.after_call(False, probe)
+    assert breaker.current_state() == CLOSED
+
+    breaker.after_call(True)
+    assert breaker.current_state() == HALF_OPEN
+    probe = breaker.before_call()
+    breaker.after_call(True, probe)
+    assert breaker.state == OPEN
+
+
+def test_late_call_does_not_close_an_open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+    late = breaker.before_call()  # starts while closed
+    assert late is None
+
+    breaker.after_call(True)
+    assert breaker.state == OPEN
+    breaker.after_call(False, late)
+    assert breaker.state == OPEN
+
+
+def test_only_probes_leave_half_open():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    late = breaker.before_call()
+    breaker.after_call(True)
+    assert breaker.current_state() == HALF_OPEN
+
+    probe = breaker.before_call()
+    breaker.after_call(False, late)  # not a probe: neither closes nor frees the probe slot
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.after_call(False, probe)
+    assert breaker.state == CLOSED
@@ -0,0 +1,59 @@
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+
+from app.general.database.errors import DeadlineExceededError
+from app.general.utils import basicSettings
+from app.general.utils.deadline import Deadline, check_deadline, remaining_time, request_deadline, with_deadline
+from app.src.errors.external_service import ExternalServiceError
+from app.src.services import RetryPolicy, retry
+
+
+def test_no_deadline_outside_requests():
+    assert remaining_time() is None
+    check_deadline("git")
+
+
+def test_expired_deadline_fails_fast():
+    token = request_deadline.set(Deadline(0))
+    try:
+        with pytest.raises(DeadlineExceededError) as exc:
+            check_deadline("git")
+        assert exc.value.response_status_code == 504
+    finally:
+        request_deadline.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_retry_stops_when_backoff_exceeds_deadline(monkeypatch):
+    monkeypatch.setattr("app.src.services.asyncio.sleep", lambda *_: asyncio.sleep(0))
+    policy = RetryPolicy("test", attempts=5, base_delay=10.0, max_delay=10.0)
+    policy.backoff = lambda attempt: 5.0
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        raise ExternalServiceError("test", status_code=503)
+
+    token = request_deadline.set(Deadline(1.0))
+    try:
+        with pytest.raises(DeadlineExceededError):
+            await retry(failing, policy=policy)
+    finally:
+        request_deadline.reset(token)
+
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("header", ["nan", "inf", "-inf", "0", "-3", "soon"])
+async def test_invalid_deadline_header_falls_back_to_default(header):
+    request = SimpleNamespace(headers={basicSettings.REQUEST_DEADLINE_HEADER: header})
+    context = contextvars.copy_context()
+
+    await asyncio.create_task(with_deadline(7.0)(request), context=context)
+
+    assert context[request_deadline].timeout == min(7.0, basicSettings.REQUEST_DEADLINE_MAX)
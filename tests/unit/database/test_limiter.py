@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.general.database.errors import AdmissionRejectedError
+from app.general.database.limiter import AdaptiveLimiter
+
+
+def _limiter(**overrides) -> AdaptiveLimiter:
+    kwargs = dict(
+        upstream="test",
+        initial_limit=2,
+        min_limit=1,
+        max_limit=4,
+        max_queue=1,
+        queue_timeout=0.5,
+        latency_target=1.0,
+    )
+    kwargs.update(overrides)
+    return AdaptiveLimiter(**kwargs)
+
+
+@pytest.mark.asyncio
+async def test_additive_increase_and_multiplicative_decrease():
+    limiter = _limiter()
+
+    for _ in range(6):
+        await limiter.acquire()
+        limiter.release(latency=0.01, overloaded=False)
+    assert limiter.limit == 4  # capped by max_limit
+
+    await limiter.acquire()
+    limiter.release(latency=0.01, overloaded=True)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_waiters_get_slots_in_fifo_order_and_queue_is_bounded():
+    limiter = _limiter(initial_limit=1, max_limit=1)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+
+    with pytest.raises(AdmissionRejectedError):
+        await limiter.acquire()
+
+    limiter.release(latency=0.01, overloaded=False)
+    await waiter
+    assert limiter.in_flight == 1
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_rejects():
+    limiter = _limiter(initial_limit=1, max_limit=1, queue_timeout=0.01)
+    await limiter.acquire()
+
+    with pytest.raises(AdmissionRejectedError):
+        await limiter.acquire()
+    assert limiter.queued == 0
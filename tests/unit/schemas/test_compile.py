@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.src.schemas.cache import SchemaBundleCache
+from app.src.schemas.compile import main
+
+
+def write_schemas(root, schemas):
+    directory = root / "schemas"
+    directory.mkdir()
+    for name, schema in schemas.items():
+        (directory / name).write_text(json.dumps(schema))
+
+
+def test_compiles_resolved_bundle(tmp_path):
+    write_schemas(tmp_path, {
+        "base-schema.json": {"type": "object", "properties": {"name": {"type": "string"}}, "required": ["name"]},
+        "schema-0.1.0.json": {"type": "object", "allOf": [{"$ref": "base-schema.json"}]},
+    })
+    output = tmp_path / "out" / "tyk.json"
+
+    assert main([str(tmp_path), "--resource", "tyk", "--output", str(output), "--sha", "a" * 40]) == 0
+
+    bundle = SchemaBundleCache(str(output), repo=None).load()
+    assert bundle["sha"] == "a" * 40
+    assert bundle["resolved"]["0.1.0"]["schema"]["required"] == ["name"]
+
+
+def test_broken_ref_fails_without_writing(tmp_path):
+    write_schemas(tmp_path, {"schema-0.1.0.json": {"allOf": [{"$ref": "missing.json"}]}})
+    output = tmp_path / "tyk.json"
+
+    assert main([str(tmp_path), "--resource", "tyk", "--output", str(output), "--sha", "a" * 40]) == 1
+    assert not output.exists()
+
+
+def test_runs_without_the_server_configuration(tmp_path):
+    write_schemas(tmp_path, {"schema-0.1.0.json": {"type": "object", "properties": {"name": {"type": "string"}}}})
+    output = tmp_path / "tyk.json"
+    # No ARGOCD_URL, VAULT_TOKEN, TEAM_NAME, ...: the compiler must not build the server's Config
+    env = {key: value for key, value in os.environ.items() if key in ("PATH", "HOME", "SYSTEMROOT")}
+
+    result = subprocess.run(
+        [sys.executable, "-m", "app.src.schemas.compile", str(tmp_path),
+         "--resource", "tyk", "--output", str(output), "--sha", "a" * 40],
+        cwd=Path(__file__).resolve().parents[3], env=env, capture_output=True, text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert SchemaBundleCache(str(output), repo=None).load()["sha"] == "a" * 40
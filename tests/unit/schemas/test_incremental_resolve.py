@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+from app.src.schemas.loader import SchemaLoader
+from app.src.schemas.resolver import SchemaRefCycleError
+
+
+def base(prop):
+    return {"type": "object", "properties": {prop: {"type": "string"}}}
+
+
+FILES = {
+    "base-schema.json": base("name"),
+    "extra-schema.json": base("size"),
+    "schema-0.1.0.json": {"type": "object", "allOf": [{"$ref": "base-schema.json"}]},
+    "schema-0.2.0.json": {"type": "object", "allOf": [{"$ref": "extra-schema.json"}]},
+}
+
+
+class FakeGit:
+    def __init__(self):
+        self.files = dict(FILES)
+        self.changes = []
+        self.advanced = []
+
+    async def list_dir(self, path):
+        return [(name, f"schemas/{name}") for name in self.files]
+
+    async def get_file_content(self, path):
+        return json.dumps(self.files[path.split("/")[-1]])
+
+    async def get_changed_files(self, path=""):
+        return "head", None if self.changes is None else list(self.changes)
+
+    def advance(self, head):
+        self.changes = []
+        self.advanced.append(head)
+
+
+async def loaded():
+    git = FakeGit()
+    loader = SchemaLoader("service", git, None)
+    await loader._load_resource_schemas("service")
+    await loader.resolve_schemas()
+    return git, loader
+
+
+@pytest.mark.asyncio
+async def test_shared_schema_change_resolves_only_dependents():
+    git, loader = await loaded()
+    untouched = loader.resolved_schemas["0.2.0"]
+
+    git.files["base-schema.json"] = base("title")
+    git.changes = [{"filename": "schemas/base-schema.json", "status": "modified"}]
+    versions = await loader.sync_once()
+
+    assert versions == ["0.1.0"]
+    assert loader.resolved_schemas["0.1.0"]["schema"]["properties"] == {"title": {"type": "string"}}
+    assert loader.resolved_schemas["0.2.0"] is untouched
+
+    incremental = {name: (sorted(e["referred_in"]), sorted(e["referred_to"]), e["schema"])
+                   for name, e in loader.resolved_schemas.items()}
+    await loader.resolve_schemas()
+    full = {name: (sorted(e["referred_in"]), sorted(e["referred_to"]), e["schema"])
+            for name, e in loader.resolved_schemas.items()}
+    assert incremental == full
+
+
+@pytest.mark.asyncio
+async def test_changed_refs_move_graph_edges():
+    git, loader = await loaded()
+
+    git.files["schema-0.1.0.json"] = {"type": "object", "allOf": [{"$ref": "extra-schema.json"}]}
+    git.changes = [{"filename": "schemas/schema-0.1.0.json", "status": "modified"}]
+    assert await loader.sync_once() == ["0.1.0"]
+
+    assert loader.resolved_schemas["base-schema.json"]["referred_in"] == []
+    assert sorted(loader.resolved_schemas["extra-schema.json"]["referred_in"]) == ["0.1.0", "0.2.0"]
+
+
+@pytest.mark.asyncio
+async def test_removed_version_is_reported_and_dropped():
+    git, loader = await loaded()
+
+    git.changes = [{"filename": "schemas/schema-0.2.0.json", "status": "removed"}]
+    assert await loader.sync_once() == ["0.2.0"]
+
+    assert "0.2.0" not in loader.resolved_schemas
+    assert loader.resolved_schemas["extra-schema.json"]["referred_in"] == []
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_keeps_the_cursor_for_a_retry():
+    git, loader = await loaded()
+    git.files["base-schema.json"] = base("title")
+    git.changes = [{"filename": "schemas/base-schema.json", "status": "modified"}]
+    get_file_content = git.get_file_content
+
+    async def unavailable(path):
+        raise RuntimeError("Git unavailable")
+
+    git.get_file_content = unavailable
+    with pytest.raises(RuntimeError):
+        await loader.sync_once()
+    assert git.advanced == []
+
+    git.get_file_content = get_file_content
+    assert await loader.sync_once() == ["0.1.0"]
+    assert git.advanced == ["head"]
+    assert loader.resolved_schemas["0.1.0"]["schema"]["properties"] == {"title": {"type": "string"}}
+
+
+@pytest.mark.asyncio
+async def test_diff_too_large_to_list_reloads_everything():
+    git, loader = await loaded()
+    git.files["base-schema.json"] = base("title")
+    del git.files["schema-0.2.0.json"]
+    git.changes = None
+
+    assert sorted(await loader.sync_once()) == ["0.1.0", "0.2.0"]
+
+    assert git.advanced == ["head"]
+    assert "0.2.0" not in loader.resolved_schemas
+    assert loader.resolved_schemas["0.1.0"]["schema"]["properties"] == {"title": {"type": "string"}}
+
+
+@pytest.mark.asyncio
+async def test_broken_change_is_rolled_back():
+    git, loader = await loaded()
+    schemas, resolved = dict(loader.schemas), dict(loader.resolved_schemas)
+
+    git.files["a-schema.json"] = {"type": "object", "allOf": [{"$ref": "b-schema.json"}]}
+    git.files["b-schema.json"] = {"type": "object", "allOf": [{"$ref": "a-schema.json"}]}
+    git.files["base-schema.json"] = {"type": "object", "allOf": [{"$ref": "a-schema.json"}]}
+    git.changes = [
+        {"filename": "schemas/a-schema.json", "status": "added"},
+        {"filename": "schemas/b-schema.json", "status": "added"},
+        {"filename": "schemas/base-schema.json", "status": "modified"},
+    ]
+
+    with pytest.raises(SchemaRefCycleError):
+        await loader.sync_once()
+
+    assert git.advanced == []
+    assert loader.schemas == schemas
+    assert loader.resolved_schemas == resolved
+    assert all(entry["schema"] is not None for entry in loader.resolver.resolved_schemas.values())
+    assert set(loader.resolver.resolved_schemas) == set(resolved)
+
+    # The untouched graph still takes later changes
+    git.files["base-schema.json"] = base("title")
+    git.changes = [{"filename": "schemas/base-schema.json", "status": "modified"}]
+    assert await loader.sync_once() == ["0.1.0"]
@@ -0,0 +1,35 @@
+import pytest
+
+from app.src.schemas.resolver import SchemaResolver, intern_schema
+
+ADDRESS = {"type": "object", "properties": {"street": {"type": "string"}}}
+
+
+def test_equal_subtrees_are_one_immutable_node():
+    a = intern_schema({"properties": {"address": dict(ADDRESS)}, "required": ["address"]})
+    b = intern_schema({"required": ["address"], "properties": {"address": dict(ADDRESS)}})
+
+    assert a is b
+    assert a == {"properties": {"address": ADDRESS}, "required": ["address"]}
+    with pytest.raises(TypeError):
+        a["properties"]["address"]["type"] = "string"
+    with pytest.raises(TypeError):
+        a["required"].append("name")
+
+
+def test_versions_share_resolved_refs_and_all_of_copies_on_write():
+    store = {
+        "base-schema.json": {"type": "object", "properties": {"address": ADDRESS}},
+        "city-schema.json": {"properties": {"address": {"properties": {"city": {"type": "string"}}}}},
+        "0.1.0": {"allOf": [{"$ref": "base-schema.json"}, {"$ref": "city-schema.json"}]},
+        "0.2.0": {"allOf": [{"$ref": "base-schema.json"}]},
+    }
+    resolver = SchemaResolver()
+    for name, schema in store.items():
+        resolver.resolve_refs(name, intern_schema(schema), store)
+    resolved = {name: entry["schema"] for name, entry in resolver.resolved_schemas.items()}
+
+    assert set(resolved["0.1.0"]["properties"]["address"]["properties"]) == {"street", "city"}
+    # Merging 0.1.0 must not leak the city into the shared base
+    assert set(resolved["base-schema.json"]["properties"]["address"]["properties"]) == {"street"}
+    assert resolved["0.2.0"]["properties"] is resolved["base-schema.json"]["properties"]
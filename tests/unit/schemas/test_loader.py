@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+import pytest
+
+from app.src.schemas import loader as loader_module
+from app.src.schemas.loader import SchemaLoader
+
+NAMES = [f"schema-0.{i}.0.json" for i in range(8)] + ["base-schema.json"]
+
+
+class SlowGit:
+    """Later files download faster, so completion order is the reverse of the listing."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def list_dir(self, path):
+        return [(name, f"schemas/{name}") for name in NAMES]
+
+    async def get_file_content(self, path):
+        name = path.split("/")[-1]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.002 * (len(NAMES) - NAMES.index(name)))
+            return json.dumps({"title": name})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_schema_fetch_is_bounded_and_stored_in_listing_order(monkeypatch):
+    monkeypatch.setattr(loader_module.schema_settings, "SCHEMA_LOAD_CONCURRENCY", 3)
+    git = SlowGit()
+    loader = SchemaLoader("service", git, None)
+
+    await loader._load_resource_schemas("service")
+
+    assert git.max_in_flight == 3
+    assert list(loader.schemas) == [f"0.{i}.0" for i in range(8)] + ["base-schema.json"]
+    assert loader.schemas["0.3.0"] == {"title": "schema-0.3.0.json"}
@@ -0,0 +1,45 @@
+import gc
+
+from app.src.schemas import _models, schema_to_model
+
+ADDRESS = {"type": "object", "properties": {"street": {"type": "string"}}, "required": ["street"]}
+
+
+def version(extra_prop):
+    return {"type": "object", "properties": {"address": ADDRESS, extra_prop: {"type": "integer"}}}
+
+
+def test_identical_nested_schemas_share_one_class():
+    v1 = schema_to_model("svc_0.1.0_Model", version("replicas"))
+    v2 = schema_to_model("svc_0.2.0_Model", version("size"))
+    other = schema_to_model("other_0.1.0_Model", version("replicas"))
+
+    assert v1 is not v2 and v1 is not other
+    assert v1.model_fields["address"].annotation is v2.model_fields["address"].annotation
+    assert other.model_fields["address"].annotation is v1.model_fields["address"].annotation
+    assert schema_to_model("svc_0.1.0_Model", version("replicas")) is v1
+    assert v2(address={"street": "main"}, size=1).address.street == "main"
+
+
+def test_unused_models_are_evicted():
+    schema_to_model("gone_Model", {"type": "object", "properties": {"nested": {"type": "object", "properties": {"x": {"type": "boolean"}}}}})
+    before = len(_models)
+
+    gc.collect()
+
+    assert len(_models) <= before - 2
+
+
+def test_nested_models_are_named_after_their_content():
+    svc = schema_to_model("svc_0.1.0_Model", version("replicas"))
+    other = schema_to_model("other_0.3.0_Model", version("size"))
+    changed = schema_to_model("svc_0.2.0_Model", {
+        "type": "object",
+        "properties": {"address": {**ADDRESS, "required": []}},
+    })
+
+    address = svc.model_fields["address"].annotation
+    assert address.__name__.startswith("Address_")
+    assert "svc" not in address.__name__
+    assert other.model_fields["address"].annotation.__name__ == address.__name__
+    assert changed.model_fields["address"].annotation.__name__ != address.__name__
@@ -0,0 +1,56 @@
+import pytest
+
+from app.src.schemas.resolver import SchemaRefCycleError, SchemaRefError, SchemaResolver
+
+
+def test_fragment_and_local_refs_resolve_against_their_document():
+    store = {
+        "common.json": {
+            "definitions": {"name": {"type": "string"}, "label": {"$ref": "#/definitions/name"}},
+        },
+        "0.1.0": {
+            "definitions": {"size": {"type": "integer"}},
+            "properties": {
+                "label": {"$ref": "common.json#/definitions/label"},
+                "size": {"$ref": "#/definitions/size"},
+            },
+        },
+    }
+    resolver = SchemaResolver()
+
+    resolved = resolver.resolve_refs("0.1.0", store["0.1.0"], store)
+
+    assert resolved["properties"] == {"label": {"type": "string"}, "size": {"type": "integer"}}
+    assert resolver.resolved_schemas["0.1.0"]["referred_to"] == {"common.json"}
+    assert resolver.resolved_schemas["common.json"]["referred_in"] == {"0.1.0"}
+
+
+def test_all_of_keeps_siblings_and_dedupes_required():
+    store = {
+        "base.json": {"required": ["name"], "properties": {"name": {"type": "string"}}},
+        "0.1.0": {
+            "description": "app",
+            "allOf": [{"$ref": "base.json"}, {"required": ["name", "size"], "properties": {"size": {"type": "integer"}}}],
+        },
+    }
+
+    resolved = SchemaResolver().resolve_refs("0.1.0", store["0.1.0"], store)
+
+    assert resolved == {
+        "description": "app",
+        "required": ["name", "size"],
+        "properties": {"name": {"type": "string"}, "size": {"type": "integer"}},
+    }
+
+
+def test_cycles_and_missing_refs_raise():
+    store = {
+        "a.json": {"properties": {"b": {"$ref": "b.json"}}},
+        "b.json": {"properties": {"a": {"$ref": "a.json"}}},
+        "0.1.0": {"$ref": "missing.json"},
+    }
+
+    with pytest.raises(SchemaRefCycleError, match="a.json -> b.json -> a.json"):
+        SchemaResolver().resolve_refs("a.json", store["a.json"], store)
+    with pytest.raises(SchemaRefError, match="missing.json"):
+        SchemaResolver().resolve_refs("0.1.0", store["0.1.0"], store)
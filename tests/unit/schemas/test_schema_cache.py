@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from app.src.schemas.cache import SchemaBundleCache
+from app.src.schemas.loader import SchemaLoader
+from app.src.schemas.settings import schema_settings
+
+BASE = {"type": "object", "properties": {"name": {"type": "string"}}}
+V1 = {"type": "object", "allOf": [{"$ref": "base-schema.json"}]}
+
+
+class FakeGit:
+    base_url = "https://api.github.com/repos/org/schemas"
+
+    def __init__(self, files, head):
+        self.files = files
+        self.last_commit = head
+        self.fetched = []
+        self.diffs = []
+        self.diff = [
+            {"filename": "schemas/schema-0.2.0.json", "status": "added"},
+            {"filename": "schemas/schema-0.1.0.json", "status": "removed"},
+            {"filename": "README.md", "status": "modified"},
+        ]
+
+    async def list_dir(self, path):
+        return [(name, f"schemas/{name}") for name in self.files]
+
+    async def get_file_content(self, path):
+        self.fetched.append(path)
+        return json.dumps(self.files[path.split("/")[-1]])
+
+    async def diff_files(self, base, head):
+        self.diffs.append((base, head))
+        return self.diff
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema_settings, "SCHEMA_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_same_commit_is_served_from_cache(cache_dir):
+    git = FakeGit({"base-schema.json": BASE, "schema-0.1.0.json": V1}, "a" * 40)
+    await SchemaLoader("service", git, None).load_all_schemas()
+    assert len(git.fetched) == 2
+
+    git.fetched.clear()
+    loader = SchemaLoader("service", git, None)
+    await loader.load_all_schemas()
+
+    assert git.fetched == []
+    assert loader.schemas == {"base-schema.json": BASE, "0.1.0": V1}
+    assert loader.resolver.resolved_schemas["0.1.0"]["referred_to"] == {"base-schema.json"}
+
+
+@pytest.mark.asyncio
+async def test_new_commit_fetches_only_changed_schemas(cache_dir):
+    git = FakeGit({"base-schema.json": BASE, "schema-0.1.0.json": V1}, "a" * 40)
+    await SchemaLoader("service", git, None).load_all_schemas()
+
+    git.files["schema-0.2.0.json"] = V1
+    git.last_commit = "b" * 40
+    git.fetched.clear()
+    loader = SchemaLoader("service", git, None)
+    await loader.load_all_schemas()
+
+    assert git.diffs == [("a" * 40, "b" * 40)]
+    assert git.fetched == ["schemas/schema-0.2.0.json"]
+    assert set(loader.schemas) == {"base-schema.json", "0.2.0"}
+    assert "0.2.0" in loader.resolved_schemas
+
+
+@pytest.mark.asyncio
+async def test_diff_too_large_to_list_reloads_everything(cache_dir):
+    git = FakeGit({"base-schema.json": BASE, "schema-0.1.0.json": V1}, "a" * 40)
+    await SchemaLoader("service", git, None).load_all_schemas()
+
+    del git.files["schema-0.1.0.json"]
+    git.files["schema-0.2.0.json"] = V1
+    git.last_commit = "b" * 40
+    git.diff = None
+    git.fetched.clear()
+    loader = SchemaLoader("service", git, None)
+    await loader.load_all_schemas()
+
+    assert git.diffs == [("a" * 40, "b" * 40)]
+    assert sorted(git.fetched) == ["schemas/base-schema.json", "schemas/schema-0.2.0.json"]
+    assert set(loader.schemas) == {"base-schema.json", "0.2.0"}
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_loads_everything(cache_dir, monkeypatch):
+    monkeypatch.setattr(schema_settings, "SCHEMA_CACHE_DIR", "")
+    git = FakeGit({"base-schema.json": BASE}, "a" * 40)
+    await SchemaLoader("service", git, None).load_all_schemas()
+    await SchemaLoader("service", git, None).load_all_schemas()
+
+    assert len(git.fetched) == 2
+    assert list(cache_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_compiled_bundle_at_head_skips_loading(cache_dir, monkeypatch):
+    compiled = cache_dir / "compiled" / "service.json"
+    SchemaBundleCache(str(compiled), repo=None).save("a" * 40, {"base-schema.json": BASE}, {})
+    monkeypatch.setattr(schema_settings, "SCHEMA_BUNDLES", {"service": str(compiled)})
+    git = FakeGit({"base-schema.json": BASE}, "a" * 40)
+
+    loader = SchemaLoader("service", git, None)
+    await loader.load_all_schemas()
+
+    assert git.fetched == []
+    assert loader.schemas == {"base-schema.json": BASE}
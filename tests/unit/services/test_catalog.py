@@ -0,0 +1,119 @@
+import pytest
+
+from app.src.services.catalog import CatalogIndex, blob_sha, split_values_path
+
+
+class FakeGit:
+    def __init__(self, tree, changes=(), truncated=False):
+        self.tree = tree
+        self.changes = list(changes)
+        self.truncated = truncated
+
+    async def get_tree(self):
+        return {"tree": self.tree, "truncated": self.truncated}
+
+    async def get_changed_files(self, path=""):
+        return "head", self.changes
+
+    def advance(self, head):
+        self.changes = []
+
+
+TREE = [
+    {"path": "README.md", "type": "blob", "sha": "a" * 40, "size": 10},
+    {"path": "eu", "type": "tree", "sha": "b" * 40},
+    {"path": "eu/payments/api.yaml", "type": "blob", "sha": "c" * 40, "size": 120},
+    {"path": "eu/payments/worker.yaml", "type": "blob", "sha": "d" * 40, "size": 80},
+    {"path": "us/search/api.yaml", "type": "blob", "sha": "e" * 40, "size": 64},
+]
+
+
+def test_blob_sha_matches_git():
+    # git hash-object of "hello\n"
+    assert blob_sha("hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_split_values_path():
+    assert split_values_path("/eu/payments/api.yaml") == ("eu", "payments", "api")
+    assert split_values_path("README.md") is None
+
+
+@pytest.mark.asyncio
+async def test_build_indexes_only_values_files():
+    catalog = CatalogIndex("service", FakeGit(TREE))
+    await catalog.build()
+
+    assert len(catalog) == 3
+    assert catalog.clusters() == ["eu", "us"]
+    assert [a.name for a in catalog.apps(cluster="eu")] == ["api", "worker"]
+    entry = catalog.get("eu", "payments", "api")
+    assert (entry.sha, entry.size) == ("c" * 40, 120)
+
+
+@pytest.mark.asyncio
+async def test_incremental_updates_from_writes_and_diffs():
+    catalog = CatalogIndex("service", FakeGit(TREE, changes=[
+        {"filename": "us/search/api.yaml", "status": "removed", "sha": "e" * 40},
+        {"filename": "us/ads/api.yaml", "status": "added", "sha": "f" * 40},
+    ]))
+    await catalog.build()
+
+    catalog.record_write("/eu/billing/api.yaml", "a: 1\n")
+    catalog.record_delete("/eu/payments/worker.yaml")
+    await catalog.refresh()
+
+    assert catalog.get("eu", "billing", "api").sha == blob_sha("a: 1\n")
+    assert catalog.get("eu", "billing", "api").size == 5
+    assert not catalog.exists("eu", "payments", "worker")
+    assert catalog.namespaces("us") == ["ads"]
+    # Compare diffs carry no sizes
+    assert catalog.get("us", "ads", "api").size is None
+
+
+@pytest.mark.asyncio
+async def test_truncated_tree_is_not_authoritative_until_rebuilt():
+    git = FakeGit(TREE[:3], truncated=True)
+    catalog = CatalogIndex("service", git)
+    await catalog.build()
+
+    assert not catalog.ready
+    assert catalog.exists("eu", "payments", "api")
+
+    git.tree, git.truncated = TREE, False
+    assert await catalog.refresh()
+
+    assert catalog.ready
+    assert catalog.exists("us", "search", "api")
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_inserts_and_removals_without_rebuilding():
+    catalog = CatalogIndex("service", FakeGit(TREE))
+    await catalog.build()
+    assert [a.name for a in catalog.page(limit=10)[0]] == ["api", "worker", "api"]
+
+    catalog.record_write("/eu/payments/billing.yaml", "a: 1\n")
+    catalog.record_write("/ap/search/api.yaml", "a: 1\n")
+    catalog.record_delete("/us/search/api.yaml")
+
+    items, more = catalog.page(limit=3)
+    assert [(a.cluster, a.name) for a in items] == [("ap", "api"), ("eu", "api"), ("eu", "billing")]
+    assert more
+    items, more = catalog.page(after=("eu", "payments", "billing"), limit=3)
+    assert [(a.cluster, a.name) for a in items] == [("eu", "worker")]
+    assert not more
+    assert catalog.clusters() == ["ap", "eu"]
+
+
+@pytest.mark.asyncio
+async def test_diff_too_large_to_list_rebuilds_the_index():
+    git = FakeGit(TREE)
+    catalog = CatalogIndex("service", git)
+    await catalog.build()
+
+    git.tree = TREE + [{"path": "us/ads/api.yaml", "type": "blob", "sha": "f" * 40, "size": 1}]
+    git.changes = None
+
+    assert await catalog.refresh()
+    assert catalog.exists("us", "ads", "api")
+    assert git.changes == []
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.general.database.errors import DeadlineExceededError
+from app.general.utils.deadline import Deadline, request_deadline
+from app.src.api.git import ADD, MODIFY, GitError
+from app.src.services import RetryPolicy
+from app.src.services.commit_queue import CommitQueue
+
+
+class FakeBuilder:
+    def __init__(self, api):
+        self.api = api
+        self.changes = {}
+        self.rejected = {}
+
+    def add(self, path, content):
+        self.changes[path] = (ADD, content)
+
+    def modify(self, path, content):
+        self.changes[path] = (MODIFY, content)
+
+    def delete(self, path):
+        self.changes[path] = ("delete", None)
+
+    async def commit(self, message, partial=False):
+        for path, (op, _) in list(self.changes.items()):
+            if op == ADD and path in self.api.files:
+                del self.changes[path]
+                self.rejected[path] = GitError(status_code=422, detail="exists")
+        self.api.commits.append((message, dict(self.changes)))
+        return f"c{len(self.api.commits)}"
+
+
+class FakeGitAPI:
+    base_url = "http://git.local/repos/org/values"
+
+    def __init__(self, files=()):
+        self.files = set(files)
+        self.commits = []
+
+    def commit_builder(self):
+        return FakeBuilder(self)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_coalesced_into_one_commit():
+    api = FakeGitAPI(files={"eu/ns/a.yaml"})
+    queue = CommitQueue(api, RetryPolicy("test"), window=0.01, max_batch=10)
+
+    results = await asyncio.gather(
+        queue.submit(ADD, "eu/ns/b.yaml", "b: 1", "create b"),
+        queue.submit(MODIFY, "eu/ns/a.yaml", "a: 2", "update a"),
+        queue.submit(ADD, "eu/ns/a.yaml", "a: 1", "create a"),
+        return_exceptions=True,
+    )
+
+    # The second write to a.yaml goes to the next commit and fails on its own
+    assert results[0] == results[1] == "c1"
+    assert isinstance(results[2], GitError) and results[2].status_code == 422
+    assert set(api.commits[0][1]) == {"eu/ns/b.yaml", "eu/ns/a.yaml"}
+    assert "- create b" in api.commits[0][0]
+
+
+@pytest.mark.asyncio
+async def test_single_write_keeps_its_commit_message():
+    api = FakeGitAPI()
+    queue = CommitQueue(api, RetryPolicy("test"), window=0, max_batch=10)
+
+    assert await queue.submit(ADD, "/eu/ns/a.yaml", "a: 1", "create a") == "c1"
+    assert api.commits == [("create a", {"eu/ns/a.yaml": (ADD, "a: 1")})]
+
+
+@pytest.mark.asyncio
+async def test_wait_is_bounded_by_the_request_deadline():
+    api = FakeGitAPI()
+    queue = CommitQueue(api, RetryPolicy("test"), window=0.5, max_batch=10)
+
+    token = request_deadline.set(Deadline(0.05))
+    try:
+        with pytest.raises(DeadlineExceededError):
+            await queue.submit(ADD, "eu/ns/a.yaml", "a: 1", "create a")
+    finally:
+        request_deadline.reset(token)
+
+    # The abandoned change is not committed once the window closes
+    await queue._flusher
+    assert api.commits == []
@@ -0,0 +1,73 @@
+import pytest
+
+from app.src.services.catalog import CatalogIndex
+from app.src.services.config_cache import ConfigCache
+
+
+def test_hit_after_put_and_lru_eviction():
+    cache = ConfigCache("service", max_entries=2, ttl=60)
+    cache.put("/eu/ns/a.yaml", "a: 1")
+    cache.put("/eu/ns/b.yaml", "b: 1")
+    assert cache.get("eu/ns/a.yaml") == "a: 1"
+
+    cache.put("/eu/ns/c.yaml", "c: 1")
+
+    assert cache.get("/eu/ns/b.yaml") is None
+    assert len(cache) == 2
+
+
+def test_expired_and_stale_entries_are_dropped():
+    cache = ConfigCache("service", max_entries=10, ttl=0)
+    cache.put("/eu/ns/a.yaml", "a: 1")
+    assert cache.get("/eu/ns/a.yaml") is None
+
+    cache = ConfigCache("service", max_entries=10, ttl=60)
+    cache.put("/eu/ns/a.yaml", "a: 1", sha="1" * 40)
+    assert cache.get("/eu/ns/a.yaml", sha="2" * 40) is None
+    assert len(cache) == 0
+
+
+MODIFIED = [{"filename": "eu/ns/a.yaml", "status": "modified", "sha": "3" * 40}]
+
+
+class FakeGit:
+    def __init__(self, files=MODIFIED):
+        self.files = files
+
+    async def get_tree(self):
+        return {"tree": [], "truncated": False}
+
+    async def get_changed_files(self, path=""):
+        return "head", self.files
+
+    def advance(self, head):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_observed_commits_invalidate_entries():
+    cache = ConfigCache("service", max_entries=10, ttl=60)
+    catalog = CatalogIndex("service", FakeGit())
+    catalog.listeners.append(cache.invalidate)
+    await catalog.build()
+    cache.put("/eu/ns/a.yaml", "a: 1")
+
+    await catalog.refresh()
+
+    assert cache.get("/eu/ns/a.yaml") is None
+
+
+@pytest.mark.asyncio
+async def test_rebuilding_the_catalog_clears_the_cache():
+    cache = ConfigCache("service", max_entries=10, ttl=60)
+    # A diff too large to list, so refresh rebuilds the whole index
+    catalog = CatalogIndex("service", FakeGit(files=None))
+    catalog.listeners.append(cache.invalidate)
+    catalog.rebuild_listeners.append(cache.clear)
+    await catalog.build()
+    cache.put("/eu/ns/a.yaml", "a: 1")
+
+    await catalog.refresh()
+
+    assert cache.get("/eu/ns/a.yaml") is None
+    assert len(cache) == 0
@@ -0,0 +1,106 @@
+import pytest
+
+from app.src.services.git import Git
+
+
+class FakeTreeAPI:
+    """Serves GitHub tree listings, truncating the recursive ones named in `truncated`."""
+
+    base_url = "http://git.local/repos/org/values"
+
+    def __init__(self, trees, truncated=()):
+        self.trees = trees
+        self.truncated = set(truncated)
+
+    async def get_tree(self, ref="main", recursive=True):
+        sha = "root" if ref == "main" else ref
+        if not recursive:
+            return {"sha": sha, "tree": self.trees[sha], "truncated": False}
+        if sha in self.truncated:
+            return {"sha": sha, "tree": self.trees[sha][:1], "truncated": True}
+
+        entries = []
+        for entry in self.trees[sha]:
+            entries.append(entry)
+            if entry["type"] == "tree":
+                listing = await self.get_tree(entry["sha"])
+                entries += [{**child, "path": f"{entry['path']}/{child['path']}"} for child in listing["tree"]]
+        return {"sha": sha, "tree": entries, "truncated": False}
+
+
+TREES = {
+    "root": [
+        {"path": "README.md", "type": "blob", "sha": "r"},
+        {"path": "eu", "type": "tree", "sha": "eu"},
+        {"path": "us", "type": "tree", "sha": "us"},
+    ],
+    "eu": [
+        {"path": "payments", "type": "tree", "sha": "eu-payments"},
+        {"path": "search", "type": "tree", "sha": "eu-search"},
+    ],
+    "eu-payments": [{"path": "api.yaml", "type": "blob", "sha": "1"}],
+    "eu-search": [{"path": "api.yaml", "type": "blob", "sha": "2"}],
+    "us": [{"path": "ads", "type": "tree", "sha": "us-ads"}],
+    "us-ads": [{"path": "api.yaml", "type": "blob", "sha": "3"}],
+}
+
+
+def _git(api) -> Git:
+    git = Git(api.base_url, "token")
+    git.api = api
+    return git
+
+
+def _blobs(tree):
+    return sorted(entry["path"] for entry in tree["tree"] if entry["type"] == "blob")
+
+
+@pytest.mark.asyncio
+async def test_truncated_tree_is_completed_from_subtrees():
+    tree = await _git(FakeTreeAPI(TREES, truncated={"root", "eu"})).get_tree()
+
+    assert not tree["truncated"]
+    assert _blobs(tree) == ["README.md", "eu/payments/api.yaml", "eu/search/api.yaml", "us/ads/api.yaml"]
+
+
+class FakeCompareAPI:
+    base_url = "http://git.local/repos/org/values"
+
+    def __init__(self, head, files):
+        self.head = head
+        self.files = files
+        self.compared = []
+
+    async def get_head_sha(self):
+        return self.head
+
+    async def compare_files(self, base, head):
+        self.compared.append((base, head))
+        return self.files
+
+
+@pytest.mark.asyncio
+async def test_cursor_moves_only_when_advanced():
+    git = _git(FakeCompareAPI("b" * 40, [
+        {"filename": "schemas/a.json", "status": "modified"},
+        {"filename": "README.md", "status": "modified"},
+    ]))
+    git.last_commit = "a" * 40
+
+    head, files = await git.get_changed_files("/schemas")
+    assert (head, [f["filename"] for f in files]) == ("b" * 40, ["schemas/a.json"])
+    # Not applied yet: the same diff is returned again
+    assert (await git.get_changed_files("/schemas"))[1] == files
+
+    git.advance(head)
+    assert await git.get_changed_files("/schemas") == ("b" * 40, [])
+    assert git.api.compared == [("a" * 40, "b" * 40)] * 2
+
+
+@pytest.mark.asyncio
+async def test_diff_too_large_to_list_is_reported():
+    git = _git(FakeCompareAPI("b" * 40, None))
+    git.last_commit = "a" * 40
+
+    assert await git.get_changed_files("/schemas") == ("b" * 40, None)
+    assert git.last_commit == "a" * 40
@@ -0,0 +1,151 @@
+import git
+import pytest
+
+from app.src.api.git import GitError
+from app.src.services import local_git
+from app.src.services.local_git import LocalGit, auth_env, clone_url
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """Bare repo with one commit on main, plus a second clone to push concurrent changes from."""
+    bare = git.Repo.init(tmp_path / "remote.git", bare=True, initial_branch="main")
+    seed = git.Repo.clone_from(str(tmp_path / "remote.git"), tmp_path / "seed")
+    (tmp_path / "seed" / "schemas").mkdir()
+    (tmp_path / "seed" / "schemas" / "schema-0.1.0.json").write_text("{}")
+    seed.index.add(["schemas/schema-0.1.0.json"])
+    seed.index.commit("seed")
+    seed.remote("origin").push("HEAD:refs/heads/main")
+    return bare, seed
+
+
+@pytest.fixture
+def local(tmp_path, remote, monkeypatch):
+    monkeypatch.setattr(local_git.config, "GIT_CLONE_DIR", str(tmp_path / "clones"))
+    return LocalGit(str(tmp_path / "remote.git"), None)
+
+
+def test_clone_url_from_api_url():
+    assert clone_url("https://api.github.com/repos/org/values") == "https://github.com/org/values.git"
+    assert clone_url("git@github.com:org/values.git") == "git@github.com:org/values.git"
+
+
+@pytest.mark.asyncio
+async def test_token_is_not_stored_in_the_clone(tmp_path, remote, monkeypatch):
+    monkeypatch.setattr(local_git.config, "GIT_CLONE_DIR", str(tmp_path / "clones"))
+    local = LocalGit(str(tmp_path / "remote.git"), "secret-token")
+    await local.async_init()
+
+    assert local.repo.git.environment()["GIT_CONFIG_KEY_0"] == "http.extraHeader"
+    with open(local.path_of(".git/config"), encoding="utf-8") as f:
+        stored = f.read()
+    assert "secret-token" not in stored
+    assert auth_env("secret-token")["GIT_CONFIG_VALUE_0"].split()[-1] not in stored
+
+
+@pytest.mark.asyncio
+async def test_reads_come_from_the_clone(local):
+    await local.async_init()
+
+    assert await local.list_dir("/schemas") == [("schema-0.1.0.json", "schemas/schema-0.1.0.json")]
+    assert await local.get_file_content("schemas/schema-0.1.0.json") == "{}"
+    with pytest.raises(GitError):
+        await local.get_file_content("missing.yaml")
+
+
+@pytest.mark.asyncio
+async def test_changed_files_since_last_sync(tmp_path, remote, local):
+    _, seed = remote
+    await local.async_init()
+
+    (tmp_path / "seed" / "schemas" / "schema-0.2.0.json").write_text("{}")
+    seed.index.add(["schemas/schema-0.2.0.json"])
+    seed.index.remove(["schemas/schema-0.1.0.json"], working_tree=True)
+    seed.index.commit("next")
+    seed.remote("origin").push("HEAD:refs/heads/main")
+
+    head, changed = await local.get_changed_files("/schemas")
+
+    assert sorted((c["filename"], c["status"]) for c in changed) == [
+        ("schemas/schema-0.1.0.json", "removed"),
+        ("schemas/schema-0.2.0.json", "added"),
+    ]
+    assert all(len(c["sha"]) == 40 for c in changed)
+    # Nothing moves until the caller applied the changes
+    assert (await local.get_changed_files("/schemas"))[1] == changed
+    local.advance(head)
+    assert await local.get_changed_files("/schemas") == (head, [])
+
+
+@pytest.mark.asyncio
+async def test_stale_clone_is_refreshed_before_reads(tmp_path, remote, local, monkeypatch):
+    _, seed = remote
+    await local.async_init()
+
+    (tmp_path / "seed" / "schemas" / "schema-0.2.0.json").write_text('{"v": 2}')
+    seed.index.add(["schemas/schema-0.2.0.json"])
+    seed.index.commit("next")
+    seed.remote("origin").push("HEAD:refs/heads/main")
+
+    monkeypatch.setattr(local_git.config, "GIT_LOCAL_MAX_STALENESS", 3600)
+    with pytest.raises(GitError):
+        await local.get_file_content("schemas/schema-0.2.0.json")
+
+    monkeypatch.setattr(local_git.config, "GIT_LOCAL_MAX_STALENESS", 0)
+    assert await local.get_file_content("schemas/schema-0.2.0.json") == '{"v": 2}'
+
+
+@pytest.mark.asyncio
+async def test_writes_are_pushed_and_rebased_on_rejection(tmp_path, remote, local):
+    bare, seed = remote
+    await local.async_init()
+
+    sync_to_remote = local.sync_to_remote
+    syncs = 0
+
+    def sync_then_race():
+        # Someone else pushes between our first sync and our push, so the push is rejected
+        nonlocal syncs
+        head = sync_to_remote()
+        syncs += 1
+        if syncs == 1:
+            (tmp_path / "seed" / "other.yaml").write_text("other: 1")
+            seed.index.add(["other.yaml"])
+            seed.index.commit("other")
+            seed.remote("origin").push("HEAD:refs/heads/main")
+        return head
+
+    local.sync_to_remote = sync_then_race
+
+    await local.add_file("eu/ns/app.yaml", "create app", "a: 1")
+    assert syncs == 2
+
+    head = bare.commit("main")
+    assert head.message == "create app"
+    assert head.parents[0].message == "other"
+    assert (head.tree / "eu/ns/app.yaml").data_stream.read() == b"a: 1"
+    assert (head.tree / "other.yaml").data_stream.read() == b"other: 1"
+    assert local.last_pushed == head.hexsha
+
+    with pytest.raises(GitError) as exc:
+        await local.add_file("eu/ns/app.yaml", "create app again", "a: 2")
+    assert exc.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_failed_push_leaves_no_local_commit_to_read(tmp_path, remote, local, monkeypatch):
+    bare, _ = remote
+    await local.async_init()
+    # The remote refuses every push
+    hook = tmp_path / "remote.git" / "hooks" / "pre-receive"
+    hook.write_text("#!/bin/sh\nexit 1\n")
+    hook.chmod(0o755)
+    monkeypatch.setattr(local_git.config, "GIT_LOCAL_MAX_STALENESS", 3600)
+
+    with pytest.raises(GitError) as exc:
+        await local.modify_file("schemas/schema-0.1.0.json", "edit schema", '{"local": true}')
+    assert exc.value.status_code == 409
+
+    assert local.repo.head.commit.hexsha == bare.commit("main").hexsha
+    assert not local.repo.is_dirty(untracked_files=True)
+    assert await local.get_file_content("schemas/schema-0.1.0.json") == "{}"
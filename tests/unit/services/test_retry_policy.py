@@ -0,0 +1,131 @@
+import time
+
+import httpx
+import pytest
+
+from app.general.database.errors import AdmissionRejectedError
+from app.src.api.git import GitError
+from app.src.services import RetryBudget, RetryPolicy, retry, retry_budget
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr("app.src.services.asyncio.sleep", fake_sleep)
+    return slept
+
+
+def _failing(errors, result="ok"):
+    calls = {"count": 0}
+
+    async def call():
+        calls["count"] += 1
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return call, calls
+
+
+def _transport_error(cls=httpx.ReadTimeout):
+    try:
+        raise cls("boom")
+    except httpx.TransportError as e:
+        try:
+            raise RuntimeError("Request failed: boom") from e
+        except RuntimeError as wrapped:
+            return wrapped
+
+
+@pytest.mark.asyncio
+async def test_terminal_status_is_not_retried():
+    call, calls = _failing([GitError(status_code=404, detail="missing")])
+
+    with pytest.raises(GitError):
+        await retry(call, policy=RetryPolicy("git"))
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_error_retried_only_when_idempotent():
+    policy = RetryPolicy("git")
+
+    call, calls = _failing([GitError(status_code=502, detail="bad gateway")])
+    assert await retry(call, policy=policy) == "ok"
+    assert calls["count"] == 2
+
+    call, calls = _failing([GitError(status_code=502, detail="bad gateway")])
+    with pytest.raises(GitError):
+        await retry(call, policy=policy, idempotent=False)
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_replayed_for_writes_only_if_never_sent():
+    policy = RetryPolicy("git")
+
+    call, calls = _failing([_transport_error(httpx.ConnectError)])
+    assert await retry(call, policy=policy, idempotent=False) == "ok"
+
+    call, calls = _failing([_transport_error(httpx.ReadTimeout)])
+    with pytest.raises(RuntimeError):
+        await retry(call, policy=policy, idempotent=False)
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_honours_retry_after_and_reset(no_sleep):
+    policy = RetryPolicy("git", base_delay=0.0)
+    limited = GitError(status_code=403, detail="secondary rate limit", headers={"Retry-After": "3"})
+    reset = GitError(
+        status_code=403,
+        detail="rate limit",
+        headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 5)},
+    )
+
+    call, _ = _failing([limited, reset])
+    assert await retry(call, policy=policy, idempotent=False) == "ok"
+    assert no_sleep[0] == 3
+    assert 3 <= no_sleep[1] <= 5
+
+
+@pytest.mark.asyncio
+async def test_retry_after_beyond_cap_is_not_waited():
+    policy = RetryPolicy("git", max_retry_after=10)
+    call, calls = _failing([GitError(status_code=429, detail="slow down", headers={"Retry-After": "600"})])
+
+    with pytest.raises(GitError):
+        await retry(call, policy=policy)
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_locally_refused_calls_fail_fast():
+    call, calls = _failing([AdmissionRejectedError("git", "overloaded")])
+
+    with pytest.raises(AdmissionRejectedError):
+        await retry(call, policy=RetryPolicy("git"))
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_request_budget_is_shared_across_calls():
+    policy = RetryPolicy("git", attempts=5)
+    token = retry_budget.set(RetryBudget(2))
+    try:
+        call, calls = _failing([GitError(status_code=503, detail="down") for _ in range(4)])
+        with pytest.raises(GitError):
+            await retry(call, policy=policy)
+        assert calls["count"] == 3
+    finally:
+        retry_budget.reset(token)
+
+
+def test_full_jitter_backoff_bounds():
+    policy = RetryPolicy("git", base_delay=1.0, max_delay=4.0)
+    for attempt in range(6):
+        assert 0 <= policy.backoff(attempt) <= min(4.0, 2 ** attempt)
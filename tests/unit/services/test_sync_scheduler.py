@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.src.services.sync_scheduler import SyncJob, SyncScheduler
+
+
+def test_interval_backs_off_while_idle_and_resets_on_change():
+    job = SyncJob("service", "schemas", None, interval=10, max_factor=2, backoff=1.5)
+
+    job.adapt(changed=False)
+    assert job.interval == 15
+    job.adapt(changed=False)
+    assert job.interval == 20
+
+    job.adapt(changed=True)
+    assert job.interval == 10
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped_and_failures_do_not_count_as_success():
+    running, peak = 0, 0
+
+    async def run():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return False
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    scheduler = SyncScheduler(max_concurrency=2, jitter=0)
+    jobs = [scheduler.add(SyncJob(f"r{i}", "schemas", run, interval=60)) for i in range(5)]
+    failing = scheduler.add(SyncJob("bad", "schemas", fail, interval=60))
+    failing.last_success = 0
+
+    await asyncio.gather(*(scheduler.run_once(job) for job in scheduler.jobs))
+
+    assert peak == 2
+    assert all(job.interval > 60 for job in jobs)
+    assert failing.last_success == 0 and failing.interval == 60
+
+
+@pytest.mark.asyncio
+async def test_trigger_runs_job_early_and_stop_cancels():
+    ran = asyncio.Event()
+
+    async def run():
+        ran.set()
+        return True
+
+    scheduler = SyncScheduler(max_concurrency=1, jitter=0.2)
+    job = scheduler.add(SyncJob("service", "catalog", run, interval=3600))
+    scheduler.start()
+
+    job.trigger.fire()
+    await asyncio.wait_for(ran.wait(), 1)
+
+    await scheduler.stop()
+    assert scheduler._tasks == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_job_is_deferred_without_taking_a_slot():
+    class HeldRateLimit:
+        def background_delay(self, reserve=True):
+            assert not reserve
+            return 1800.0
+
+    ran = []
+
+    async def run():
+        ran.append("other")
+        return True
+
+    async def held():
+        ran.append("held")
+        return True
+
+    scheduler = SyncScheduler(max_concurrency=1, jitter=0)
+    limited = scheduler.add(SyncJob("limited", "catalog", held, interval=60, rate_limit=HeldRateLimit()))
+    other = scheduler.add(SyncJob("other", "catalog", run, interval=60))
+
+    assert await scheduler.run_once(limited) == 1800.0
+    assert await asyncio.wait_for(scheduler.run_once(other), 1) is None
+    assert ran == ["other"]